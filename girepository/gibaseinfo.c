@@ -111,34 +111,39 @@ _g_info_from_entry (GIRepository *repository,
 {
   GIBaseInfo *result;
   DirEntry *entry = g_typelib_get_dir_entry (typelib, index);
+  const gchar *namespace;
+  const gchar *name;
+  GIUnresolvedInfo *unresolved;
 
   if (entry->local)
-    result = _g_info_new_full (entry->blob_type, repository, NULL, typelib, entry->offset);
+    {
+      if (_g_typelib_check_entry (typelib, entry))
+        return _g_info_new_full (entry->blob_type, repository, NULL, typelib, entry->offset);
+
+      /* The blob failed validation, treat it like a missing type */
+      namespace = g_typelib_get_namespace (typelib);
+      name = g_typelib_get_string (typelib, entry->name);
+    }
   else
     {
-      const gchar *namespace = g_typelib_get_string (typelib, entry->offset);
-      const gchar *name = g_typelib_get_string (typelib, entry->name);
+      namespace = g_typelib_get_string (typelib, entry->offset);
+      name = g_typelib_get_string (typelib, entry->name);
 
       result = g_irepository_find_by_name (repository, namespace, name);
-      if (result == NULL)
-        {
-          GIUnresolvedInfo *unresolved;
-
-          unresolved = g_slice_new0 (GIUnresolvedInfo);
-
-          unresolved->type = GI_INFO_TYPE_UNRESOLVED;
-          unresolved->ref_count = 1;
-          unresolved->repository = g_object_ref (repository);
-          unresolved->container = NULL;
-          unresolved->name = name;
-          unresolved->namespace = namespace;
-
-          return (GIBaseInfo *)unresolved;
-	}
-      return (GIBaseInfo *)result;
+      if (result != NULL)
+        return result;
     }
 
-  return (GIBaseInfo *)result;
+  unresolved = g_slice_new0 (GIUnresolvedInfo);
+
+  unresolved->type = GI_INFO_TYPE_UNRESOLVED;
+  unresolved->ref_count = 1;
+  unresolved->repository = g_object_ref (repository);
+  unresolved->container = NULL;
+  unresolved->name = name;
+  unresolved->namespace = namespace;
+
+  return (GIBaseInfo *)unresolved;
 }
 
 GITypeInfo *
@@ -605,6 +610,65 @@ g_base_info_iterate_attributes (GIBaseInfo      *info,
   return TRUE;
 }
 
+/*
+ * _g_info_iter_next:
+ * @iterator: a #GIInfoIter; its offset has to be set to the first
+ *   blob by the caller when its index is 0
+ * @container: the info whose blobs are iterated
+ * @type: the type of the blobs, %GI_INFO_TYPE_FUNCTION,
+ *   %GI_INFO_TYPE_FIELD or %GI_INFO_TYPE_ARG
+ * @n_infos: the number of blobs
+ * @info: (out caller-allocates): initialized with the next blob
+ *
+ * Shared implementation of the iterate functions, like
+ * g_object_info_iterate_methods().  The blobs of a kind are laid out
+ * back to back, so each step just moves past the current one.
+ *
+ * Returns: %TRUE if @info was initialized
+ */
+gboolean
+_g_info_iter_next (GIInfoIter *iterator,
+                   GIBaseInfo *container,
+                   GIInfoType  type,
+                   gint        n_infos,
+                   GIBaseInfo *info)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)container;
+  Header *header = (Header *)rinfo->typelib->data;
+  guint32 offset = iterator->offset;
+
+  if (iterator->index >= n_infos)
+    return FALSE;
+
+  _g_info_init ((GIRealInfo *)info, type, rinfo->repository, container,
+                rinfo->typelib, offset);
+
+  switch (type)
+    {
+    case GI_INFO_TYPE_FUNCTION:
+      offset += header->function_blob_size;
+      break;
+    case GI_INFO_TYPE_FIELD:
+      {
+        FieldBlob *blob = (FieldBlob *)&rinfo->typelib->data[offset];
+
+        offset += header->field_blob_size;
+        if (blob->has_embedded_type)
+          offset += header->callback_blob_size;
+      }
+      break;
+    case GI_INFO_TYPE_ARG:
+      offset += header->arg_blob_size;
+      break;
+    default:
+      g_assert_not_reached ();
+    }
+
+  iterator->offset = offset;
+  iterator->index++;
+  return TRUE;
+}
+
 /**
  * g_base_info_get_container:
  * @info: a #GIBaseInfo
@@ -59,6 +59,23 @@ typedef struct {
   gpointer data4;
 } GIAttributeIter;
 
+/**
+ * GIInfoIter:
+ *
+ * An opaque structure used to iterate over the methods, fields or
+ * arguments of a #GIBaseInfo without allocating, for example with
+ * g_object_info_iterate_methods().  It must be initialized to zero
+ * before the first call.
+ *
+ * Since: 1.34
+ */
+typedef struct {
+  /* <private> */
+  gint index;
+  guint32 offset;
+  gpointer padding[4];
+} GIInfoIter;
+
 #define GI_TYPE_BASE_INFO	(g_base_info_gtype_get_type ())
 
 GType                  g_base_info_gtype_get_type   (void) G_GNUC_CONST;
@@ -352,6 +352,43 @@ g_callable_info_load_arg (GICallableInfo *info,
                 offset + header->signature_blob_size + n * header->arg_blob_size);
 }
 
+/**
+ * g_callable_info_iterate_args:
+ * @info: a #GICallableInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @arg: (out caller-allocates): Initialized with the next argument
+ *
+ * Iterate over the arguments of @info, like repeated calls of
+ * g_callable_info_load_arg(), see g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @arg was initialized, %FALSE after the last argument
+ *
+ * Since: 1.34
+ */
+gboolean
+g_callable_info_iterate_args (GICallableInfo *info,
+                              GIInfoIter     *iterator,
+                              GIArgInfo      *arg)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  Header *header;
+  SignatureBlob *blob;
+  guint32 offset;
+
+  g_return_val_if_fail (info != NULL, FALSE);
+  g_return_val_if_fail (GI_IS_CALLABLE_INFO (info), FALSE);
+
+  offset = signature_offset (info);
+  header = (Header *)rinfo->typelib->data;
+  blob = (SignatureBlob *)&rinfo->typelib->data[offset];
+
+  if (iterator->index == 0)
+    iterator->offset = offset + header->signature_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_ARG,
+                            blob->n_arguments, (GIBaseInfo *)arg);
+}
+
 /**
  * g_callable_info_get_return_attribute:
  * @info: a #GICallableInfo
@@ -426,113 +463,224 @@ g_callable_info_iterate_return_attributes (GICallableInfo  *info,
   return TRUE;
 }
 
-/* Extract the correct bits from an ffi_arg return value into
- * GIArgument: https://bugzilla.gnome.org/show_bug.cgi?id=665152
- *
- * Also see the ffi_call man page - the storage requirements for return
- * values are "special".
- */
-void
-gi_type_info_extract_ffi_return_value (GITypeInfo                  *return_info,
-                                       GIFFIReturnValue            *ffi_value,
-                                       GIArgument                  *arg)
+static void
+extract_ffi_return_value (GITypeTag         return_tag,
+                          GIInfoType        interface_type,
+                          GIFFIReturnValue *ffi_value,
+                          GIArgument       *arg)
 {
-    switch (g_type_info_get_tag (return_info)) {
+  switch (return_tag)
+    {
     case GI_TYPE_TAG_INT8:
-        arg->v_int8 = (gint8) ffi_value->v_long;
-        break;
+      arg->v_int8 = (gint8) ffi_value->v_long;
+      break;
     case GI_TYPE_TAG_UINT8:
-        arg->v_uint8 = (guint8) ffi_value->v_ulong;
-        break;
+      arg->v_uint8 = (guint8) ffi_value->v_ulong;
+      break;
     case GI_TYPE_TAG_INT16:
-        arg->v_int16 = (gint16) ffi_value->v_long;
-        break;
+      arg->v_int16 = (gint16) ffi_value->v_long;
+      break;
     case GI_TYPE_TAG_UINT16:
-        arg->v_uint16 = (guint16) ffi_value->v_ulong;
-        break;
+      arg->v_uint16 = (guint16) ffi_value->v_ulong;
+      break;
     case GI_TYPE_TAG_INT32:
-        arg->v_int32 = (gint32) ffi_value->v_long;
-        break;
+      arg->v_int32 = (gint32) ffi_value->v_long;
+      break;
     case GI_TYPE_TAG_UINT32:
     case GI_TYPE_TAG_BOOLEAN:
     case GI_TYPE_TAG_UNICHAR:
-        arg->v_uint32 = (guint32) ffi_value->v_ulong;
-        break;
+      arg->v_uint32 = (guint32) ffi_value->v_ulong;
+      break;
     case GI_TYPE_TAG_INT64:
-        arg->v_int64 = (gint64) ffi_value->v_int64;
-        break;
+      arg->v_int64 = (gint64) ffi_value->v_int64;
+      break;
     case GI_TYPE_TAG_UINT64:
-        arg->v_uint64 = (guint64) ffi_value->v_uint64;
-        break;
+      arg->v_uint64 = (guint64) ffi_value->v_uint64;
+      break;
     case GI_TYPE_TAG_FLOAT:
-        arg->v_float = ffi_value->v_float;
-        break;
+      arg->v_float = ffi_value->v_float;
+      break;
     case GI_TYPE_TAG_DOUBLE:
-        arg->v_double = ffi_value->v_double;
-        break;
+      arg->v_double = ffi_value->v_double;
+      break;
     case GI_TYPE_TAG_INTERFACE:
+      switch (interface_type)
         {
-            GIBaseInfo* interface_info;
-            GIInfoType interface_type;
-
-            interface_info = g_type_info_get_interface(return_info);
-            interface_type = g_base_info_get_type(interface_info);
-
-            switch(interface_type) {
-            case GI_INFO_TYPE_ENUM:
-            case GI_INFO_TYPE_FLAGS:
-                arg->v_int32 = (gint32) ffi_value->v_long;
-                break;
-            default:
-                arg->v_pointer = (gpointer) ffi_value->v_ulong;
-                break;
-            }
-
-            g_base_info_unref(interface_info);
+        case GI_INFO_TYPE_ENUM:
+        case GI_INFO_TYPE_FLAGS:
+          arg->v_int32 = (gint32) ffi_value->v_long;
+          break;
+        default:
+          arg->v_pointer = (gpointer) ffi_value->v_ulong;
+          break;
         }
-        break;
+      break;
     default:
-        arg->v_pointer = (gpointer) ffi_value->v_ulong;
-        break;
+      arg->v_pointer = (gpointer) ffi_value->v_ulong;
+      break;
     }
 }
 
-gboolean
-g_callable_info_invoke (GIFunctionInfo *info,
-                        gpointer          function,
-                        const GIArgument  *in_args,
-                        int               n_in_args,
-                        const GIArgument  *out_args,
-                        int               n_out_args,
-                        GIArgument        *return_value,
-                        gboolean          is_method,
-                        gboolean          throws,
-                        GError          **error)
+static GIInfoType
+get_interface_type (GITypeInfo *type_info)
+{
+  GIBaseInfo *interface_info;
+  GIInfoType interface_type;
+
+  if (g_type_info_get_tag (type_info) != GI_TYPE_TAG_INTERFACE)
+    return GI_INFO_TYPE_INVALID;
+
+  interface_info = g_type_info_get_interface (type_info);
+  interface_type = g_base_info_get_type (interface_info);
+  g_base_info_unref (interface_info);
+
+  return interface_type;
+}
+
+/* Extract the correct bits from an ffi_arg return value into
+ * GIArgument: https://bugzilla.gnome.org/show_bug.cgi?id=665152
+ *
+ * Also see the ffi_call man page - the storage requirements for return
+ * values are "special".
+ */
+void
+gi_type_info_extract_ffi_return_value (GITypeInfo                  *return_info,
+                                       GIFFIReturnValue            *ffi_value,
+                                       GIArgument                  *arg)
+{
+  extract_ffi_return_value (g_type_info_get_tag (return_info),
+                            get_interface_type (return_info),
+                            ffi_value, arg);
+}
+
+/* Everything g_callable_info_invoke() needs to know about a callable
+ * that does not depend on the arguments, so that it can be computed
+ * once per function, see g_function_info_invoke().
+ */
+struct _GIPreparedCall
 {
   ffi_cif cif;
-  ffi_type *rtype;
+  gpointer function;
+  gboolean is_method;
+  gboolean throws;
+  gint n_args;
+  gint n_invoke_args;
+  GITypeTag return_tag;
+  GIInfoType return_interface_type;
   ffi_type **atypes;
-  GITypeInfo *tinfo;
+  GIDirection *directions;
+};
+
+/*
+ * _g_callable_info_prepare_call:
+ * @info: a #GICallableInfo
+ * @function: the address of the function
+ * @is_method: whether the first "in" argument is the instance
+ * @throws: whether a #GError is passed as the last argument
+ *
+ * Returns: (transfer full): the call description, to be freed with
+ *   _g_prepared_call_free(), or %NULL if ffi could not handle it
+ */
+GIPreparedCall *
+_g_callable_info_prepare_call (GICallableInfo *info,
+                               gpointer        function,
+                               gboolean        is_method,
+                               gboolean        throws)
+{
+  GIPreparedCall *call;
   GITypeInfo *rinfo;
-  GITypeTag rtag;
-  GIArgInfo *ainfo;
-  gint n_args, n_invoke_args, in_pos, out_pos, i;
+  ffi_type *rtype;
+  gint i, offset;
+
+  call = g_slice_new0 (GIPreparedCall);
+  call->function = function;
+  call->is_method = is_method;
+  call->throws = throws;
+
+  rinfo = g_callable_info_get_return_type (info);
+  rtype = g_type_info_get_ffi_type (rinfo);
+  call->return_tag = g_type_info_get_tag (rinfo);
+  call->return_interface_type = get_interface_type (rinfo);
+  g_base_info_unref ((GIBaseInfo *)rinfo);
+
+  call->n_args = g_callable_info_get_n_args (info);
+  call->n_invoke_args = call->n_args;
+  if (is_method)
+    call->n_invoke_args++;
+  if (throws)
+    /* Add an argument for the GError */
+    call->n_invoke_args++;
+
+  call->atypes = g_new0 (ffi_type *, call->n_invoke_args + 1);
+  call->directions = g_new0 (GIDirection, call->n_args + 1);
+
+  offset = is_method ? 1 : 0;
+  if (is_method)
+    call->atypes[0] = &ffi_type_pointer;
+  for (i = 0; i < call->n_args; i++)
+    {
+      GIArgInfo ainfo;
+      GITypeInfo tinfo;
+
+      g_callable_info_load_arg (info, i, &ainfo);
+      call->directions[i] = g_arg_info_get_direction (&ainfo);
+      switch (call->directions[i])
+        {
+        case GI_DIRECTION_IN:
+          g_arg_info_load_type (&ainfo, &tinfo);
+          call->atypes[i+offset] = g_type_info_get_ffi_type (&tinfo);
+          break;
+        case GI_DIRECTION_OUT:
+        case GI_DIRECTION_INOUT:
+          call->atypes[i+offset] = &ffi_type_pointer;
+          break;
+        default:
+          g_assert_not_reached ();
+        }
+    }
+  if (throws)
+    call->atypes[call->n_invoke_args - 1] = &ffi_type_pointer;
+
+  if (ffi_prep_cif (&call->cif, FFI_DEFAULT_ABI, call->n_invoke_args,
+                    rtype, call->atypes) != FFI_OK)
+    {
+      _g_prepared_call_free (call);
+      return NULL;
+    }
+
+  return call;
+}
+
+void
+_g_prepared_call_free (GIPreparedCall *call)
+{
+  g_free (call->atypes);
+  g_free (call->directions);
+  g_slice_free (GIPreparedCall, call);
+}
+
+gboolean
+_g_prepared_call_invoke (GIPreparedCall    *call,
+                         const GIArgument  *in_args,
+                         int                n_in_args,
+                         const GIArgument  *out_args,
+                         int                n_out_args,
+                         GIArgument        *return_value,
+                         GError           **error)
+{
+  gint in_pos, out_pos, i;
   gpointer *args;
-  gboolean success = FALSE;
   GError *local_error = NULL;
   gpointer error_address = &local_error;
   GIFFIReturnValue ffi_return_value;
   gpointer return_value_p; /* Will point inside the union return_value */
 
-  rinfo = g_callable_info_get_return_type ((GICallableInfo *)info);
-  rtype = g_type_info_get_ffi_type (rinfo);
-  rtag = g_type_info_get_tag(rinfo);
-
   in_pos = 0;
   out_pos = 0;
 
-  n_args = g_callable_info_get_n_args ((GICallableInfo *)info);
-  if (is_method)
+  args = g_alloca (sizeof (gpointer) * call->n_invoke_args);
+
+  if (call->is_method)
     {
       if (n_in_args == 0)
         {
@@ -540,44 +688,24 @@ g_callable_info_invoke (GIFunctionInfo *info,
                        G_INVOKE_ERROR,
                        G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                        "Too few \"in\" arguments (handling this)");
-          goto out;
+          return FALSE;
         }
-      n_invoke_args = n_args+1;
-      in_pos++;
-    }
-  else
-    n_invoke_args = n_args;
-
-  if (throws)
-    /* Add an argument for the GError */
-    n_invoke_args ++;
-
-  atypes = g_alloca (sizeof (ffi_type*) * n_invoke_args);
-  args = g_alloca (sizeof (gpointer) * n_invoke_args);
-
-  if (is_method)
-    {
-      atypes[0] = &ffi_type_pointer;
       args[0] = (gpointer) &in_args[0];
+      in_pos++;
     }
-  for (i = 0; i < n_args; i++)
+  for (i = 0; i < call->n_args; i++)
     {
-      int offset = (is_method ? 1 : 0);
-      ainfo = g_callable_info_get_arg ((GICallableInfo *)info, i);
-      switch (g_arg_info_get_direction (ainfo))
+      int offset = (call->is_method ? 1 : 0);
+      switch (call->directions[i])
         {
         case GI_DIRECTION_IN:
-          tinfo = g_arg_info_get_type (ainfo);
-          atypes[i+offset] = g_type_info_get_ffi_type (tinfo);
-          g_base_info_unref ((GIBaseInfo *)tinfo);
-
           if (in_pos >= n_in_args)
             {
               g_set_error (error,
                            G_INVOKE_ERROR,
                            G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                            "Too few \"in\" arguments (handling in)");
-              goto out;
+              return FALSE;
             }
 
           args[i+offset] = (gpointer)&in_args[in_pos];
@@ -585,30 +713,26 @@ g_callable_info_invoke (GIFunctionInfo *info,
 
           break;
         case GI_DIRECTION_OUT:
-          atypes[i+offset] = &ffi_type_pointer;
-
           if (out_pos >= n_out_args)
             {
               g_set_error (error,
                            G_INVOKE_ERROR,
                            G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                            "Too few \"out\" arguments (handling out)");
-              goto out;
+              return FALSE;
             }
 
           args[i+offset] = (gpointer)&out_args[out_pos];
           out_pos++;
           break;
         case GI_DIRECTION_INOUT:
-          atypes[i+offset] = &ffi_type_pointer;
-
           if (in_pos >= n_in_args)
             {
               g_set_error (error,
                            G_INVOKE_ERROR,
                            G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                            "Too few \"in\" arguments (handling inout)");
-              goto out;
+              return FALSE;
             }
 
           if (out_pos >= n_out_args)
@@ -617,7 +741,7 @@ g_callable_info_invoke (GIFunctionInfo *info,
                            G_INVOKE_ERROR,
                            G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                            "Too few \"out\" arguments (handling inout)");
-              goto out;
+              return FALSE;
             }
 
           args[i+offset] = (gpointer)&in_args[in_pos];
@@ -627,14 +751,10 @@ g_callable_info_invoke (GIFunctionInfo *info,
         default:
           g_assert_not_reached ();
         }
-      g_base_info_unref ((GIBaseInfo *)ainfo);
     }
 
-  if (throws)
-    {
-      args[n_invoke_args - 1] = &error_address;
-      atypes[n_invoke_args - 1] = &ffi_type_pointer;
-    }
+  if (call->throws)
+    args[call->n_invoke_args - 1] = &error_address;
 
   if (in_pos < n_in_args)
     {
@@ -642,7 +762,7 @@ g_callable_info_invoke (GIFunctionInfo *info,
                    G_INVOKE_ERROR,
                    G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                    "Too many \"in\" arguments (at end)");
-      goto out;
+      return FALSE;
     }
   if (out_pos < n_out_args)
     {
@@ -650,15 +770,12 @@ g_callable_info_invoke (GIFunctionInfo *info,
                    G_INVOKE_ERROR,
                    G_INVOKE_ERROR_ARGUMENT_MISMATCH,
                    "Too many \"out\" arguments (at end)");
-      goto out;
+      return FALSE;
     }
 
-  if (ffi_prep_cif (&cif, FFI_DEFAULT_ABI, n_invoke_args, rtype, atypes) != FFI_OK)
-    goto out;
-
   g_return_val_if_fail (return_value, FALSE);
   /* See comment for GIFFIReturnValue above */
-  switch (rtag)
+  switch (call->return_tag)
     {
     case GI_TYPE_TAG_FLOAT:
       return_value_p = &ffi_return_value.v_float;
@@ -673,19 +790,42 @@ g_callable_info_invoke (GIFunctionInfo *info,
     default:
       return_value_p = &ffi_return_value.v_long;
     }
-  ffi_call (&cif, function, return_value_p, args);
+  ffi_call (&call->cif, call->function, return_value_p, args);
 
   if (local_error)
     {
       g_propagate_error (error, local_error);
-      success = FALSE;
-    }
-  else
-    {
-      gi_type_info_extract_ffi_return_value (rinfo, &ffi_return_value, return_value);
-      success = TRUE;
+      return FALSE;
     }
- out:
-  g_base_info_unref ((GIBaseInfo *)rinfo);
+
+  extract_ffi_return_value (call->return_tag, call->return_interface_type,
+                            &ffi_return_value, return_value);
+  return TRUE;
+}
+
+gboolean
+g_callable_info_invoke (GIFunctionInfo *info,
+                        gpointer          function,
+                        const GIArgument  *in_args,
+                        int               n_in_args,
+                        const GIArgument  *out_args,
+                        int               n_out_args,
+                        GIArgument        *return_value,
+                        gboolean          is_method,
+                        gboolean          throws,
+                        GError          **error)
+{
+  GIPreparedCall *call;
+  gboolean success;
+
+  call = _g_callable_info_prepare_call ((GICallableInfo *)info, function,
+                                        is_method, throws);
+  if (call == NULL)
+    return FALSE;
+
+  success = _g_prepared_call_invoke (call, in_args, n_in_args,
+                                     out_args, n_out_args,
+                                     return_value, error);
+  _g_prepared_call_free (call);
   return success;
 }
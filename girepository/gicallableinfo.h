@@ -57,6 +57,9 @@ GIArgInfo *            g_callable_info_get_arg         (GICallableInfo *info,
 void                   g_callable_info_load_arg        (GICallableInfo *info,
                                                         gint            n,
                                                         GIArgInfo      *arg);
+gboolean               g_callable_info_iterate_args    (GICallableInfo *info,
+                                                        GIInfoIter     *iterator,
+                                                        GIArgInfo      *arg);
 gboolean               g_callable_info_invoke          (GICallableInfo   *info,
                                                         gpointer          function,
                                                         const GIArgument *in_args,
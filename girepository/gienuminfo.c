@@ -171,6 +171,42 @@ g_enum_info_get_method (GIEnumInfo *info,
 					rinfo->typelib, offset);
 }
 
+/**
+ * g_enum_info_iterate_methods:
+ * @info: a #GIEnumInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @method: (out caller-allocates): Initialized with the next method
+ *
+ * Iterate over the methods of @info without allocating, see
+ * g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @method was initialized, %FALSE after the last method
+ *
+ * Since: 1.34
+ */
+gboolean
+g_enum_info_iterate_methods (GIEnumInfo     *info,
+			     GIInfoIter     *iterator,
+			     GIFunctionInfo *method)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  Header *header;
+  EnumBlob *blob;
+
+  g_return_val_if_fail (info != NULL, FALSE);
+  g_return_val_if_fail (GI_IS_ENUM_INFO (info), FALSE);
+
+  header = (Header *)rinfo->typelib->data;
+  blob = (EnumBlob *)&rinfo->typelib->data[rinfo->offset];
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->enum_blob_size
+      + blob->n_values * header->value_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FUNCTION,
+			    blob->n_methods, (GIBaseInfo *)method);
+}
+
 /**
  * g_enum_info_get_storage_type:
  * @info: a #GIEnumInfo
@@ -44,6 +44,9 @@ GIValueInfo  * g_enum_info_get_value         (GIEnumInfo  *info,
 gint              g_enum_info_get_n_methods     (GIEnumInfo  *info);
 GIFunctionInfo  * g_enum_info_get_method        (GIEnumInfo  *info,
 						 gint         n);
+gboolean          g_enum_info_iterate_methods   (GIEnumInfo     *info,
+						 GIInfoIter     *iterator,
+						 GIFunctionInfo *method);
 GITypeTag      g_enum_info_get_storage_type  (GIEnumInfo  *info);
 const gchar *  g_enum_info_get_error_domain  (GIEnumInfo  *info);
 
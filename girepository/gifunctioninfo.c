@@ -214,6 +214,78 @@ g_invoke_error_quark (void)
   return quark;
 }
 
+/* Resolving the symbol and preparing the ffi_cif for a function is
+ * the same on every call, so it is done once per function blob and
+ * kept with the typelib, which frees it when it is unloaded.
+ */
+static GStaticMutex prepared_calls_lock = G_STATIC_MUTEX_INIT;
+
+static GIPreparedCall *
+get_prepared_call (GIFunctionInfo  *info,
+		   GError         **error)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  GITypelib *typelib = rinfo->typelib;
+  GIPreparedCall *call = NULL, *existing;
+  GIFunctionInfoFlags flags;
+  const gchar *symbol;
+  gpointer func;
+  gboolean is_method;
+  gboolean throws;
+
+  g_static_mutex_lock (&prepared_calls_lock);
+  if (typelib->prepared_calls != NULL)
+    call = g_hash_table_lookup (typelib->prepared_calls,
+				GUINT_TO_POINTER (rinfo->offset));
+  g_static_mutex_unlock (&prepared_calls_lock);
+
+  if (call != NULL)
+    return call;
+
+  symbol = g_function_info_get_symbol (info);
+
+  if (!g_typelib_symbol (typelib, symbol, &func))
+    {
+      g_set_error (error,
+                   G_INVOKE_ERROR,
+                   G_INVOKE_ERROR_SYMBOL_NOT_FOUND,
+                   "Could not locate %s: %s", symbol, g_module_error ());
+
+      return NULL;
+    }
+
+  flags = g_function_info_get_flags (info);
+  is_method = (flags & GI_FUNCTION_IS_METHOD) != 0
+    && (flags & GI_FUNCTION_IS_CONSTRUCTOR) == 0;
+  throws = (flags & GI_FUNCTION_THROWS) != 0;
+
+  call = _g_callable_info_prepare_call ((GICallableInfo *)info, func,
+					is_method, throws);
+  if (call == NULL)
+    return NULL;
+
+  g_static_mutex_lock (&prepared_calls_lock);
+  if (typelib->prepared_calls == NULL)
+    typelib->prepared_calls =
+      g_hash_table_new_full (NULL, NULL, NULL,
+			     (GDestroyNotify) _g_prepared_call_free);
+
+  /* Another thread may have prepared the same function meanwhile */
+  existing = g_hash_table_lookup (typelib->prepared_calls,
+				  GUINT_TO_POINTER (rinfo->offset));
+  if (existing != NULL)
+    {
+      _g_prepared_call_free (call);
+      call = existing;
+    }
+  else
+    g_hash_table_insert (typelib->prepared_calls,
+			 GUINT_TO_POINTER (rinfo->offset), call);
+  g_static_mutex_unlock (&prepared_calls_lock);
+
+  return call;
+}
+
 /**
  * g_function_info_invoke: (skip)
  * @info: a #GIFunctionInfo describing the function to invoke
@@ -249,36 +321,17 @@ g_function_info_invoke (GIFunctionInfo *info,
 			GIArgument        *return_value,
 			GError          **error)
 {
-  const gchar *symbol;
-  gpointer func;
-  gboolean is_method;
-  gboolean throws;
-
-  symbol = g_function_info_get_symbol (info);
-
-  if (!g_typelib_symbol (g_base_info_get_typelib((GIBaseInfo *) info),
-                         symbol, &func))
-    {
-      g_set_error (error,
-                   G_INVOKE_ERROR,
-                   G_INVOKE_ERROR_SYMBOL_NOT_FOUND,
-                   "Could not locate %s: %s", symbol, g_module_error ());
-
-      return FALSE;
-    }
-
-  is_method = (g_function_info_get_flags (info) & GI_FUNCTION_IS_METHOD) != 0
-    && (g_function_info_get_flags (info) & GI_FUNCTION_IS_CONSTRUCTOR) == 0;
-  throws = g_function_info_get_flags (info) & GI_FUNCTION_THROWS;
-
-  return g_callable_info_invoke ((GICallableInfo*) info,
-                                 func,
-                                 in_args,
-                                 n_in_args,
-                                 out_args,
-                                 n_out_args,
-                                 return_value,
-                                 is_method,
-                                 throws,
-                                 error);
+  GIPreparedCall *call;
+
+  call = get_prepared_call (info, error);
+  if (call == NULL)
+    return FALSE;
+
+  return _g_prepared_call_invoke (call,
+                                  in_args,
+                                  n_in_args,
+                                  out_args,
+                                  n_out_args,
+                                  return_value,
+                                  error);
 }
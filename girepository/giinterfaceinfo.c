@@ -208,6 +208,43 @@ g_interface_info_get_method (GIInterfaceInfo *info,
 					rinfo->typelib, offset);
 }
 
+/**
+ * g_interface_info_iterate_methods:
+ * @info: a #GIInterfaceInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @method: (out caller-allocates): Initialized with the next method
+ *
+ * Iterate over the methods of @info without allocating, see
+ * g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @method was initialized, %FALSE after the last method
+ *
+ * Since: 1.34
+ */
+gboolean
+g_interface_info_iterate_methods (GIInterfaceInfo *info,
+				  GIInfoIter      *iterator,
+				  GIFunctionInfo  *method)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  Header *header;
+  InterfaceBlob *blob;
+
+  g_return_val_if_fail (info != NULL, FALSE);
+  g_return_val_if_fail (GI_IS_INTERFACE_INFO (info), FALSE);
+
+  header = (Header *)rinfo->typelib->data;
+  blob = (InterfaceBlob *)&rinfo->typelib->data[rinfo->offset];
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->interface_blob_size
+      + (blob->n_prerequisites + (blob->n_prerequisites % 2)) * 2
+      + blob->n_properties * header->property_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FUNCTION,
+			    blob->n_methods, (GIBaseInfo *)method);
+}
+
 /**
  * g_interface_info_find_method:
  * @info: a #GIInterfaceInfo
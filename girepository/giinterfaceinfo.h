@@ -43,6 +43,9 @@ GIPropertyInfo * g_interface_info_get_property        (GIInterfaceInfo *info,
 gint             g_interface_info_get_n_methods       (GIInterfaceInfo *info);
 GIFunctionInfo * g_interface_info_get_method          (GIInterfaceInfo *info,
 						       gint             n);
+gboolean         g_interface_info_iterate_methods     (GIInterfaceInfo *info,
+						       GIInfoIter      *iterator,
+						       GIFunctionInfo  *method);
 GIFunctionInfo * g_interface_info_find_method         (GIInterfaceInfo *info,
 						       const gchar     *name);
 gint             g_interface_info_get_n_signals       (GIInterfaceInfo *info);
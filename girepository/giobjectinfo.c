@@ -267,6 +267,44 @@ g_object_info_get_field (GIObjectInfo *info,
   return (GIFieldInfo *) g_info_new (GI_INFO_TYPE_FIELD, (GIBaseInfo*)info, rinfo->typelib, offset);
 }
 
+/**
+ * g_object_info_iterate_fields:
+ * @info: a #GIObjectInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @field: (out caller-allocates): Initialized with the next field
+ *
+ * Iterate over the fields of @info, initializing the caller-allocated
+ * @field with each of them in turn.  This is a variant of
+ * g_object_info_get_field() designed for stack allocation, see
+ * g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @field was initialized, %FALSE after the last field
+ *
+ * Since: 1.34
+ */
+gboolean
+g_object_info_iterate_fields (GIObjectInfo *info,
+			      GIInfoIter   *iterator,
+			      GIFieldInfo  *field)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  Header *header;
+  ObjectBlob *blob;
+
+  g_return_val_if_fail (info != NULL, FALSE);
+  g_return_val_if_fail (GI_IS_OBJECT_INFO (info), FALSE);
+
+  header = (Header *)rinfo->typelib->data;
+  blob = (ObjectBlob *)&rinfo->typelib->data[rinfo->offset];
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->object_blob_size
+      + (blob->n_interfaces + blob->n_interfaces % 2) * 2;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FIELD,
+			    blob->n_fields, (GIBaseInfo *)field);
+}
+
 /**
  * g_object_info_get_n_properties:
  * @info: a #GIObjectInfo
@@ -380,6 +418,64 @@ g_object_info_get_method (GIObjectInfo *info,
 					  rinfo->typelib, offset);
 }
 
+/**
+ * g_object_info_iterate_methods:
+ * @info: a #GIObjectInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @method: (out caller-allocates): Initialized with the next method
+ *
+ * Iterate over the methods of @info, initializing the caller-allocated
+ * @method with each of them in turn.  This is a variant of
+ * g_object_info_get_method() designed for stack allocation; walking
+ * the methods this way does not allocate anything.
+ *
+ * <example>
+ * <title>Iterating over methods</title>
+ * <programlisting>
+ * void
+ * print_methods (GIObjectInfo *info)
+ * {
+ *   GIInfoIter iter = { 0, };
+ *   GIFunctionInfo method;
+ *
+ *   while (g_object_info_iterate_methods (info, &iter, &method))
+ *     g_print ("method: %s\n", g_function_info_get_symbol (&method));
+ * }
+ * </programlisting>
+ * </example>
+ *
+ * The initialized @method holds no references.  It must not be passed
+ * to g_base_info_unref() or used after @info is deallocated.
+ *
+ * Returns: %TRUE if @method was initialized, %FALSE after the last method
+ *
+ * Since: 1.34
+ */
+gboolean
+g_object_info_iterate_methods (GIObjectInfo   *info,
+			       GIInfoIter     *iterator,
+			       GIFunctionInfo *method)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  Header *header;
+  ObjectBlob *blob;
+
+  g_return_val_if_fail (info != NULL, FALSE);
+  g_return_val_if_fail (GI_IS_OBJECT_INFO (info), FALSE);
+
+  header = (Header *)rinfo->typelib->data;
+  blob = (ObjectBlob *)&rinfo->typelib->data[rinfo->offset];
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->object_blob_size
+      + (blob->n_interfaces + blob->n_interfaces % 2) * 2
+      + blob->n_fields * header->field_blob_size
+      + blob->n_properties * header->property_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FUNCTION,
+			    blob->n_methods, (GIBaseInfo *)method);
+}
+
 /**
  * g_object_info_find_method:
  * @info: a #GIObjectInfo
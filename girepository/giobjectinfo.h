@@ -84,12 +84,18 @@ GIInterfaceInfo * g_object_info_get_interface    (GIObjectInfo *info,
 gint              g_object_info_get_n_fields     (GIObjectInfo *info);
 GIFieldInfo *     g_object_info_get_field        (GIObjectInfo *info,
 						  gint          n);
+gboolean          g_object_info_iterate_fields   (GIObjectInfo *info,
+						  GIInfoIter   *iterator,
+						  GIFieldInfo  *field);
 gint              g_object_info_get_n_properties (GIObjectInfo *info);
 GIPropertyInfo *  g_object_info_get_property     (GIObjectInfo *info,
 						  gint          n);
 gint              g_object_info_get_n_methods    (GIObjectInfo *info);
 GIFunctionInfo *  g_object_info_get_method       (GIObjectInfo *info,
 						  gint          n);
+gboolean          g_object_info_iterate_methods  (GIObjectInfo   *info,
+						  GIInfoIter     *iterator,
+						  GIFunctionInfo *method);
 GIFunctionInfo *  g_object_info_find_method      (GIObjectInfo *info,
 						  const gchar  *name);
 
@@ -98,6 +98,12 @@ void         _g_type_info_init  (GIBaseInfo   *info,
 				 GITypelib     *typelib,
 				 guint32       offset);
 
+gboolean     _g_info_iter_next  (GIInfoIter   *iterator,
+				 GIBaseInfo   *container,
+				 GIInfoType    type,
+				 gint          n_infos,
+				 GIBaseInfo   *info);
+
 GIFunctionInfo * _g_base_info_find_method (GIBaseInfo   *base,
 					   guint32       offset,
 					   gint          n_methods,
@@ -108,6 +114,23 @@ GIVFuncInfo * _g_base_info_find_vfunc (GIRealInfo   *rinfo,
 				       gint          n_vfuncs,
 				       const gchar  *name);
 
+typedef struct _GIPreparedCall GIPreparedCall;
+
+GIPreparedCall * _g_callable_info_prepare_call (GICallableInfo *info,
+						gpointer        function,
+						gboolean        is_method,
+						gboolean        throws);
+
+void         _g_prepared_call_free   (GIPreparedCall    *call);
+
+gboolean     _g_prepared_call_invoke (GIPreparedCall    *call,
+				      const GIArgument  *in_args,
+				      int                n_in_args,
+				      const GIArgument  *out_args,
+				      int                n_out_args,
+				      GIArgument        *return_value,
+				      GError           **error);
+
 extern ffi_status ffi_prep_closure_loc (ffi_closure *,
                                         ffi_cif *,
                                         void (*fun)(ffi_cif *, void *, void **, void *),
@@ -25,8 +25,12 @@
 #include <string.h>
 #include <stdlib.h>
 
+#include <sys/stat.h>
+#include <time.h>
+
 #include <glib.h>
 #include <glib/gprintf.h>
+#include <glib/gstdio.h>
 #include <gmodule.h>
 #include "girepository.h"
 #include "gitypelib-internal.h"
@@ -39,6 +43,12 @@ static GStaticMutex globals_lock = G_STATIC_MUTEX_INIT;
 static GIRepository *default_repository = NULL;
 static GSList *search_path = NULL;
 static GSList *override_search_path = NULL;
+static GKeyFile *validation_cache = NULL;
+static GHashTable *typelib_dir_indexes = NULL; /* (string) directory -> TypelibDirIndex */
+
+#define VALIDATE_FLAGS (G_IREPOSITORY_LOAD_FLAG_VALIDATE | \
+			G_IREPOSITORY_LOAD_FLAG_VALIDATE_ON_ACCESS)
+#define VALIDATION_CACHE_GROUP "Validated"
 
 struct _GIRepositoryPrivate
 {
@@ -46,6 +56,8 @@ struct _GIRepositoryPrivate
   GHashTable *lazy_typelibs; /* (string) namespace-version -> GITypelib */
   GHashTable *info_by_gtype; /* GType -> GIBaseInfo */
   GHashTable *info_by_error_domain; /* GQuark -> GIBaseInfo */
+  GHashTable *unknown_gtypes; /* hashset of GType */
+  GHashTable *unknown_error_domains; /* hashset of GQuark */
 };
 
 G_DEFINE_TYPE (GIRepository, g_irepository, G_TYPE_OBJECT);
@@ -104,6 +116,8 @@ g_irepository_init (GIRepository *repository)
     = g_hash_table_new_full (g_direct_hash, g_direct_equal,
                              (GDestroyNotify) NULL,
                              (GDestroyNotify) g_base_info_unref);
+  repository->priv->unknown_gtypes = g_hash_table_new (NULL, NULL);
+  repository->priv->unknown_error_domains = g_hash_table_new (NULL, NULL);
 }
 
 static void
@@ -115,6 +129,8 @@ g_irepository_finalize (GObject *object)
   g_hash_table_destroy (repository->priv->lazy_typelibs);
   g_hash_table_destroy (repository->priv->info_by_gtype);
   g_hash_table_destroy (repository->priv->info_by_error_domain);
+  g_hash_table_destroy (repository->priv->unknown_gtypes);
+  g_hash_table_destroy (repository->priv->unknown_error_domains);
 
   (* G_OBJECT_CLASS (g_irepository_parent_class)->finalize) (G_OBJECT (repository));
 }
@@ -325,9 +341,157 @@ get_registered (GIRepository *repository,
   return get_registered_status (repository, namespace, version, TRUE, NULL, NULL);
 }
 
+static char *
+get_validation_cache_path (void)
+{
+  const char *path;
+
+  path = g_getenv ("GI_TYPELIB_VALIDATION_CACHE");
+  if (path != NULL)
+    return g_strdup (path);
+
+  return g_build_filename (g_get_user_cache_dir (), "gobject-introspection",
+			   "validated-typelibs", NULL);
+}
+
+/* Identifies the contents of a typelib file; if any of these change
+ * the file has to be validated again.
+ */
+static char *
+get_validation_key (GITypelib  *typelib,
+		    const char *path)
+{
+  struct stat st;
+  char *checksum;
+  char *key;
+
+  if (g_stat (path, &st) != 0)
+    return NULL;
+
+  checksum = g_compute_checksum_for_data (G_CHECKSUM_SHA256,
+					  typelib->data, typelib->len);
+  key = g_strdup_printf ("%" G_GUINT64_FORMAT " %" G_GUINT64_FORMAT
+			 " %" G_GINT64_FORMAT " %s",
+			 (guint64) st.st_ino, (guint64) st.st_size,
+			 (gint64) st.st_mtime, checksum);
+  g_free (checksum);
+  return key;
+}
+
+static gboolean
+validation_cache_lookup (const char *path,
+			 const char *key)
+{
+  char *cached;
+  gboolean found;
+
+  g_static_mutex_lock (&globals_lock);
+
+  if (validation_cache == NULL)
+    {
+      char *cache_path = get_validation_cache_path ();
+
+      /* A missing or unreadable cache just means validating again */
+      validation_cache = g_key_file_new ();
+      g_key_file_load_from_file (validation_cache, cache_path,
+				 G_KEY_FILE_NONE, NULL);
+      g_free (cache_path);
+    }
+
+  cached = g_key_file_get_string (validation_cache, VALIDATION_CACHE_GROUP,
+				  path, NULL);
+  found = cached != NULL && strcmp (cached, key) == 0;
+  g_free (cached);
+
+  g_static_mutex_unlock (&globals_lock);
+
+  return found;
+}
+
+static void
+validation_cache_store (const char *path,
+			const char *key)
+{
+  char *cache_path;
+  char *cache_dir;
+  char *data;
+  gsize length;
+
+  g_static_mutex_lock (&globals_lock);
+
+  g_key_file_set_string (validation_cache, VALIDATION_CACHE_GROUP, path, key);
+  data = g_key_file_to_data (validation_cache, &length, NULL);
+
+  /* Failing to write the cache only costs time on the next load */
+  cache_path = get_validation_cache_path ();
+  cache_dir = g_path_get_dirname (cache_path);
+  if (g_mkdir_with_parents (cache_dir, 0700) == 0)
+    g_file_set_contents (cache_path, data, length, NULL);
+
+  g_free (cache_dir);
+  g_free (cache_path);
+  g_free (data);
+
+  g_static_mutex_unlock (&globals_lock);
+}
+
+/* Validates @typelib as requested by @flags.  Results for typelib
+ * files, that is, when @path is not %NULL, are cached on disk; see
+ * get_validation_key().
+ */
+static gboolean
+validate_typelib (GITypelib             *typelib,
+		  const char            *path,
+		  GIRepositoryLoadFlags  flags,
+		  GError               **error)
+{
+  char *key = NULL;
+  gboolean valid;
+
+  if ((flags & VALIDATE_FLAGS) == 0)
+    return TRUE;
+
+  /* Namespaces that are required again may have been validated already */
+  if (typelib->validated ||
+      ((flags & G_IREPOSITORY_LOAD_FLAG_VALIDATE) == 0 &&
+       typelib->entry_status != NULL))
+    return TRUE;
+
+  if (path != NULL)
+    {
+      key = get_validation_key (typelib, path);
+      if (key != NULL && validation_cache_lookup (path, key))
+	{
+	  g_free (key);
+	  typelib->validated = TRUE;
+	  return TRUE;
+	}
+    }
+
+  if (flags & G_IREPOSITORY_LOAD_FLAG_VALIDATE)
+    {
+      valid = g_typelib_validate (typelib, error);
+      if (valid)
+	{
+	  typelib->validated = TRUE;
+	  /* Nothing left to check on access */
+	  g_free (typelib->entry_status);
+	  typelib->entry_status = NULL;
+	  if (key != NULL)
+	    validation_cache_store (path, key);
+	}
+    }
+  else
+    valid = _g_typelib_validate_on_access (typelib, error);
+
+  g_free (key);
+  return valid;
+}
+
 static gboolean
 load_dependencies_recurse (GIRepository *repository,
 			   GITypelib     *typelib,
+			   GIRepositoryLoadFlags validate_flags,
 			   GError      **error)
 {
   char **dependencies;
@@ -350,7 +514,7 @@ load_dependencies_recurse (GIRepository *repository,
 	  dependency_version = last_dash+1;
 
 	  if (!g_irepository_require (repository, dependency_namespace, dependency_version,
-				      0, error))
+				      validate_flags, error))
 	    {
 	      g_free (dependency_namespace);
 	      g_strfreev (dependencies);
@@ -367,6 +531,7 @@ static const char *
 register_internal (GIRepository *repository,
 		   const char   *source,
 		   gboolean      lazy,
+		   GIRepositoryLoadFlags validate_flags,
 		   GITypelib     *typelib,
 		   GError      **error)
 {
@@ -394,7 +559,7 @@ register_internal (GIRepository *repository,
       char *key;
 
       /* First, try loading all the dependencies */
-      if (!load_dependencies_recurse (repository, typelib, error))
+      if (!load_dependencies_recurse (repository, typelib, validate_flags, error))
 	return NULL;
 
       /* Check if we are transitioning from lazily loaded state */
@@ -408,6 +573,10 @@ register_internal (GIRepository *repository,
       g_hash_table_insert (repository->priv->typelibs, key, (void *)typelib);
     }
 
+  /* Anything we failed to find before might be in this typelib */
+  g_hash_table_remove_all (repository->priv->unknown_gtypes);
+  g_hash_table_remove_all (repository->priv->unknown_error_domains);
+
   return namespace;
 }
 
@@ -453,6 +622,7 @@ g_irepository_load_typelib (GIRepository *repository,
   gboolean allow_lazy = flags & G_IREPOSITORY_LOAD_FLAG_LAZY;
   gboolean is_lazy;
   char *version_conflict;
+  GITypelib *registered;
 
   repository = get_repository (repository);
 
@@ -460,8 +630,9 @@ g_irepository_load_typelib (GIRepository *repository,
   namespace = g_typelib_get_string (typelib, header->namespace);
   nsversion = g_typelib_get_string (typelib, header->nsversion);
 
-  if (get_registered_status (repository, namespace, nsversion, allow_lazy,
-			     &is_lazy, &version_conflict))
+  registered = get_registered_status (repository, namespace, nsversion,
+				      allow_lazy, &is_lazy, &version_conflict);
+  if (registered)
     {
       if (version_conflict != NULL)
 	{
@@ -471,10 +642,17 @@ g_irepository_load_typelib (GIRepository *repository,
 		       namespace, nsversion, version_conflict);
 	  return NULL;
 	}
+      if (!validate_typelib (registered, NULL, flags, error))
+	return NULL;
       return namespace;
     }
+
+  if (!validate_typelib (typelib, NULL, flags, error))
+    return NULL;
+
   return register_internal (repository, "<builtin>",
-			    allow_lazy, typelib, error);
+			    allow_lazy, flags & VALIDATE_FLAGS,
+			    typelib, error);
 }
 
 /**
@@ -585,13 +763,72 @@ g_irepository_get_info (GIRepository *repository,
   g_return_val_if_fail (typelib != NULL, NULL);
 
   entry = g_typelib_get_dir_entry (typelib, index + 1);
-  if (entry == NULL)
+  if (entry == NULL || !_g_typelib_check_entry (typelib, entry))
     return NULL;
   return _g_info_new_full (entry->blob_type,
 			   repository,
 			   NULL, typelib, entry->offset);
 }
 
+/**
+ * g_irepository_load_info:
+ * @repository: (allow-none): A #GIRepository, may be %NULL for the default
+ * @namespace_: Namespace to inspect
+ * @index: 0-based offset into namespace metadata for entry
+ * @info: (out caller-allocates): Initialized with the entry
+ *
+ * Obtain a particular metadata entry of @namespace_; this function is
+ * a variant of g_irepository_get_info() designed for stack allocation.
+ * The infos of a namespace can be walked with a single #GIBaseInfo:
+ *
+ * <informalexample><programlisting>
+ * GIBaseInfo info;
+ * gint i, n_infos;
+ *
+ * n_infos = g_irepository_get_n_infos (repository, namespace_);
+ * for (i = 0; i < n_infos; i++)
+ *   {
+ *     if (!g_irepository_load_info (repository, namespace_, i, &amp;info))
+ *       continue;
+ *     g_print ("%s\n", g_base_info_get_name (&amp;info));
+ *   }
+ * </programlisting></informalexample>
+ *
+ * The initialized @info holds no references, so it does not need to
+ * be freed, and must not be passed to g_base_info_unref().
+ *
+ * Returns: %TRUE if @info was initialized, %FALSE if the entry could
+ * not be loaded
+ *
+ * Since: 1.34
+ */
+gboolean
+g_irepository_load_info (GIRepository *repository,
+			 const gchar  *namespace,
+			 gint          index,
+			 GIBaseInfo   *info)
+{
+  GITypelib *typelib;
+  DirEntry *entry;
+
+  g_return_val_if_fail (namespace != NULL, FALSE);
+  g_return_val_if_fail (info != NULL, FALSE);
+
+  repository = get_repository (repository);
+
+  typelib = get_registered (repository, namespace, NULL);
+
+  g_return_val_if_fail (typelib != NULL, FALSE);
+
+  entry = g_typelib_get_dir_entry (typelib, index + 1);
+  if (entry == NULL || !_g_typelib_check_entry (typelib, entry))
+    return FALSE;
+
+  _g_info_init ((GIRealInfo *)info, entry->blob_type,
+		repository, NULL, typelib, entry->offset);
+  return TRUE;
+}
+
 typedef struct {
   GIRepository *repository;
   GType type;
@@ -646,6 +883,10 @@ g_irepository_find_by_gtype (GIRepository *repository,
   if (cached != NULL)
     return g_base_info_ref (cached);
 
+  if (g_hash_table_lookup_extended (repository->priv->unknown_gtypes,
+				    (gpointer)gtype, NULL, NULL))
+    return NULL;
+
   data.repository = repository;
   data.fastpass = TRUE;
   data.type = gtype;
@@ -665,18 +906,23 @@ g_irepository_find_by_gtype (GIRepository *repository,
   if (data.result == NULL)
     g_hash_table_foreach (repository->priv->lazy_typelibs, find_by_gtype_foreach, &data);
 
-  if (data.result != NULL)
+  if (data.result == NULL ||
+      !_g_typelib_check_entry (data.result_typelib, data.result))
     {
-      cached = _g_info_new_full (data.result->blob_type,
-				 repository,
-				 NULL, data.result_typelib, data.result->offset);
-
-      g_hash_table_insert (repository->priv->info_by_gtype,
-			   (gpointer) gtype,
-			   g_base_info_ref (cached));
-      return cached;
+      /* Remembered until another typelib is registered */
+      g_hash_table_insert (repository->priv->unknown_gtypes,
+			   (gpointer)gtype, (gpointer)gtype);
+      return NULL;
     }
-  return NULL;
+
+  cached = _g_info_new_full (data.result->blob_type,
+			     repository,
+			     NULL, data.result_typelib, data.result->offset);
+
+  g_hash_table_insert (repository->priv->info_by_gtype,
+		       (gpointer) gtype,
+		       g_base_info_ref (cached));
+  return cached;
 }
 
 /**
@@ -707,13 +953,206 @@ g_irepository_find_by_name (GIRepository *repository,
   g_return_val_if_fail (typelib != NULL, NULL);
 
   entry = g_typelib_get_dir_entry_by_name (typelib, name);
-  if (entry == NULL)
+  if (entry == NULL || !_g_typelib_check_entry (typelib, entry))
     return NULL;
   return _g_info_new_full (entry->blob_type,
 			   repository,
 			   NULL, typelib, entry->offset);
 }
 
+static gint
+get_n_methods (GIBaseInfo *info)
+{
+  switch (g_base_info_get_type (info))
+    {
+    case GI_INFO_TYPE_OBJECT:
+      return g_object_info_get_n_methods ((GIObjectInfo *)info);
+    case GI_INFO_TYPE_INTERFACE:
+      return g_interface_info_get_n_methods ((GIInterfaceInfo *)info);
+    case GI_INFO_TYPE_STRUCT:
+      return g_struct_info_get_n_methods ((GIStructInfo *)info);
+    case GI_INFO_TYPE_UNION:
+      return g_union_info_get_n_methods ((GIUnionInfo *)info);
+    case GI_INFO_TYPE_ENUM:
+    case GI_INFO_TYPE_FLAGS:
+      return g_enum_info_get_n_methods ((GIEnumInfo *)info);
+    default:
+      return 0;
+    }
+}
+
+static GIFunctionInfo *
+get_method (GIBaseInfo *info,
+	    gint        n)
+{
+  switch (g_base_info_get_type (info))
+    {
+    case GI_INFO_TYPE_OBJECT:
+      return g_object_info_get_method ((GIObjectInfo *)info, n);
+    case GI_INFO_TYPE_INTERFACE:
+      return g_interface_info_get_method ((GIInterfaceInfo *)info, n);
+    case GI_INFO_TYPE_STRUCT:
+      return g_struct_info_get_method ((GIStructInfo *)info, n);
+    case GI_INFO_TYPE_UNION:
+      return g_union_info_get_method ((GIUnionInfo *)info, n);
+    case GI_INFO_TYPE_ENUM:
+    case GI_INFO_TYPE_FLAGS:
+      return g_enum_info_get_method ((GIEnumInfo *)info, n);
+    default:
+      return NULL;
+    }
+}
+
+/* Returns the function with @symbol at @method of the entry with
+ * index @entry_index, or any method of it if @method is -1.
+ */
+static GIFunctionInfo *
+find_symbol_in_entry (GIRepository *repository,
+		      GITypelib    *typelib,
+		      guint16       entry_index,
+		      gint          method,
+		      const gchar  *symbol)
+{
+  DirEntry *entry;
+  GIBaseInfo *info;
+  GIFunctionInfo *function = NULL;
+  gint i, n_methods;
+
+  entry = g_typelib_get_dir_entry (typelib, entry_index);
+  if (!_g_typelib_check_entry (typelib, entry))
+    return NULL;
+
+  info = _g_info_new_full (entry->blob_type, repository,
+			   NULL, typelib, entry->offset);
+
+  if (entry->blob_type == BLOB_TYPE_FUNCTION)
+    {
+      if (method == -1 || method == SYMBOL_INDEX_NO_METHOD)
+	function = (GIFunctionInfo *)g_base_info_ref (info);
+    }
+  else if (method == -1)
+    {
+      n_methods = get_n_methods (info);
+      for (i = 0; i < n_methods && function == NULL; i++)
+	{
+	  function = get_method (info, i);
+	  if (strcmp (g_function_info_get_symbol (function), symbol) != 0)
+	    {
+	      g_base_info_unref ((GIBaseInfo *)function);
+	      function = NULL;
+	    }
+	}
+    }
+  else if (method < get_n_methods (info))
+    function = get_method (info, method);
+
+  g_base_info_unref (info);
+
+  if (function != NULL &&
+      strcmp (g_function_info_get_symbol (function), symbol) != 0)
+    {
+      g_base_info_unref ((GIBaseInfo *)function);
+      function = NULL;
+    }
+  return function;
+}
+
+/**
+ * g_irepository_find_by_symbol:
+ * @repository: (allow-none): A #GIRepository, may be %NULL for the default
+ * @namespace_: Namespace which will be searched
+ * @symbol: C symbol of the function to find
+ *
+ * Searches for the function or method with the C symbol @symbol in a
+ * namespace, such as gtk_widget_show in Gtk.  Methods are returned with
+ * their container set.  Typelibs written by recent versions of
+ * g-ir-compiler carry an index of the symbols, for older ones this
+ * walks all the entries of the namespace.  Before calling this
+ * function for a particular namespace, you must call
+ * g_irepository_require() once to load the namespace, or otherwise
+ * ensure the namespace has already been loaded.
+ *
+ * Returns: (transfer full): #GIFunctionInfo representing metadata about
+ * @symbol, or %NULL
+ *
+ * Since: 1.34
+ */
+GIFunctionInfo *
+g_irepository_find_by_symbol (GIRepository *repository,
+			      const gchar  *namespace,
+			      const gchar  *symbol)
+{
+  GITypelib *typelib;
+  GIFunctionInfo *function;
+  guint16 entry_index, method;
+  guint16 i, n_entries;
+
+  g_return_val_if_fail (namespace != NULL, NULL);
+  g_return_val_if_fail (symbol != NULL, NULL);
+
+  repository = get_repository (repository);
+  typelib = get_registered (repository, namespace, NULL);
+  g_return_val_if_fail (typelib != NULL, NULL);
+
+  if (g_typelib_lookup_symbol (typelib, symbol, &entry_index, &method))
+    {
+      if (entry_index == 0)
+	return NULL;
+      return find_symbol_in_entry (repository, typelib,
+				   entry_index, method, symbol);
+    }
+
+  n_entries = ((Header *)typelib->data)->n_local_entries;
+  for (i = 1; i <= n_entries; i++)
+    {
+      function = find_symbol_in_entry (repository, typelib, i, -1, symbol);
+      if (function != NULL)
+	return function;
+    }
+  return NULL;
+}
+
+/**
+ * g_irepository_load_info_by_name:
+ * @repository: (allow-none): A #GIRepository, may be %NULL for the default
+ * @namespace_: Namespace which will be searched
+ * @name: Entry name to find
+ * @info: (out caller-allocates): Initialized with the entry
+ *
+ * Searches for a particular entry in a namespace; this function is a
+ * variant of g_irepository_find_by_name() designed for stack
+ * allocation, see g_irepository_load_info().
+ *
+ * Returns: %TRUE if @info was initialized, %FALSE if there is no
+ * entry @name
+ *
+ * Since: 1.34
+ */
+gboolean
+g_irepository_load_info_by_name (GIRepository *repository,
+				 const gchar  *namespace,
+				 const gchar  *name,
+				 GIBaseInfo   *info)
+{
+  GITypelib *typelib;
+  DirEntry *entry;
+
+  g_return_val_if_fail (namespace != NULL, FALSE);
+  g_return_val_if_fail (info != NULL, FALSE);
+
+  repository = get_repository (repository);
+  typelib = get_registered (repository, namespace, NULL);
+  g_return_val_if_fail (typelib != NULL, FALSE);
+
+  entry = g_typelib_get_dir_entry_by_name (typelib, name);
+  if (entry == NULL || !_g_typelib_check_entry (typelib, entry))
+    return FALSE;
+
+  _g_info_init ((GIRealInfo *)info, entry->blob_type,
+		repository, NULL, typelib, entry->offset);
+  return TRUE;
+}
+
 typedef struct {
   GIRepository *repository;
   GQuark domain;
@@ -768,6 +1207,10 @@ g_irepository_find_by_error_domain (GIRepository *repository,
   if (cached != NULL)
     return g_base_info_ref ((GIBaseInfo *)cached);
 
+  if (g_hash_table_lookup_extended (repository->priv->unknown_error_domains,
+				    GUINT_TO_POINTER (domain), NULL, NULL))
+    return NULL;
+
   data.repository = repository;
   data.domain = domain;
   data.result_typelib = NULL;
@@ -777,18 +1220,22 @@ g_irepository_find_by_error_domain (GIRepository *repository,
   if (data.result == NULL)
     g_hash_table_foreach (repository->priv->lazy_typelibs, find_by_error_domain_foreach, &data);
 
-  if (data.result != NULL)
+  if (data.result == NULL ||
+      !_g_typelib_check_entry (data.result_typelib, data.result))
     {
-      cached = _g_info_new_full (data.result->blob_type,
-				 repository,
-				 NULL, data.result_typelib, data.result->offset);
-
-      g_hash_table_insert (repository->priv->info_by_error_domain,
-			   GUINT_TO_POINTER (domain),
-			   g_base_info_ref (cached));
-      return cached;
+      g_hash_table_insert (repository->priv->unknown_error_domains,
+			   GUINT_TO_POINTER (domain), GUINT_TO_POINTER (domain));
+      return NULL;
     }
-  return NULL;
+
+  cached = _g_info_new_full (data.result->blob_type,
+			     repository,
+			     NULL, data.result_typelib, data.result->offset);
+
+  g_hash_table_insert (repository->priv->info_by_error_domain,
+		       GUINT_TO_POINTER (domain),
+		       g_base_info_ref (cached));
+  return cached;
 }
 
 static void
@@ -1048,6 +1495,128 @@ compare_version (const char *v1,
   return 0;
 }
 
+/* The typelibs found in one search path directory.  Listing the
+ * directory is only repeated when its modification time changes.
+ */
+typedef struct {
+  time_t mtime;
+  gboolean racy;
+  GHashTable *versions; /* (string) namespace -> GSList of (string) version */
+} TypelibDirIndex;
+
+static void
+free_version_list (GSList *versions)
+{
+  g_slist_foreach (versions, (GFunc) g_free, NULL);
+  g_slist_free (versions);
+}
+
+static void
+typelib_dir_index_free (TypelibDirIndex *index)
+{
+  g_hash_table_destroy (index->versions);
+  g_slice_free (TypelibDirIndex, index);
+}
+
+static void
+typelib_dir_index_scan (TypelibDirIndex *index,
+			const char      *dirname)
+{
+  GDir *dir;
+  const char *entry;
+
+  g_hash_table_remove_all (index->versions);
+
+  dir = g_dir_open (dirname, 0, NULL);
+  if (dir == NULL)
+    return;
+
+  while ((entry = g_dir_read_name (dir)) != NULL)
+    {
+      const char *last_dash;
+      const char *name_end;
+      char *namespace, *version;
+      GSList *versions;
+      int major, minor;
+
+      if (!g_str_has_suffix (entry, ".typelib"))
+	continue;
+
+      name_end = strrchr (entry, '.');
+      last_dash = strrchr (entry, '-');
+      if (last_dash == NULL || last_dash == entry)
+	continue;
+
+      version = g_strndup (last_dash+1, name_end-(last_dash+1));
+      if (!parse_version (version, &major, &minor))
+	{
+	  g_free (version);
+	  continue;
+	}
+
+      namespace = g_strndup (entry, last_dash - entry);
+      versions = g_hash_table_lookup (index->versions, namespace);
+      if (versions != NULL)
+	{
+	  /* Appending to a non-empty list keeps its head */
+	  versions = g_slist_append (versions, version);
+	  g_free (namespace);
+	}
+      else
+	g_hash_table_insert (index->versions, namespace,
+			     g_slist_prepend (NULL, version));
+    }
+  g_dir_close (dir);
+}
+
+/* Returns the versions of @namespace found in @dirname, as a list of
+ * newly allocated strings.  Called with globals_lock held.
+ */
+static GSList *
+typelib_dir_index_lookup (const char *dirname,
+			  const char *namespace)
+{
+  TypelibDirIndex *index;
+  struct stat st;
+  GSList *versions, *link, *result = NULL;
+
+  if (g_stat (dirname, &st) != 0)
+    return NULL;
+
+  if (typelib_dir_indexes == NULL)
+    typelib_dir_indexes = g_hash_table_new_full (g_str_hash, g_str_equal,
+						 (GDestroyNotify) g_free,
+						 (GDestroyNotify) typelib_dir_index_free);
+
+  index = g_hash_table_lookup (typelib_dir_indexes, dirname);
+  if (index == NULL)
+    {
+      index = g_slice_new0 (TypelibDirIndex);
+      index->versions = g_hash_table_new_full (g_str_hash, g_str_equal,
+					       (GDestroyNotify) g_free,
+					       (GDestroyNotify) free_version_list);
+      index->racy = TRUE;
+      g_hash_table_insert (typelib_dir_indexes, g_strdup (dirname), index);
+    }
+
+  if (index->racy || index->mtime != st.st_mtime)
+    {
+      typelib_dir_index_scan (index, dirname);
+      index->mtime = st.st_mtime;
+      /* The modification time has a granularity of a second, so a
+       * typelib added within the second of the scan could go unnoticed;
+       * scan such a directory again next time.
+       */
+      index->racy = st.st_mtime >= time (NULL) - 1;
+    }
+
+  versions = g_hash_table_lookup (index->versions, namespace);
+  for (link = versions; link; link = link->next)
+    result = g_slist_prepend (result, g_strdup (link->data));
+
+  return result;
+}
+
 struct NamespaceVersionCandidadate
 {
   GMappedFile *mfile;
@@ -1084,94 +1653,62 @@ compare_candidate_reverse (struct NamespaceVersionCandidadate *c1,
 static void
 free_candidate (struct NamespaceVersionCandidadate *candidate)
 {
-  g_mapped_file_unref (candidate->mfile);
+  if (candidate->mfile)
+    g_mapped_file_unref (candidate->mfile);
   g_free (candidate->path);
   g_free (candidate->version);
   g_slice_free (struct NamespaceVersionCandidadate, candidate);
 }
 
+/* Returns the candidates for @namespace on @search_path, without
+ * mapping the files; the first directory providing a version wins.
+ */
 static GSList *
 enumerate_namespace_versions (const gchar *namespace,
 			      GSList      *search_path)
 {
   GSList *candidates = NULL;
   GHashTable *found_versions = g_hash_table_new (g_str_hash, g_str_equal);
-  char *namespace_dash;
-  char *namespace_typelib;
   GSList *ldir;
-  GError *error = NULL;
   int index;
 
-  namespace_dash = g_strdup_printf ("%s-", namespace);
-  namespace_typelib = g_strdup_printf ("%s.typelib", namespace);
-
   index = 0;
   for (ldir = search_path; ldir; ldir = ldir->next)
     {
-      GDir *dir;
       const char *dirname;
-      const char *entry;
+      GSList *versions, *link;
 
       dirname = (const char*)ldir->data;
-      dir = g_dir_open (dirname, 0, NULL);
-      if (dir == NULL)
-	continue;
-      while ((entry = g_dir_read_name (dir)) != NULL)
-	{
-	  GMappedFile *mfile;
-	  char *path, *version;
-	  struct NamespaceVersionCandidadate *candidate;
 
-	  if (!g_str_has_suffix (entry, ".typelib"))
-	    continue;
+      g_static_mutex_lock (&globals_lock);
+      versions = typelib_dir_index_lookup (dirname, namespace);
+      g_static_mutex_unlock (&globals_lock);
 
-	  if (g_str_has_prefix (entry, namespace_dash))
-	    {
-	      const char *last_dash;
-	      const char *name_end;
-	      int major, minor;
-
-	      name_end = strrchr (entry, '.');
-	      last_dash = strrchr (entry, '-');
-	      version = g_strndup (last_dash+1, name_end-(last_dash+1));
-	      if (!parse_version (version, &major, &minor))
-		{
-		  g_free (version);
-		  continue;
-		}
-	    }
-	  else
-	    continue;
+      for (link = versions; link; link = link->next)
+	{
+	  char *version = link->data;
+	  char *fname;
+	  struct NamespaceVersionCandidadate *candidate;
 
 	  if (g_hash_table_lookup (found_versions, version) != NULL)
 	    {
 	      g_free (version);
 	      continue;
 	    }
-	  g_hash_table_insert (found_versions, version, version);
 
-	  path = g_build_filename (dirname, entry, NULL);
-	  mfile = g_mapped_file_new (path, FALSE, &error);
-	  if (mfile == NULL)
-	    {
-	      g_free (path);
-	      g_free (version);
-	      g_clear_error (&error);
-	      continue;
-	    }
+	  fname = g_strdup_printf ("%s-%s.typelib", namespace, version);
 	  candidate = g_slice_new0 (struct NamespaceVersionCandidadate);
-	  candidate->mfile = mfile;
 	  candidate->path_index = index;
-	  candidate->path = path;
+	  candidate->path = g_build_filename (dirname, fname, NULL);
 	  candidate->version = version;
 	  candidates = g_slist_prepend (candidates, candidate);
+	  g_hash_table_insert (found_versions, version, version);
+	  g_free (fname);
 	}
-      g_dir_close (dir);
+      g_slist_free (versions);
       index++;
     }
 
-  g_free (namespace_dash);
-  g_free (namespace_typelib);
   g_hash_table_destroy (found_versions);
 
   return candidates;
@@ -1183,30 +1720,34 @@ find_namespace_latest (const gchar  *namespace,
 		       gchar       **version_ret,
 		       gchar       **path_ret)
 {
-  GSList *candidates;
+  GSList *candidates, *link;
   GMappedFile *result = NULL;
 
   *version_ret = NULL;
   *path_ret = NULL;
 
   candidates = enumerate_namespace_versions (namespace, search_path);
+  candidates = g_slist_sort (candidates, (GCompareFunc) compare_candidate_reverse);
 
-  if (candidates != NULL)
+  /* Only map the file we are going to use; fall back to the next
+   * best candidate if it can't be read */
+  for (link = candidates; link; link = link->next)
     {
-      struct NamespaceVersionCandidadate *elected;
-      candidates = g_slist_sort (candidates, (GCompareFunc) compare_candidate_reverse);
-
-      elected = (struct NamespaceVersionCandidadate *) candidates->data;
-      /* Remove the elected one so we don't try to free its contents */
-      candidates = g_slist_delete_link (candidates, candidates);
-
-      result = elected->mfile;
-      *path_ret = elected->path;
-      *version_ret = elected->version;
-      g_slice_free (struct NamespaceVersionCandidadate, elected); /* just free the container */
-      g_slist_foreach (candidates, (GFunc) free_candidate, NULL);
-      g_slist_free (candidates);
+      struct NamespaceVersionCandidadate *candidate = link->data;
+
+      result = g_mapped_file_new (candidate->path, FALSE, NULL);
+      if (result == NULL)
+	continue;
+
+      *path_ret = candidate->path;
+      *version_ret = candidate->version;
+      candidate->path = NULL;
+      candidate->version = NULL;
+      break;
     }
+
+  g_slist_foreach (candidates, (GFunc) free_candidate, NULL);
+  g_slist_free (candidates);
   return result;
 }
 
@@ -1281,7 +1822,21 @@ require_internal (GIRepository  *repository,
   typelib = get_registered_status (repository, namespace, version, allow_lazy,
                                    &is_lazy, &version_conflict);
   if (typelib)
-    return typelib;
+    {
+      GError *temp_error = NULL;
+
+      /* It may have been loaded without validation */
+      if (!validate_typelib (typelib, NULL, flags, &temp_error))
+	{
+	  g_set_error (error, G_IREPOSITORY_ERROR,
+		       G_IREPOSITORY_ERROR_TYPELIB_INVALID,
+		       "Typelib for namespace '%s' is invalid: %s",
+		       namespace, temp_error->message);
+	  g_clear_error (&temp_error);
+	  return NULL;
+	}
+      return typelib;
+    }
 
   if (version_conflict != NULL)
     {
@@ -1357,8 +1912,22 @@ require_internal (GIRepository  *repository,
       goto out;
     }
 
+  {
+    GError *temp_error = NULL;
+    if (!validate_typelib (typelib, path, flags, &temp_error))
+      {
+	g_set_error (error, G_IREPOSITORY_ERROR,
+		     G_IREPOSITORY_ERROR_TYPELIB_INVALID,
+		     "Failed to load typelib file '%s' for namespace '%s': %s",
+		     path, namespace, temp_error->message);
+	g_clear_error (&temp_error);
+	g_typelib_free (typelib);
+	goto out;
+      }
+  }
+
   if (!register_internal (repository, path, allow_lazy,
-			  typelib, error))
+			  flags & VALIDATE_FLAGS, typelib, error))
     {
       g_typelib_free (typelib);
       goto out;
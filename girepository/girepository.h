@@ -76,13 +76,24 @@ struct _GIRepositoryClass
 /**
  * GIRepositoryLoadFlags:
  * @G_IREPOSITORY_LOAD_FLAG_LAZY: Load the types lazily.
+ * @G_IREPOSITORY_LOAD_FLAG_VALIDATE: Validate the whole typelib when it
+ * is loaded.  Typelib files that were validated before and have not
+ * changed since are not validated again.  Since: 1.34
+ * @G_IREPOSITORY_LOAD_FLAG_VALIDATE_ON_ACCESS: Validate the header and
+ * directory of the typelib when it is loaded, and each entry the first
+ * time it is looked up.  Since: 1.34
+ *
+ * A namespace that is already loaded is validated when it is required
+ * again with one of the validation flags.
  *
  * Flags that controlls how a typelib is loaded by
  * GIRepositry, used by g_irepository_load_typelib().
  */
 typedef enum
 {
-  G_IREPOSITORY_LOAD_FLAG_LAZY = 1 << 0
+  G_IREPOSITORY_LOAD_FLAG_LAZY = 1 << 0,
+  G_IREPOSITORY_LOAD_FLAG_VALIDATE = 1 << 1,
+  G_IREPOSITORY_LOAD_FLAG_VALIDATE_ON_ACCESS = 1 << 2
 } GIRepositoryLoadFlags;
 
 /* Repository */
@@ -121,11 +132,22 @@ GIBaseInfo *  g_irepository_find_by_gtype (GIRepository *repository,
 					   GType         gtype);
 gint          g_irepository_get_n_infos   (GIRepository *repository,
 					   const gchar  *namespace_);
+gboolean      g_irepository_load_info     (GIRepository *repository,
+					   const gchar  *namespace_,
+					   gint          index,
+					   GIBaseInfo   *info);
+gboolean      g_irepository_load_info_by_name (GIRepository *repository,
+					       const gchar  *namespace_,
+					       const gchar  *name,
+					       GIBaseInfo   *info);
 GIBaseInfo *  g_irepository_get_info      (GIRepository *repository,
 					   const gchar  *namespace_,
 					   gint          index);
 GIEnumInfo *  g_irepository_find_by_error_domain (GIRepository *repository,
 						  GQuark        domain);
+GIFunctionInfo * g_irepository_find_by_symbol (GIRepository *repository,
+					       const gchar  *namespace_,
+					       const gchar  *symbol);
 const gchar * g_irepository_get_typelib_path   (GIRepository *repository,
 						const gchar  *namespace_);
 const gchar * g_irepository_get_shared_library (GIRepository *repository,
@@ -148,13 +170,16 @@ gboolean       g_irepository_dump  (const char *arg, GError **error);
  * typelib does not match the requested version.
  * @G_IREPOSITORY_ERROR_LIBRARY_NOT_FOUND: the library used by the typelib
  * could not be found.
+ * @G_IREPOSITORY_ERROR_TYPELIB_INVALID: the typelib failed validation,
+ * see %G_IREPOSITORY_LOAD_FLAG_VALIDATE.  Since: 1.34
  */
 typedef enum
 {
   G_IREPOSITORY_ERROR_TYPELIB_NOT_FOUND,
   G_IREPOSITORY_ERROR_NAMESPACE_MISMATCH,
   G_IREPOSITORY_ERROR_NAMESPACE_VERSION_CONFLICT,
-  G_IREPOSITORY_ERROR_LIBRARY_NOT_FOUND
+  G_IREPOSITORY_ERROR_LIBRARY_NOT_FOUND,
+  G_IREPOSITORY_ERROR_TYPELIB_INVALID
 } GIRepositoryError;
 
 #define G_IREPOSITORY_ERROR (g_irepository_error_quark ())
@@ -30,7 +30,7 @@
 #define ALIGN_VALUE(this, boundary) \
   (( ((unsigned long)(this)) + (((unsigned long)(boundary)) -1)) & (~(((unsigned long)(boundary))-1)))
 
-#define NUM_SECTIONS 2
+#define NUM_SECTIONS 4
 
 GIrModule *
 _g_ir_module_new (const gchar *name,
@@ -187,8 +187,8 @@ write_attribute (gpointer key, gpointer value, gpointer datap)
   *(data->offset) += sizeof (AttributeBlob);
 
   blob->offset = data->node->offset;
-  blob->name = _g_ir_write_string ((const char*) key, data->strings, data->databuf, data->offset2);
-  blob->value = _g_ir_write_string ((const char*) value, data->strings, data->databuf, data->offset2);
+  blob->name = _g_ir_write_string ((const char*) key, data->strings, data->databuf, data->offset2, G_IR_STRING_ATTRIBUTE);
+  blob->value = _g_ir_write_string ((const char*) value, data->strings, data->databuf, data->offset2, G_IR_STRING_ATTRIBUTE);
 
   data->count++;
 }
@@ -291,6 +291,198 @@ add_directory_index_section (guint8 *data, GIrModule *module, guint32 *offset2)
   return data;
 }
 
+static guint8*
+add_gtype_index_section (guint8 *data, GIrModule *module, guint32 *offset2)
+{
+  DirEntry *entry;
+  Header *header = (Header*)data;
+  GITypelibHashBuilder *gtype_builder;
+  guint i, n_interfaces, n_gtypes;
+  guint16 required_size;
+  guint32 new_offset;
+
+  gtype_builder = _gi_typelib_hash_builder_new ();
+
+  n_interfaces = header->n_local_entries;
+  n_gtypes = 0;
+
+  for (i = 0; i < n_interfaces; i++)
+    {
+      RegisteredTypeBlob *blob;
+      const char *str;
+
+      entry = (DirEntry *)&data[header->directory + (i * header->entry_blob_size)];
+      if (!BLOB_IS_REGISTERED_TYPE (entry))
+        continue;
+
+      blob = (RegisteredTypeBlob *)&data[entry->offset];
+      if (!blob->gtype_name)
+        continue;
+
+      str = (const char *) (&data[blob->gtype_name]);
+      _gi_typelib_hash_builder_add_string (gtype_builder, str, i);
+      n_gtypes++;
+    }
+
+  /* Typelibs without any registered types (e.g. cairo) just don't
+   * get the section; lookups then fall back to the linear scan.
+   */
+  if (n_gtypes == 0 || !_gi_typelib_hash_builder_prepare (gtype_builder))
+    {
+      _gi_typelib_hash_builder_destroy (gtype_builder);
+      return data;
+    }
+
+  alloc_section (data, GI_SECTION_GTYPE_INDEX, *offset2);
+
+  required_size = _gi_typelib_hash_builder_get_buffer_size (gtype_builder);
+
+  new_offset = *offset2 + ALIGN_VALUE (required_size, 4);
+
+  data = g_realloc (data, new_offset);
+
+  _gi_typelib_hash_builder_pack (gtype_builder, ((guint8*)data) + *offset2, required_size);
+
+  *offset2 = new_offset;
+
+  _gi_typelib_hash_builder_destroy (gtype_builder);
+  return data;
+}
+
+static void
+add_symbol (GITypelibHashBuilder *builder,
+	    GArray               *records,
+	    GHashTable           *seen,
+	    const char           *symbol,
+	    guint16               entry,
+	    guint16               method)
+{
+  SymbolIndexBlob record;
+
+  /* A symbol can only map to one function; the first one wins, like
+   * the linear scan done for typelibs without the index */
+  if (symbol == NULL || g_hash_table_lookup (seen, symbol) != NULL)
+    return;
+  g_hash_table_insert (seen, (gpointer) symbol, (gpointer) symbol);
+
+  record.entry = entry;
+  record.method = method;
+  _gi_typelib_hash_builder_add_string (builder, symbol, records->len);
+  g_array_append_val (records, record);
+}
+
+static void
+add_method_symbols (GITypelibHashBuilder *builder,
+		    GArray               *records,
+		    GHashTable           *seen,
+		    GList                *members,
+		    guint16               entry)
+{
+  GList *l;
+  guint16 method = 0;
+
+  /* Methods are written in the order of the member list, see
+   * _g_ir_node_build_members() */
+  for (l = members; l; l = l->next)
+    {
+      GIrNode *member = l->data;
+
+      if (member->type != G_IR_NODE_FUNCTION)
+	continue;
+      add_symbol (builder, records, seen,
+		  ((GIrNodeFunction *)member)->symbol, entry, method);
+      method++;
+    }
+}
+
+static guint8*
+add_symbol_index_section (guint8 *data, GIrModule *module, guint32 *offset2)
+{
+  Header *header = (Header*)data;
+  GITypelibHashBuilder *symbol_builder;
+  GArray *records;
+  GHashTable *seen;
+  GList *e;
+  guint16 i;
+  guint32 records_size, required_size;
+  guint32 new_offset;
+
+  symbol_builder = _gi_typelib_hash_builder_new ();
+  records = g_array_new (FALSE, FALSE, sizeof (SymbolIndexBlob));
+  seen = g_hash_table_new (g_str_hash, g_str_equal);
+
+  for (e = module->entries, i = 1;
+       e && i <= header->n_local_entries;
+       e = e->next, i++)
+    {
+      GIrNode *node = e->data;
+
+      switch (node->type)
+	{
+	case G_IR_NODE_FUNCTION:
+	  add_symbol (symbol_builder, records, seen,
+		      ((GIrNodeFunction *)node)->symbol,
+		      i, SYMBOL_INDEX_NO_METHOD);
+	  break;
+	case G_IR_NODE_OBJECT:
+	case G_IR_NODE_INTERFACE:
+	  add_method_symbols (symbol_builder, records, seen,
+			      ((GIrNodeInterface *)node)->members, i);
+	  break;
+	case G_IR_NODE_STRUCT:
+	  add_method_symbols (symbol_builder, records, seen,
+			      ((GIrNodeStruct *)node)->members, i);
+	  break;
+	case G_IR_NODE_UNION:
+	  add_method_symbols (symbol_builder, records, seen,
+			      ((GIrNodeUnion *)node)->members, i);
+	  break;
+	case G_IR_NODE_ENUM:
+	case G_IR_NODE_FLAGS:
+	  add_method_symbols (symbol_builder, records, seen,
+			      ((GIrNodeEnum *)node)->methods, i);
+	  break;
+	default:
+	  break;
+	}
+
+      /* The hash values are only 16 bits wide */
+      if (records->len > G_MAXUINT16)
+	break;
+    }
+
+  /* Without any functions, or with too many of them, the section is
+   * left out and lookups fall back to walking the entries.
+   */
+  if (records->len == 0 || records->len > G_MAXUINT16 ||
+      !_gi_typelib_hash_builder_prepare (symbol_builder))
+    goto out;
+
+  alloc_section (data, GI_SECTION_SYMBOL_INDEX, *offset2);
+
+  records_size = 4 + records->len * sizeof (SymbolIndexBlob);
+  required_size = _gi_typelib_hash_builder_get_buffer_size (symbol_builder);
+
+  new_offset = *offset2 + records_size + ALIGN_VALUE (required_size, 4);
+
+  data = g_realloc (data, new_offset);
+
+  *(guint32 *)&data[*offset2] = records->len;
+  memcpy (&data[*offset2 + 4], records->data,
+	  records->len * sizeof (SymbolIndexBlob));
+  _gi_typelib_hash_builder_pack (symbol_builder,
+				 ((guint8*)data) + *offset2 + records_size,
+				 required_size);
+
+  *offset2 = new_offset;
+
+ out:
+  g_hash_table_destroy (seen);
+  g_array_free (records, TRUE);
+  _gi_typelib_hash_builder_destroy (symbol_builder);
+  return data;
+}
+
 GITypelib *
 _g_ir_module_build_typelib (GIrModule  *module)
 {
@@ -393,17 +585,17 @@ _g_ir_module_build_typelib (GIrModule  *module)
    * the size calculations above.
    */
   if (dependencies != NULL)
-    header->dependencies = _g_ir_write_string (dependencies, strings, data, &header_size);
+    header->dependencies = _g_ir_write_string (dependencies, strings, data, &header_size, G_IR_STRING_OTHER);
   else
     header->dependencies = 0;
   header->size = 0; /* filled in later */
-  header->namespace = _g_ir_write_string (module->name, strings, data, &header_size);
-  header->nsversion = _g_ir_write_string (module->version, strings, data, &header_size);
+  header->namespace = _g_ir_write_string (module->name, strings, data, &header_size, G_IR_STRING_OTHER);
+  header->nsversion = _g_ir_write_string (module->version, strings, data, &header_size, G_IR_STRING_OTHER);
   header->shared_library = (module->shared_library?
-                             _g_ir_write_string (module->shared_library, strings, data, &header_size)
+                             _g_ir_write_string (module->shared_library, strings, data, &header_size, G_IR_STRING_OTHER)
                              : 0);
   if (module->c_prefix != NULL)
-    header->c_prefix = _g_ir_write_string (module->c_prefix, strings, data, &header_size);
+    header->c_prefix = _g_ir_write_string (module->c_prefix, strings, data, &header_size, G_IR_STRING_OTHER);
   else
     header->c_prefix = 0;
   header->entry_blob_size = sizeof (DirEntry);
@@ -429,8 +621,8 @@ _g_ir_module_build_typelib (GIrModule  *module)
   header->sections = offset2;
 
   /* Initialize all the sections to _END/0; we fill them in later using
-   * alloc_section().  (Right now there's just the directory index
-   * though, note)
+   * alloc_section().  (Right now there's just the directory index, the
+   * GType index and the symbol index though, note)
    */
   for (i = 0; i < NUM_SECTIONS; i++)
     {
@@ -486,8 +678,8 @@ _g_ir_module_build_typelib (GIrModule  *module)
 
 	  entry->blob_type = 0;
 	  entry->local = FALSE;
-	  entry->offset = _g_ir_write_string (namespace, strings, data, &offset2);
-	  entry->name = _g_ir_write_string (node->name, strings, data, &offset2);
+	  entry->offset = _g_ir_write_string (namespace, strings, data, &offset2, G_IR_STRING_OTHER);
+	  entry->name = _g_ir_write_string (node->name, strings, data, &offset2, G_IR_STRING_NAME);
 	}
       else
 	{
@@ -497,7 +689,6 @@ _g_ir_module_build_typelib (GIrModule  *module)
 	  entry->blob_type = node->type;
 	  entry->local = TRUE;
 	  entry->offset = offset;
-	  entry->name = _g_ir_write_string (node->name, strings, data, &offset2);
 
 	  memset (&build, 0, sizeof (build));
 	  build.module = module;
@@ -508,6 +699,10 @@ _g_ir_module_build_typelib (GIrModule  *module)
 	  build.data = data;
 	  _g_ir_node_build_typelib (node, NULL, &build, &offset, &offset2);
 
+	  /* Written by the blob already, possibly as the tail of its
+	   * symbol or GType name; this just looks it up */
+	  entry->name = _g_ir_write_string (node->name, strings, data, &offset2, G_IR_STRING_NAME);
+
 	  nodes_with_attributes = build.nodes_with_attributes;
 	  header->n_attributes = build.n_attributes;
 
@@ -544,6 +739,12 @@ _g_ir_module_build_typelib (GIrModule  *module)
   data = add_directory_index_section (data, module, &offset2);
   header = (Header *)data;
 
+  data = add_gtype_index_section (data, module, &offset2);
+  header = (Header *)data;
+
+  data = add_symbol_index_section (data, module, &offset2);
+  header = (Header *)data;
+
   length = header->size = offset2;
   typelib = g_typelib_new_from_memory (data, length, &error);
   if (!typelib)
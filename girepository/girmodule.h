@@ -73,6 +73,7 @@ GITypelib * _g_ir_module_build_typelib  (GIrModule  *module);
 
 void       _g_ir_module_fatal (GIrTypelibBuild  *build, guint line, const char *msg, ...) G_GNUC_PRINTF (3, 4) G_GNUC_NORETURN;
 
+void _g_irnode_enable_stats (void);
 void _g_irnode_init_stats (void);
 void _g_irnode_dump_stats (void);
 
@@ -28,29 +28,78 @@
 #include "girnode.h"
 #include "gitypelib-internal.h"
 
+/* The statistics are shared by all modules, so they are only kept
+ * when asked for, and then only one module may be built at a time.
+ */
+static gboolean stats_enabled = FALSE;
 static gulong string_count = 0;
 static gulong unique_string_count = 0;
 static gulong string_size = 0;
 static gulong unique_string_size = 0;
 static gulong types_count = 0;
 static gulong unique_types_count = 0;
+static gulong section_string_size[G_IR_STRING_N_SECTIONS];
+static gulong section_unique_string_size[G_IR_STRING_N_SECTIONS];
+static gulong section_suffix_count[G_IR_STRING_N_SECTIONS];
+static gulong section_suffix_size[G_IR_STRING_N_SECTIONS];
+
+static const gchar *section_names[G_IR_STRING_N_SECTIONS] = {
+  "names",
+  "symbols",
+  "GType names",
+  "attributes",
+  "other strings"
+};
+
+void
+_g_irnode_enable_stats (void)
+{
+  stats_enabled = TRUE;
+}
 
 void
 _g_irnode_init_stats (void)
 {
+  if (!stats_enabled)
+    return;
+
   string_count = 0;
   unique_string_count = 0;
   string_size = 0;
   unique_string_size = 0;
   types_count = 0;
   unique_types_count = 0;
+  memset (section_string_size, 0, sizeof (section_string_size));
+  memset (section_unique_string_size, 0, sizeof (section_unique_string_size));
+  memset (section_suffix_count, 0, sizeof (section_suffix_count));
+  memset (section_suffix_size, 0, sizeof (section_suffix_size));
 }
 
 void
 _g_irnode_dump_stats (void)
 {
+  gulong shared_suffix_count = 0;
+  gulong shared_suffix_size = 0;
+  int i;
+
+  if (!stats_enabled)
+    return;
+
+  for (i = 0; i < G_IR_STRING_N_SECTIONS; i++)
+    {
+      shared_suffix_count += section_suffix_count[i];
+      shared_suffix_size += section_suffix_size[i];
+    }
+
   g_message ("%lu strings (%lu before sharing), %lu bytes (%lu before sharing)",
 	     unique_string_count, string_count, unique_string_size, string_size);
+  g_message ("%lu strings stored as suffixes of other strings, saving %lu bytes",
+	     shared_suffix_count, shared_suffix_size);
+  for (i = 0; i < G_IR_STRING_N_SECTIONS; i++)
+    g_message ("  %s: %lu bytes (%lu before sharing), %lu stored as suffixes, saving %lu bytes",
+	       section_names[i], section_unique_string_size[i],
+	       section_string_size[i], section_suffix_count[i],
+	       section_suffix_size[i]);
   g_message ("%lu types (%lu before sharing)", unique_types_count, types_count);
 }
 
@@ -1431,7 +1480,8 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	    serialize_type (build, type, str);
 	    s = g_string_free (str, FALSE);
 
-	    types_count += 1;
+	    if (stats_enabled)
+	      types_count += 1;
 	    value = g_hash_table_lookup (types, s);
 	    if (value)
 	      {
@@ -1440,7 +1490,8 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	      }
 	    else
 	      {
-		unique_types_count += 1;
+		if (stats_enabled)
+		  unique_types_count += 1;
 		g_hash_table_insert (types, s, GUINT_TO_POINTER(*offset2));
 
 		blob->offset = *offset2;
@@ -1559,7 +1610,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 
 	blob = (FieldBlob *)&data[*offset];
 
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->readable = field->readable;
 	blob->writable = field->writable;
 	blob->reserved = 0;
@@ -1595,7 +1646,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
         /* We handle the size member specially below, so subtract it */
 	*offset += sizeof (PropertyBlob) - sizeof (SimpleTypeBlob);
 
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->deprecated = prop->deprecated;
 	blob->readable = prop->readable;
 	blob->writable = prop->writable;
@@ -1633,8 +1684,9 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->wraps_vfunc = function->wraps_vfunc;
 	blob->throws = function->throws;
 	blob->index = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
-	blob->symbol = _g_ir_write_string (function->symbol, strings, data, offset2);
+	/* The symbol first, so that the name can share its tail */
+	blob->symbol = _g_ir_write_string (function->symbol, strings, data, offset2, G_IR_STRING_SYMBOL);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->signature = signature;
 
         /* function->result is special since it doesn't appear in the serialized format but
@@ -1686,7 +1738,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->blob_type = BLOB_TYPE_CALLBACK;
 	blob->deprecated = function->deprecated;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->signature = signature;
 
         _g_ir_node_build_typelib ((GIrNode *)function->result->type,
@@ -1735,7 +1787,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->true_stops_emit = 0; /* FIXME */
 	blob->reserved = 0;
 	blob->class_closure = 0; /* FIXME */
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->signature = signature;
 
         /* signal->result is special since it doesn't appear in the serialized format but
@@ -1780,7 +1832,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	*offset += sizeof (VFuncBlob);
 	*offset2 += sizeof (SignatureBlob) + n * sizeof (ArgBlob);
 
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->must_chain_up = 0; /* FIXME */
 	blob->must_be_implemented = 0; /* FIXME */
 	blob->must_not_be_implemented = 0; /* FIXME */
@@ -1834,7 +1886,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	 */
 	*offset += sizeof (ArgBlob) - sizeof (SimpleTypeBlob);
 
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->in = param->in;
 	blob->out = param->out;
 	blob->caller_allocates = param->caller_allocates;
@@ -1864,15 +1916,15 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->deprecated = struct_->deprecated;
 	blob->is_gtype_struct = struct_->is_gtype_struct;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->alignment = struct_->alignment;
 	blob->size = struct_->size;
 
 	if (struct_->gtype_name)
 	  {
 	    blob->unregistered = FALSE;
-	    blob->gtype_name = _g_ir_write_string (struct_->gtype_name, strings, data, offset2);
-	    blob->gtype_init = _g_ir_write_string (struct_->gtype_init, strings, data, offset2);
+	    blob->gtype_name = _g_ir_write_string (struct_->gtype_name, strings, data, offset2, G_IR_STRING_GTYPE_NAME);
+	    blob->gtype_init = _g_ir_write_string (struct_->gtype_init, strings, data, offset2, G_IR_STRING_SYMBOL);
 	  }
 	else
 	  {
@@ -1910,9 +1962,9 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->deprecated = boxed->deprecated;
 	blob->unregistered = FALSE;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
-	blob->gtype_name = _g_ir_write_string (boxed->gtype_name, strings, data, offset2);
-	blob->gtype_init = _g_ir_write_string (boxed->gtype_init, strings, data, offset2);
+	blob->gtype_name = _g_ir_write_string (boxed->gtype_name, strings, data, offset2, G_IR_STRING_GTYPE_NAME);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
+	blob->gtype_init = _g_ir_write_string (boxed->gtype_init, strings, data, offset2, G_IR_STRING_SYMBOL);
 	blob->alignment = boxed->alignment;
 	blob->size = boxed->size;
 
@@ -1944,14 +1996,14 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->blob_type = BLOB_TYPE_UNION;
 	blob->deprecated = union_->deprecated;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->alignment = union_->alignment;
 	blob->size = union_->size;
 	if (union_->gtype_name)
 	  {
 	    blob->unregistered = FALSE;
-	    blob->gtype_name = _g_ir_write_string (union_->gtype_name, strings, data, offset2);
-	    blob->gtype_init = _g_ir_write_string (union_->gtype_init, strings, data, offset2);
+	    blob->gtype_name = _g_ir_write_string (union_->gtype_name, strings, data, offset2, G_IR_STRING_GTYPE_NAME);
+	    blob->gtype_init = _g_ir_write_string (union_->gtype_init, strings, data, offset2, G_IR_STRING_SYMBOL);
 	  }
 	else
 	  {
@@ -2021,12 +2073,12 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->deprecated = enum_->deprecated;
 	blob->reserved = 0;
 	blob->storage_type = enum_->storage_type;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	if (enum_->gtype_name)
 	  {
 	    blob->unregistered = FALSE;
-	    blob->gtype_name = _g_ir_write_string (enum_->gtype_name, strings, data, offset2);
-	    blob->gtype_init = _g_ir_write_string (enum_->gtype_init, strings, data, offset2);
+	    blob->gtype_name = _g_ir_write_string (enum_->gtype_name, strings, data, offset2, G_IR_STRING_GTYPE_NAME);
+	    blob->gtype_init = _g_ir_write_string (enum_->gtype_init, strings, data, offset2, G_IR_STRING_SYMBOL);
 	  }
 	else
 	  {
@@ -2035,7 +2087,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	    blob->gtype_init = 0;
 	  }
 	if (enum_->error_domain)
-	  blob->error_domain = _g_ir_write_string (enum_->error_domain, strings, data, offset2);
+	  blob->error_domain = _g_ir_write_string (enum_->error_domain, strings, data, offset2, G_IR_STRING_OTHER);
 	else
 	  blob->error_domain = 0;
 
@@ -2071,17 +2123,17 @@ _g_ir_node_build_typelib (GIrNode         *node,
         blob->fundamental = object->fundamental;
 	blob->deprecated = object->deprecated;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
-	blob->gtype_name = _g_ir_write_string (object->gtype_name, strings, data, offset2);
-	blob->gtype_init = _g_ir_write_string (object->gtype_init, strings, data, offset2);
+	blob->gtype_name = _g_ir_write_string (object->gtype_name, strings, data, offset2, G_IR_STRING_GTYPE_NAME);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
+	blob->gtype_init = _g_ir_write_string (object->gtype_init, strings, data, offset2, G_IR_STRING_SYMBOL);
         if (object->ref_func)
-          blob->ref_func = _g_ir_write_string (object->ref_func, strings, data, offset2);
+          blob->ref_func = _g_ir_write_string (object->ref_func, strings, data, offset2, G_IR_STRING_SYMBOL);
         if (object->unref_func)
-          blob->unref_func = _g_ir_write_string (object->unref_func, strings, data, offset2);
+          blob->unref_func = _g_ir_write_string (object->unref_func, strings, data, offset2, G_IR_STRING_SYMBOL);
         if (object->set_value_func)
-          blob->set_value_func = _g_ir_write_string (object->set_value_func, strings, data, offset2);
+          blob->set_value_func = _g_ir_write_string (object->set_value_func, strings, data, offset2, G_IR_STRING_SYMBOL);
         if (object->get_value_func)
-          blob->get_value_func = _g_ir_write_string (object->get_value_func, strings, data, offset2);
+          blob->get_value_func = _g_ir_write_string (object->get_value_func, strings, data, offset2, G_IR_STRING_SYMBOL);
 	if (object->parent)
 	  blob->parent = find_entry (build, object->parent);
 	else
@@ -2148,9 +2200,9 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->blob_type = BLOB_TYPE_INTERFACE;
 	blob->deprecated = iface->deprecated;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
-	blob->gtype_name = _g_ir_write_string (iface->gtype_name, strings, data, offset2);
-	blob->gtype_init = _g_ir_write_string (iface->gtype_init, strings, data, offset2);
+	blob->gtype_name = _g_ir_write_string (iface->gtype_name, strings, data, offset2, G_IR_STRING_GTYPE_NAME);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
+	blob->gtype_init = _g_ir_write_string (iface->gtype_init, strings, data, offset2, G_IR_STRING_SYMBOL);
 	if (iface->glib_type_struct)
 	  blob->gtype_struct = find_entry (build, iface->glib_type_struct);
 	else
@@ -2208,7 +2260,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->deprecated = value->deprecated;
 	blob->reserved = 0;
 	blob->unsigned_value = value->value >= 0 ? 1 : 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 	blob->value = (gint32)value->value;
       }
       break;
@@ -2225,7 +2277,7 @@ _g_ir_node_build_typelib (GIrNode         *node,
 	blob->blob_type = BLOB_TYPE_CONSTANT;
 	blob->deprecated = constant->deprecated;
 	blob->reserved = 0;
-	blob->name = _g_ir_write_string (node->name, strings, data, offset2);
+	blob->name = _g_ir_write_string (node->name, strings, data, offset2, G_IR_STRING_NAME);
 
 	blob->offset = *offset2;
 	switch (constant->type->tag)
@@ -2304,29 +2356,74 @@ _g_ir_node_build_typelib (GIrNode         *node,
     build->stack = g_list_delete_link (build->stack, build->stack);
 }
 
+/* Values in the string pool for strings that were not written on their
+ * own, but are the tail of a longer string.  Typelibs are far smaller
+ * than 2GB, so the top bit of an offset is free.
+ */
+#define STRING_SUFFIX_FLAG (1U << 31)
+
+/* Only tails starting at a word boundary are added to the pool, like
+ * "show" in "gtk_widget_show" or "Widget" in "GtkWidget"; other
+ * suffixes hardly ever occur as strings of their own.
+ */
+static gboolean
+is_suffix_start (const gchar *p)
+{
+  return p[-1] == '_' || p[-1] == '-' || g_ascii_isupper (*p);
+}
+
 /* if str is already in the pool, return previous location, otherwise write str
  * to the typelib at offset, put it in the pool and update offset. If the
  * typelib is not large enough to hold the string, reallocate it.
+ *
+ * Strings which end another string already in the typelib are not written
+ * again; they point into the longer string instead. section only tells the
+ * statistics what the string is used for.
  */
 guint32
-_g_ir_write_string (const gchar *str,
-		    GHashTable  *strings,
-		    guchar      *data,
-		    guint32     *offset)
+_g_ir_write_string (const gchar      *str,
+		    GHashTable       *strings,
+		    guchar           *data,
+		    guint32          *offset,
+		    GIrStringSection  section)
 {
   gpointer value;
   guint32 start;
+  const gchar *p;
 
-  string_count += 1;
-  string_size += strlen (str);
+  if (stats_enabled)
+    {
+      string_count += 1;
+      string_size += strlen (str);
+      section_string_size[section] += strlen (str);
+    }
 
   value = g_hash_table_lookup (strings, str);
 
   if (value)
-    return GPOINTER_TO_UINT (value);
+    {
+      guint32 found = GPOINTER_TO_UINT (value);
 
-  unique_string_count += 1;
-  unique_string_size += strlen (str);
+      if (found & STRING_SUFFIX_FLAG)
+	{
+	  /* Stored once as a suffix; further uses are plain sharing */
+	  found &= ~STRING_SUFFIX_FLAG;
+	  if (stats_enabled)
+	    {
+	      section_suffix_count[section] += 1;
+	      section_suffix_size[section] += ALIGN_VALUE (strlen (str) + 1, 4);
+	    }
+	  g_hash_table_insert (strings, (gpointer)str, GUINT_TO_POINTER (found));
+	}
+      return found;
+    }
+
+  if (stats_enabled)
+    {
+      unique_string_count += 1;
+      unique_string_size += strlen (str);
+      section_unique_string_size[section] += strlen (str);
+    }
 
   g_hash_table_insert (strings, (gpointer)str, GUINT_TO_POINTER (*offset));
 
@@ -2335,6 +2432,14 @@ _g_ir_write_string (const gchar *str,
 
   strcpy ((gchar*)&data[start], str);
 
+  for (p = str + 1; *p; p++)
+    {
+      if (!is_suffix_start (p) || g_hash_table_lookup (strings, p))
+	continue;
+      g_hash_table_insert (strings, (gpointer)p,
+			   GUINT_TO_POINTER ((start + (p - str)) | STRING_SUFFIX_FLAG));
+    }
+
   return start;
 }
 
@@ -69,6 +69,19 @@ typedef enum
   G_IR_NODE_XREF         = 19
 } GIrNodeTypeId;
 
+/* What a string written to the typelib is used for; only used to break
+ * down the statistics.
+ */
+typedef enum
+{
+  G_IR_STRING_NAME,
+  G_IR_STRING_SYMBOL,
+  G_IR_STRING_GTYPE_NAME,
+  G_IR_STRING_ATTRIBUTE,
+  G_IR_STRING_OTHER,
+  G_IR_STRING_N_SECTIONS
+} GIrStringSection;
+
 struct _GIrNode
 {
   GIrNodeTypeId type;
@@ -361,10 +374,11 @@ int       _g_ir_node_cmp             (GIrNode    *node,
 gboolean  _g_ir_node_can_have_member (GIrNode    *node);
 void      _g_ir_node_add_member      (GIrNode         *node,
 				      GIrNodeFunction *member);
-guint32   _g_ir_write_string              (const gchar *str,
-					   GHashTable  *strings,
-					   guchar      *data,
-					   guint32     *offset);
+guint32   _g_ir_write_string              (const gchar      *str,
+					   GHashTable       *strings,
+					   guchar           *data,
+					   guint32          *offset,
+					   GIrStringSection  section);
 
 const gchar * _g_ir_node_param_direction_string (GIrNodeParam * node);
 const gchar * _g_ir_node_type_to_string         (GIrNodeTypeId type);
@@ -112,6 +112,36 @@ g_struct_info_get_field (GIStructInfo *info,
                                      g_struct_get_field_offset (info, n));
 }
 
+/**
+ * g_struct_info_iterate_fields:
+ * @info: a #GIStructInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @field: (out caller-allocates): Initialized with the next field
+ *
+ * Iterate over the fields of @info without allocating, see
+ * g_object_info_iterate_methods().  Unlike repeated calls of
+ * g_struct_info_get_field(), each step takes constant time.
+ *
+ * Returns: %TRUE if @field was initialized, %FALSE after the last field
+ *
+ * Since: 1.34
+ */
+gboolean
+g_struct_info_iterate_fields (GIStructInfo *info,
+			      GIInfoIter   *iterator,
+			      GIFieldInfo  *field)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  StructBlob *blob = (StructBlob *)&rinfo->typelib->data[rinfo->offset];
+  Header *header = (Header *)rinfo->typelib->data;
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->struct_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FIELD,
+			    blob->n_fields, (GIBaseInfo *)field);
+}
+
 /**
  * g_struct_info_get_n_methods:
  * @info: a #GIStructInfo
@@ -153,6 +183,34 @@ g_struct_info_get_method (GIStructInfo *info,
                                         rinfo->typelib, offset);
 }
 
+/**
+ * g_struct_info_iterate_methods:
+ * @info: a #GIStructInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @method: (out caller-allocates): Initialized with the next method
+ *
+ * Iterate over the methods of @info without allocating, see
+ * g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @method was initialized, %FALSE after the last method
+ *
+ * Since: 1.34
+ */
+gboolean
+g_struct_info_iterate_methods (GIStructInfo   *info,
+			       GIInfoIter     *iterator,
+			       GIFunctionInfo *method)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  StructBlob *blob = (StructBlob *)&rinfo->typelib->data[rinfo->offset];
+
+  if (iterator->index == 0)
+    iterator->offset = g_struct_get_field_offset (info, blob->n_fields);
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FUNCTION,
+			    blob->n_methods, (GIBaseInfo *)method);
+}
+
 /**
  * g_struct_info_find_method:
  * @info: a #GIStructInfo
@@ -37,9 +37,15 @@ G_BEGIN_DECLS
 gint             g_struct_info_get_n_fields    (GIStructInfo *info);
 GIFieldInfo *    g_struct_info_get_field       (GIStructInfo *info,
 						gint          n);
+gboolean         g_struct_info_iterate_fields  (GIStructInfo *info,
+						GIInfoIter   *iterator,
+						GIFieldInfo  *field);
 gint             g_struct_info_get_n_methods   (GIStructInfo *info);
 GIFunctionInfo * g_struct_info_get_method      (GIStructInfo *info,
 						gint          n);
+gboolean         g_struct_info_iterate_methods (GIStructInfo   *info,
+						GIInfoIter     *iterator,
+						GIFunctionInfo *method);
 GIFunctionInfo * g_struct_info_find_method     (GIStructInfo *info,
 						const gchar  *name);
 gsize            g_struct_info_get_size        (GIStructInfo *info);
@@ -287,7 +287,9 @@ typedef struct {
 
 typedef enum {
   GI_SECTION_END = 0,
-  GI_SECTION_DIRECTORY_INDEX = 1
+  GI_SECTION_DIRECTORY_INDEX = 1,
+  GI_SECTION_GTYPE_INDEX = 2,
+  GI_SECTION_SYMBOL_INDEX = 3
 } SectionType;
 
 /**
@@ -296,9 +298,12 @@ typedef enum {
  * @offset: Integer offset for this section
  *
  * A section is a blob of data that's (at least theoretically) optional,
- * and may or may not be present in the typelib.  Presently, just used
- * for the directory index.  This allows a form of dynamic extensibility
- * with different tradeoffs from the format minor version.
+ * and may or may not be present in the typelib.  Presently used for
+ * the directory index, a perfect hash from entry names to directory
+ * indices, the GType index, a perfect hash from the GType names of
+ * registered types to directory indices, and the symbol index, see
+ * #SymbolIndexBlob.  This allows a form of dynamic extensibility with
+ * different tradeoffs from the format minor version.
  *
  */
 typedef struct {
@@ -306,6 +311,25 @@ typedef struct {
   guint32 offset;
 } Section;
 
+/**
+ * SymbolIndexBlob:
+ * @entry: The directory index of the entry containing the function,
+ *   counting from 1
+ * @method: The index of the function among the methods of @entry,
+ *   or 0xFFFF if @entry is the function itself
+ *
+ * The symbol index section starts with a guint32 holding the number of
+ * indexed symbols, followed by that many #SymbolIndexBlob records and,
+ * aligned to 4 bytes, a perfect hash from C symbols of functions and
+ * methods to the position of their record.
+ */
+typedef struct {
+  guint16 entry;
+  guint16 method;
+} SymbolIndexBlob;
+
+#define SYMBOL_INDEX_NO_METHOD 0xFFFF
+
 
 /**
  * DirEntry:
@@ -1118,6 +1142,9 @@ struct _GITypelib {
   GMappedFile *mfile;
   GList *modules;
   gboolean open_attempted;
+  gboolean validated; /* all of it, see g_typelib_validate() */
+  guint8 *entry_status; /* per local entry, for validation on access */
+  GHashTable *prepared_calls; /* blob offset -> GIPreparedCall */
 };
 
 DirEntry *g_typelib_get_dir_entry (GITypelib *typelib,
@@ -1133,6 +1160,11 @@ DirEntry *g_typelib_get_dir_entry_by_gtype (GITypelib *typelib,
 DirEntry *g_typelib_get_dir_entry_by_error_domain (GITypelib *typelib,
 						   GQuark     error_domain);
 
+gboolean  g_typelib_lookup_symbol (GITypelib   *typelib,
+				   const char  *symbol,
+				   guint16     *entry_index,
+				   guint16     *method_index);
+
 void      g_typelib_check_sanity (void);
 
 #define   g_typelib_get_string(typelib,offset) ((const gchar*)&(typelib->data)[(offset)])
@@ -1164,6 +1196,12 @@ GQuark g_typelib_error_quark (void);
 gboolean g_typelib_validate (GITypelib  *typelib,
 			     GError    **error);
 
+gboolean _g_typelib_validate_on_access (GITypelib  *typelib,
+					GError    **error);
+
+gboolean _g_typelib_check_entry (GITypelib *typelib,
+				 DirEntry  *entry);
+
 
 /* defined in gibaseinfo.c */
 AttributeBlob *_attribute_blob_find_first (GIBaseInfo *info,
@@ -1183,7 +1221,9 @@ void _gi_typelib_hash_builder_pack (GITypelibHashBuilder *builder, guint8* mem,
 
 void _gi_typelib_hash_builder_destroy (GITypelibHashBuilder *builder);
 
-guint16 _gi_typelib_hash_search (guint8* memory, const char *str);
+guint16 _gi_typelib_hash_search (guint8* memory, guint32 len, const char *str);
+
+gboolean _gi_typelib_hash_validate (guint8 *memory, guint32 len, guint max_value);
 
 
 G_END_DECLS
@@ -34,6 +34,13 @@ typedef struct {
   GSList *context_stack;
 } ValidateContext;
 
+/* Values of GITypelib.entry_status */
+enum {
+  ENTRY_UNCHECKED = 0,
+  ENTRY_VALID,
+  ENTRY_INVALID
+};
+
 #define ALIGN_VALUE(this, boundary) \
   (( ((unsigned long)(this)) + (((unsigned long)(boundary)) -1)) & (~(((unsigned long)(boundary))-1)))
 
@@ -160,6 +167,27 @@ get_section_by_id (GITypelib   *typelib,
   return NULL;
 }
 
+/* Sections are appended one after the other to the typelib, so each
+ * one extends up to the next one, or to the end.
+ */
+static guint32
+get_section_end (GITypelib *typelib,
+		 Section   *section)
+{
+  Header *header = (Header *)typelib->data;
+  Section *other;
+  guint32 end = typelib->len;
+
+  for (other = (Section*)&typelib->data[header->sections];
+       other->id != GI_SECTION_END;
+       other++)
+    {
+      if (other->offset > section->offset && other->offset < end)
+	end = other->offset;
+    }
+  return end;
+}
+
 DirEntry *
 g_typelib_get_dir_entry_by_name (GITypelib *typelib,
 				 const char *name)
@@ -188,7 +216,11 @@ g_typelib_get_dir_entry_by_name (GITypelib *typelib,
       guint8 *hash = (guint8*) &typelib->data[dirindex->offset];
       guint16 index;
 
-      index = _gi_typelib_hash_search (hash, name);
+      index = _gi_typelib_hash_search (hash,
+				       get_section_end (typelib, dirindex) - dirindex->offset,
+				       name);
+      if (index >= ((Header *)typelib->data)->n_local_entries)
+	return NULL;
       entry = g_typelib_get_dir_entry (typelib, index + 1);
       entry_name = g_typelib_get_string (typelib, entry->name);
       if (strcmp (name, entry_name) == 0)
@@ -206,6 +238,7 @@ g_typelib_get_dir_entry_by_gtype (GITypelib *typelib,
   guint n_entries = header->n_local_entries;
   const char *gtype_name = g_type_name (gtype);
   DirEntry *entry;
+  Section *gtype_index;
   guint i;
   const char *c_prefix;
 
@@ -241,13 +274,46 @@ g_typelib_get_dir_entry_by_gtype (GITypelib *typelib,
 	return NULL;
     }
 
+  /* Typelibs built by a recent compiler carry a perfect hash from
+   * GType names to directory indices; older ones are scanned.
+   */
+  gtype_index = get_section_by_id (typelib, GI_SECTION_GTYPE_INDEX);
+  if (gtype_index != NULL)
+    {
+      guint8 *hash = (guint8*) &typelib->data[gtype_index->offset];
+      RegisteredTypeBlob *blob;
+      guint16 index;
+
+      /* The hash maps unknown keys to an arbitrary index, so the
+       * result has to be checked like in the directory index case.
+       */
+      index = _gi_typelib_hash_search (hash,
+				       get_section_end (typelib, gtype_index) - gtype_index->offset,
+				       gtype_name);
+      if (index >= n_entries)
+	return NULL;
+      entry = g_typelib_get_dir_entry (typelib, index + 1);
+      if (!BLOB_IS_REGISTERED_TYPE (entry) ||
+	  !_g_typelib_check_entry (typelib, entry))
+	return NULL;
+
+      blob = (RegisteredTypeBlob *)(&typelib->data[entry->offset]);
+      if (!blob->gtype_name)
+	return NULL;
+
+      if (strcmp (g_typelib_get_string (typelib, blob->gtype_name), gtype_name) == 0)
+	return entry;
+      return NULL;
+    }
+
   for (i = 1; i <= n_entries; i++)
     {
       RegisteredTypeBlob *blob;
       const char *type;
 
       entry = g_typelib_get_dir_entry (typelib, i);
-      if (!BLOB_IS_REGISTERED_TYPE (entry))
+      if (!BLOB_IS_REGISTERED_TYPE (entry) ||
+	  !_g_typelib_check_entry (typelib, entry))
 	continue;
 
       blob = (RegisteredTypeBlob *)(&typelib->data[entry->offset]);
@@ -277,7 +343,8 @@ g_typelib_get_dir_entry_by_error_domain (GITypelib *typelib,
       const char *enum_domain_string;
 
       entry = g_typelib_get_dir_entry (typelib, i);
-      if (entry->blob_type != BLOB_TYPE_ENUM)
+      if (entry->blob_type != BLOB_TYPE_ENUM ||
+	  !_g_typelib_check_entry (typelib, entry))
 	continue;
 
       blob = (EnumBlob *)(&typelib->data[entry->offset]);
@@ -291,6 +358,59 @@ g_typelib_get_dir_entry_by_error_domain (GITypelib *typelib,
   return NULL;
 }
 
+/*
+ * g_typelib_lookup_symbol:
+ * @typelib: a #GITypelib
+ * @symbol: a C symbol
+ * @entry_index: (out): directory index of the candidate entry, or 0 if
+ *   there is none
+ * @method_index: (out): method index of the candidate in the entry, or
+ *   %SYMBOL_INDEX_NO_METHOD for a toplevel function
+ *
+ * Looks up @symbol in the symbol index section of @typelib.  Like with
+ * the other perfect hashes, unknown symbols map to an arbitrary record,
+ * so the caller has to check the symbol of the function found.
+ *
+ * Returns: %FALSE if @typelib has no symbol index
+ */
+gboolean
+g_typelib_lookup_symbol (GITypelib   *typelib,
+			 const char  *symbol,
+			 guint16     *entry_index,
+			 guint16     *method_index)
+{
+  Header *header = (Header *)typelib->data;
+  Section *symbol_index;
+  SymbolIndexBlob *records;
+  guint32 n_symbols;
+  guint8 *hash;
+  guint16 index;
+
+  symbol_index = get_section_by_id (typelib, GI_SECTION_SYMBOL_INDEX);
+  if (symbol_index == NULL)
+    return FALSE;
+
+  n_symbols = *(guint32 *)&typelib->data[symbol_index->offset];
+  records = (SymbolIndexBlob *)&typelib->data[symbol_index->offset + 4];
+  hash = (guint8 *)&records[n_symbols];
+
+  index = _gi_typelib_hash_search (hash,
+				   get_section_end (typelib, symbol_index) -
+				   (hash - typelib->data),
+				   symbol);
+  if (index >= n_symbols || records[index].entry == 0 ||
+      records[index].entry > header->n_local_entries)
+    {
+      *entry_index = 0;
+      *method_index = SYMBOL_INDEX_NO_METHOD;
+      return TRUE;
+    }
+
+  *entry_index = records[index].entry;
+  *method_index = records[index].method;
+  return TRUE;
+}
+
 void
 g_typelib_check_sanity (void)
 {
@@ -339,6 +459,7 @@ g_typelib_check_sanity (void)
   CHECK_SIZE (ConstantBlob, 24);
   CHECK_SIZE (AttributeBlob, 12);
   CHECK_SIZE (UnionBlob, 40);
+  CHECK_SIZE (SymbolIndexBlob, 4);
 #undef CHECK_SIZE
 
   g_assert (size_check_ok);
@@ -1902,6 +2023,7 @@ validate_blob (ValidateContext *ctx,
 
 static gboolean
 validate_directory (ValidateContext   *ctx,
+		    gboolean           validate_blobs,
 		    GError            **error)
 {
   GITypelib *typelib = ctx->typelib;
@@ -1955,7 +2077,7 @@ validate_directory (ValidateContext   *ctx,
 	      return FALSE;
 	    }
 
-	  if (!validate_blob (ctx, entry->offset, error))
+	  if (validate_blobs && !validate_blob (ctx, entry->offset, error))
 	    return FALSE;
 	}
       else
@@ -1996,6 +2118,144 @@ validate_attributes (ValidateContext *ctx,
   return TRUE;
 }
 
+static gboolean
+validate_symbol_index (GITypelib *typelib,
+		       guint8    *data,
+		       guint32    len,
+		       GError   **error)
+{
+  Header *header = (Header *)typelib->data;
+  SymbolIndexBlob *records;
+  guint32 n_symbols, i;
+
+  if (len < 4)
+    {
+      g_set_error (error,
+		   G_TYPELIB_ERROR,
+		   G_TYPELIB_ERROR_INVALID,
+		   "The buffer is too short");
+      return FALSE;
+    }
+
+  n_symbols = *(guint32 *)data;
+  if (n_symbols == 0 || n_symbols > (len - 4) / sizeof (SymbolIndexBlob))
+    {
+      g_set_error (error,
+		   G_TYPELIB_ERROR,
+		   G_TYPELIB_ERROR_INVALID,
+		   "Invalid number of symbols %u", n_symbols);
+      return FALSE;
+    }
+
+  records = (SymbolIndexBlob *)&data[4];
+  for (i = 0; i < n_symbols; i++)
+    {
+      if (records[i].entry == 0 || records[i].entry > header->n_local_entries)
+	{
+	  g_set_error (error,
+		       G_TYPELIB_ERROR,
+		       G_TYPELIB_ERROR_INVALID,
+		       "Symbol index record %u points to invalid entry %u",
+		       i, records[i].entry);
+	  return FALSE;
+	}
+    }
+
+  if (!_gi_typelib_hash_validate ((guint8 *)&records[n_symbols],
+				  len - 4 - n_symbols * sizeof (SymbolIndexBlob),
+				  n_symbols))
+    {
+      g_set_error (error,
+		   G_TYPELIB_ERROR,
+		   G_TYPELIB_ERROR_INVALID,
+		   "Invalid symbol hash");
+      return FALSE;
+    }
+
+  return TRUE;
+}
+
+static gboolean
+validate_sections (ValidateContext *ctx,
+		   GError         **error)
+{
+  GITypelib *typelib = ctx->typelib;
+  Header *header = (Header *)typelib->data;
+  Section *section;
+  gsize offset;
+
+  if (header->sections == 0)
+    return TRUE;
+
+  if (!is_aligned (header->sections))
+    {
+      g_set_error (error,
+		   G_TYPELIB_ERROR,
+		   G_TYPELIB_ERROR_INVALID_HEADER,
+		   "Misaligned sections");
+      return FALSE;
+    }
+
+  /* The section table is terminated by GI_SECTION_END */
+  for (offset = header->sections; ; offset += sizeof (Section))
+    {
+      if (typelib->len < offset + sizeof (Section))
+	{
+	  g_set_error (error,
+		       G_TYPELIB_ERROR,
+		       G_TYPELIB_ERROR_INVALID,
+		       "The buffer is too short");
+	  return FALSE;
+	}
+
+      section = (Section *)&typelib->data[offset];
+      if (section->id == GI_SECTION_END)
+	break;
+
+      if (!is_aligned (section->offset) || section->offset >= typelib->len)
+	{
+	  g_set_error (error,
+		       G_TYPELIB_ERROR,
+		       G_TYPELIB_ERROR_INVALID,
+		       "Invalid offset %u for section %u",
+		       section->offset, section->id);
+	  return FALSE;
+	}
+    }
+
+  for (section = (Section *)&typelib->data[header->sections];
+       section->id != GI_SECTION_END;
+       section++)
+    {
+      guint8 *data = &typelib->data[section->offset];
+      guint32 len = get_section_end (typelib, section) - section->offset;
+
+      switch (section->id)
+	{
+	case GI_SECTION_DIRECTORY_INDEX:
+	case GI_SECTION_GTYPE_INDEX:
+	  if (!_gi_typelib_hash_validate (data, len, header->n_local_entries))
+	    {
+	      g_set_error (error,
+			   G_TYPELIB_ERROR,
+			   G_TYPELIB_ERROR_INVALID,
+			   "Invalid hash in section %u", section->id);
+	      return FALSE;
+	    }
+	  break;
+	case GI_SECTION_SYMBOL_INDEX:
+	  if (!validate_symbol_index (typelib, data, len, error))
+	    return FALSE;
+	  break;
+	default:
+	  /* Unknown sections are not used, so they can't do any harm */
+	  break;
+	}
+    }
+
+  return TRUE;
+}
+
 static void
 prefix_with_context (GError **error,
 		     const char *section,
@@ -2024,9 +2284,10 @@ prefix_with_context (GError **error,
   g_free (buf);
 }
 
-gboolean
-g_typelib_validate (GITypelib     *typelib,
-		     GError       **error)
+static gboolean
+validate_typelib (GITypelib     *typelib,
+		  gboolean       validate_blobs,
+		  GError       **error)
 {
   ValidateContext ctx;
   ctx.typelib = typelib;
@@ -2038,7 +2299,7 @@ g_typelib_validate (GITypelib     *typelib,
       return FALSE;
     }
 
-  if (!validate_directory (&ctx, error))
+  if (!validate_directory (&ctx, validate_blobs, error))
     {
       prefix_with_context (error, "directory", &ctx);
       return FALSE;
@@ -2050,9 +2311,94 @@ g_typelib_validate (GITypelib     *typelib,
       return FALSE;
     }
 
+  if (!validate_sections (&ctx, error))
+    {
+      prefix_with_context (error, "sections", &ctx);
+      return FALSE;
+    }
+
+  return TRUE;
+}
+
+gboolean
+g_typelib_validate (GITypelib     *typelib,
+		     GError       **error)
+{
+  return validate_typelib (typelib, TRUE, error);
+}
+
+/**
+ * _g_typelib_validate_on_access:
+ * @typelib: a #GITypelib
+ * @error: a #GError
+ *
+ * Validates everything in @typelib except the blobs of the local
+ * entries, and arranges for each blob to be validated the first time
+ * it is looked up, see _g_typelib_check_entry().
+ *
+ * Returns: %TRUE if the header and directory are valid
+ */
+gboolean
+_g_typelib_validate_on_access (GITypelib  *typelib,
+			       GError    **error)
+{
+  Header *header = (Header *)typelib->data;
+
+  if (!validate_typelib (typelib, FALSE, error))
+    return FALSE;
+
+  g_free (typelib->entry_status);
+  typelib->entry_status = g_new0 (guint8, header->n_local_entries);
   return TRUE;
 }
 
+/**
+ * _g_typelib_check_entry:
+ * @typelib: a #GITypelib
+ * @entry: a local #DirEntry of @typelib
+ *
+ * Validates the blob of @entry, if @typelib was loaded with
+ * _g_typelib_validate_on_access() and this has not been done yet.  An
+ * invalid blob is reported once, with a warning.
+ *
+ * Returns: %TRUE if the blob of @entry may be used
+ */
+gboolean
+_g_typelib_check_entry (GITypelib *typelib,
+			DirEntry  *entry)
+{
+  Header *header;
+  ValidateContext ctx;
+  GError *error = NULL;
+  guint index;
+
+  if (G_LIKELY (typelib->entry_status == NULL) || !entry->local)
+    return TRUE;
+
+  header = (Header *)typelib->data;
+  index = ((guint8 *)entry - (typelib->data + header->directory)) / header->entry_blob_size;
+  g_assert (index < header->n_local_entries);
+
+  if (typelib->entry_status[index] != ENTRY_UNCHECKED)
+    return typelib->entry_status[index] == ENTRY_VALID;
+
+  ctx.typelib = typelib;
+  ctx.context_stack = NULL;
+
+  if (validate_blob (&ctx, entry->offset, &error))
+    {
+      typelib->entry_status[index] = ENTRY_VALID;
+      return TRUE;
+    }
+
+  prefix_with_context (&error, "directory", &ctx);
+  g_warning ("Invalid typelib for namespace '%s': %s",
+	     g_typelib_get_namespace (typelib), error->message);
+  g_error_free (error);
+  typelib->entry_status[index] = ENTRY_INVALID;
+  return FALSE;
+}
+
 GQuark
 g_typelib_error_quark (void)
 {
@@ -2261,6 +2607,9 @@ g_typelib_free (GITypelib *typelib)
       g_list_foreach (typelib->modules, (GFunc) g_module_close, NULL);
       g_list_free (typelib->modules);
     }
+  g_free (typelib->entry_status);
+  if (typelib->prepared_calls)
+    g_hash_table_destroy (typelib->prepared_calls);
   g_slice_free (GITypelib, typelib);
 }
 
@@ -86,6 +86,35 @@ g_union_info_get_field (GIUnionInfo *info,
 				     n * header->field_blob_size);
 }
 
+/**
+ * g_union_info_iterate_fields:
+ * @info: a #GIUnionInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @field: (out caller-allocates): Initialized with the next field
+ *
+ * Iterate over the fields of @info without allocating, see
+ * g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @field was initialized, %FALSE after the last field
+ *
+ * Since: 1.34
+ */
+gboolean
+g_union_info_iterate_fields (GIUnionInfo *info,
+			     GIInfoIter  *iterator,
+			     GIFieldInfo *field)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  UnionBlob *blob = (UnionBlob *)&rinfo->typelib->data[rinfo->offset];
+  Header *header = (Header *)rinfo->typelib->data;
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->union_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FIELD,
+			    blob->n_fields, (GIBaseInfo *)field);
+}
+
 /**
  * g_union_info_get_n_methods:
  * @info: a #GIUnionInfo
@@ -129,6 +158,36 @@ g_union_info_get_method (GIUnionInfo *info,
 					rinfo->typelib, offset);
 }
 
+/**
+ * g_union_info_iterate_methods:
+ * @info: a #GIUnionInfo
+ * @iterator: a #GIInfoIter structure, must be initialized to zero
+ * @method: (out caller-allocates): Initialized with the next method
+ *
+ * Iterate over the methods of @info without allocating, see
+ * g_object_info_iterate_methods().
+ *
+ * Returns: %TRUE if @method was initialized, %FALSE after the last method
+ *
+ * Since: 1.34
+ */
+gboolean
+g_union_info_iterate_methods (GIUnionInfo    *info,
+			      GIInfoIter     *iterator,
+			      GIFunctionInfo *method)
+{
+  GIRealInfo *rinfo = (GIRealInfo *)info;
+  UnionBlob *blob = (UnionBlob *)&rinfo->typelib->data[rinfo->offset];
+  Header *header = (Header *)rinfo->typelib->data;
+
+  if (iterator->index == 0)
+    iterator->offset = rinfo->offset + header->union_blob_size
+      + blob->n_fields * header->field_blob_size;
+
+  return _g_info_iter_next (iterator, (GIBaseInfo *)info, GI_INFO_TYPE_FUNCTION,
+			    blob->n_functions, (GIBaseInfo *)method);
+}
+
 /**
  * g_union_info_is_discriminated:
  * @info: a #GIUnionInfo
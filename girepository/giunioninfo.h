@@ -37,9 +37,15 @@ G_BEGIN_DECLS
 gint             g_union_info_get_n_fields             (GIUnionInfo *info);
 GIFieldInfo *    g_union_info_get_field                (GIUnionInfo *info,
 							gint         n);
+gboolean         g_union_info_iterate_fields           (GIUnionInfo *info,
+							GIInfoIter  *iterator,
+							GIFieldInfo *field);
 gint             g_union_info_get_n_methods            (GIUnionInfo *info);
 GIFunctionInfo * g_union_info_get_method               (GIUnionInfo *info,
 							gint         n);
+gboolean         g_union_info_iterate_methods          (GIUnionInfo    *info,
+							GIInfoIter     *iterator,
+							GIFunctionInfo *method);
 gboolean         g_union_info_is_discriminated         (GIUnionInfo *info);
 gint             g_union_info_get_discriminator_offset (GIUnionInfo *info);
 GITypeInfo *     g_union_info_get_discriminator_type   (GIUnionInfo *info);
@@ -47,10 +47,15 @@ test_build_retrieve (void)
 
   _gi_typelib_hash_builder_destroy (builder);
 
-  g_assert (_gi_typelib_hash_search (buf, "Action") == 0);
-  g_assert (_gi_typelib_hash_search (buf, "ZLibDecompressor") == 42);
-  g_assert (_gi_typelib_hash_search (buf, "VolumeMonitor") == 9);
-  g_assert (_gi_typelib_hash_search (buf, "FileMonitorFlags") == 31);
+  g_assert (_gi_typelib_hash_search (buf, bufsize, "Action") == 0);
+  g_assert (_gi_typelib_hash_search (buf, bufsize, "ZLibDecompressor") == 42);
+  g_assert (_gi_typelib_hash_search (buf, bufsize, "VolumeMonitor") == 9);
+  g_assert (_gi_typelib_hash_search (buf, bufsize, "FileMonitorFlags") == 31);
+
+  g_assert (_gi_typelib_hash_validate (buf, bufsize, 43));
+  /* A value that is out of range, and a truncated table */
+  g_assert (!_gi_typelib_hash_validate (buf, bufsize, 42));
+  g_assert (!_gi_typelib_hash_validate (buf, bufsize - 2, 43));
 }
 
 int
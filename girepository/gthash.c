@@ -191,7 +191,7 @@ _gi_typelib_hash_builder_destroy (GITypelibHashBuilder *builder)
 }
 
 guint16
-_gi_typelib_hash_search (guint8* memory, const char *str)
+_gi_typelib_hash_search (guint8* memory, guint32 len, const char *str)
 {
   guint32 *mph;
   guint16 *table;
@@ -206,6 +206,82 @@ _gi_typelib_hash_search (guint8* memory, const char *str)
   dirmap_offset = *((guint32*)memory);
   table = (guint16*) (memory + dirmap_offset);
 
+  /* Strings that were not hashed may map to any slot, or one past the
+   * last one */
+  if (offset >= (len - dirmap_offset) / sizeof (guint16))
+    offset = 0;
+
   return table[offset];
 }
 
+/**
+ * _gi_typelib_hash_validate:
+ * @memory: a hash written by _gi_typelib_hash_builder_pack()
+ * @len: the number of bytes available at @memory
+ * @max_value: an upper bound for the values in the hash
+ *
+ * Checks that searching the hash at @memory for any string only reads
+ * from the first @len bytes, and that the values it maps the hashed
+ * strings to are smaller than @max_value.
+ *
+ * Returns: %TRUE if the hash is valid
+ */
+gboolean
+_gi_typelib_hash_validate (guint8 *memory, guint32 len, guint max_value)
+{
+  guint32 *words = (guint32 *)memory;
+  guint32 dirmap_offset, r, ranktablesize, n_vertices, g_size;
+  guint32 offset, n_assigned, i;
+  guint16 *table;
+  guint8 *g;
+  guint8 b;
+
+  /* The dirmap offset, then what bdz_pack() writes: the algorithm,
+   * the hash function and its seed, r and the size of the rank table
+   */
+  if ((((unsigned long)memory) & 0x3) != 0 || len < 6 * sizeof (guint32))
+    return FALSE;
+  if (words[1] != CMPH_BDZ || words[2] != CMPH_HASH_JENKINS)
+    return FALSE;
+
+  r = words[4];
+  ranktablesize = words[5];
+  if (r == 0 || r > G_MAXUINT32 / 3)
+    return FALSE;
+  if (ranktablesize > (len - 6 * sizeof (guint32)) / sizeof (guint32))
+    return FALSE;
+
+  /* Then the rank table, b and two bits for each of the 3r vertices */
+  n_vertices = 3 * r;
+  g_size = n_vertices / 4 + (n_vertices % 4 != 0);
+  offset = (6 + ranktablesize) * sizeof (guint32);
+  if (len - offset < 1 + g_size)
+    return FALSE;
+
+  b = memory[offset];
+  g = &memory[offset + 1];
+  if (b >= 32 || ((n_vertices - 1) >> b) >= ranktablesize)
+    return FALSE;
+
+  /* The table has a slot for each assigned vertex */
+  n_assigned = 0;
+  for (i = 0; i < n_vertices; i++)
+    {
+      if (((g[i >> 2] >> ((i & 3) << 1)) & 3) != 3)
+        n_assigned++;
+    }
+
+  dirmap_offset = words[0];
+  if (dirmap_offset < offset + 1 + g_size || (dirmap_offset & 0x1) != 0 ||
+      dirmap_offset > len || (len - dirmap_offset) / sizeof (guint16) < n_assigned)
+    return FALSE;
+
+  table = (guint16 *)(memory + dirmap_offset);
+  for (i = 0; i < n_assigned; i++)
+    {
+      if (table[i] >= max_value)
+        return FALSE;
+    }
+
+  return TRUE;
+}
@@ -24,7 +24,50 @@ from giscanner import message
 from giscanner.annotationparser import AnnotationParser
 from giscanner.scannermain import (get_preprocessor_option_group,
                                    create_source_scanner,
+                                   extract_filenames,
                                    process_packages)
+from giscanner.sourcescanner import SourceScanner
+
+
+def _parse_file(filename):
+    ss = SourceScanner()
+    ss.extract_comments([filename])
+    return AnnotationParser().parse(ss.get_comments())
+
+
+def parse_files(filenames, jobs=1):
+    """Parse the comment blocks of the source files, in a pool of jobs
+processes; returns a dict of DocBlocks by name, like
+AnnotationParser.parse()."""
+    # Same order as the scanner: sources are lexed first, then headers
+    # are parsed, the last block documenting a name wins
+    sources = [filename for filename in filenames
+               if not filename.endswith(('.h', '.hpp', '.hxx'))]
+    headers = [filename for filename in filenames
+               if filename.endswith(('.h', '.hpp', '.hxx'))]
+    filenames = sources + headers
+
+    if jobs > 1 and len(filenames) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(jobs)
+        try:
+            results = pool.map(_parse_file, filenames, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_parse_file(filename) for filename in filenames]
+
+    blocks = {}
+    for file_blocks in results:
+        for name, block in file_blocks.iteritems():
+            if name in blocks:
+                message.warn("multiple comment blocks documenting '%s:' identifier." %
+                             (name, ),
+                             positions=block.position, code='annotation')
+            blocks[name] = block
+    return blocks
+
 
 def annotation_main(args):
     parser = optparse.OptionParser('%prog [options] sources')
@@ -35,6 +78,15 @@ def annotation_main(args):
                      help="Extract annotations from the input files")
     parser.add_option_group(group)
 
+    parser.add_option("", "--comments-only",
+                      action="store_true", dest="comments_only",
+                      help="Only lex the input files for comments, without "
+                           "preprocessing and parsing them")
+    parser.add_option("-j", "--jobs",
+                      action="store", dest="jobs", type="int", default=1,
+                      help="Number of processes parsing comments, "
+                           "with --comments-only")
+
     group = get_preprocessor_option_group(parser)
     group.add_option("-L", "--library-path",
                      action="append", dest="library_paths", default=[],
@@ -54,11 +106,14 @@ def annotation_main(args):
 
     logger = message.MessageLogger.get(namespace=None)
 
-    ss = create_source_scanner(options, args)
-
-    if options.extract:
+    if options.comments_only:
+        blocks = parse_files(extract_filenames(args), options.jobs)
+    else:
+        ss = create_source_scanner(options, args)
         ap = AnnotationParser()
         blocks = ap.parse(ss.get_comments())
+
+    if options.extract:
         print '/' + ('*' * 60) + '/'
         print '/* THIS FILE IS GENERATED DO NOT EDIT */'
         print '/' + ('*' * 60) + '/'
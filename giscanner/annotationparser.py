@@ -219,7 +219,7 @@ class DocTag(object):
                          n_params=None, choices=None):
         if required and value is None:
             message.warn('%s annotation needs a value' % (
-                name, ), self.position)
+                name, ), positions=self.position, code='annotation')
             return
 
         if n_params is not None:
@@ -236,14 +236,14 @@ class DocTag(object):
                 else:
                     length = value.length()
                 message.warn('%s annotation needs %s, not %d' % (
-                    name, s, length), self.position)
+                    name, s, length), positions=self.position, code='annotation')
                 return
 
         if choices is not None:
             valuestr = value.one()
             if valuestr not in choices:
                 message.warn('invalid %s annotation value: %r' % (
-                    name, valuestr, ), self.position)
+                    name, valuestr, ), positions=self.position, code='annotation')
                 return
 
     def _validate_array(self, option, value):
@@ -259,39 +259,39 @@ class DocTag(object):
                         message.warn(
                             'array option %s needs a value' % (
                             name, ),
-                            positions=self.position)
+                            positions=self.position, code='annotation')
                     else:
                         message.warn(
                             'invalid array %s option value %r, '
                             'must be an integer' % (name, v, ),
-                            positions=self.position)
+                            positions=self.position, code='annotation')
             elif name == OPT_ARRAY_LENGTH:
                 if v is None:
                     message.warn(
                         'array option length needs a value',
-                        positions=self.position)
+                        positions=self.position, code='annotation')
             else:
                 message.warn(
                     'invalid array annotation value: %r' % (
-                    name, ), self.position)
+                    name, ), positions=self.position, code='annotation')
 
     def _validate_closure(self, option, value):
         if value is not None and value.length() > 1:
             message.warn(
                 'closure takes at most 1 value, %d given' % (
-                value.length()), self.position)
+                value.length()), positions=self.position, code='annotation')
 
     def _validate_element_type(self, option, value):
         self._validate_option(option, value, required=True)
         if value is None:
             message.warn(
                 'element-type takes at least one value, none given',
-                self.position)
+                positions=self.position, code='annotation')
             return
         if value.length() > 2:
             message.warn(
                 'element-type takes at most 2 values, %d given' % (
-                value.length()), self.position)
+                value.length()), positions=self.position, code='annotation')
             return
 
     def _validate_out(self, option, value):
@@ -300,13 +300,13 @@ class DocTag(object):
         if value.length() > 1:
             message.warn(
                 'out annotation takes at most 1 value, %d given' % (
-                value.length()), self.position)
+                value.length()), positions=self.position, code='annotation')
             return
         value_str = value.one()
         if value_str not in [OPT_OUT_CALLEE_ALLOCATES,
                              OPT_OUT_CALLER_ALLOCATES]:
             message.warn("out annotation value is invalid: %r" % (
-                value_str), self.position)
+                value_str), positions=self.position, code='annotation')
             return
 
     def set_position(self, position):
@@ -393,7 +393,7 @@ class DocTag(object):
                 self._validate_option(option, value, n_params=0)
             else:
                 message.warn('invalid annotation option: %s' % (option, ),
-                             self.position)
+                             positions=self.position, code='annotation')
 
 
 class DocOptions(object):
@@ -544,7 +544,7 @@ class AnnotationParser(object):
                 if comment_block.name in comment_blocks:
                     message.warn("multiple comment blocks documenting '%s:' identifier." %
                                  (comment_block.name),
-                                 comment_block.position)
+                                 positions=comment_block.position, code='annotation')
 
                 # Always store the block even if it's a duplicate for
                 # backward compatibility...
@@ -681,7 +681,7 @@ class AnnotationParser(object):
                         marker = ' '*colon_column + '^'
                         message.warn("missing ':' at column %s:\n%s\n%s" %
                                      (colon_start, original_line, marker),
-                                     position)
+                                     positions=position, code='annotation')
                     continue
                 else:
                     # If we get here, the identifier was not recognized, so
@@ -696,7 +696,7 @@ class AnnotationParser(object):
                     marker = ' '*column_offset + '^'
                     message.warn('ignoring unrecognized GTK-Doc comment block, identifier not '
                                  'found:\n%s\n%s' % (original_line, marker),
-                                 position)
+                                 positions=position, code='annotation')
 
                     return None
 
@@ -717,7 +717,7 @@ class AnnotationParser(object):
                     marker = ' '*column + '^'
                     message.warn("'@%s' parameter unexpected at this location:\n%s\n%s" %
                                  (param_name, original_line, marker),
-                                 position)
+                                 positions=position, code='annotation')
 
                 # Old style GTK-Doc allowed return values to be specified as
                 # parameters instead of tags.
@@ -729,13 +729,13 @@ class AnnotationParser(object):
                     else:
                         message.warn("encountered multiple 'Returns' parameters or tags for "
                                      "'%s'." % (comment_block.name),
-                                     position)
+                                     positions=position, code='annotation')
                 elif param_name in comment_block.params.keys():
                     column = result.start('parameter_name') + column_offset
                     marker = ' '*column + '^'
                     message.warn("multiple '@%s' parameters for identifier '%s':\n%s\n%s" %
                                  (param_name, comment_block.name, original_line, marker),
-                                 position)
+                                 positions=position, code='annotation')
 
                 tag = DocTag(comment_block, param_name)
                 tag.set_position(position)
@@ -778,7 +778,7 @@ class AnnotationParser(object):
                     marker = ' '*column + '^'
                     message.warn("'%s:' tag unexpected at this location:\n%s\n%s" %
                                  (tag_name, original_line, marker),
-                                 position)
+                                 positions=position, code='annotation')
 
                 if tag_name.lower() in [TAG_RETURNS, TAG_RETURNVALUE]:
                     if not returns_seen:
@@ -786,7 +786,7 @@ class AnnotationParser(object):
                     else:
                         message.warn("encountered multiple 'Returns' parameters or tags for "
                                      "'%s'." % (comment_block.name),
-                                     position)
+                                     positions=position, code='annotation')
 
                     tag = DocTag(comment_block, TAG_RETURNS)
                     tag.position = position
@@ -802,7 +802,7 @@ class AnnotationParser(object):
                         marker = ' '*column + '^'
                         message.warn("multiple '%s:' tags for identifier '%s':\n%s\n%s" %
                                      (tag_name, comment_block.name, original_line, marker),
-                                     position)
+                                     positions=position, code='annotation')
 
                     tag = DocTag(comment_block, tag_name.lower())
                     tag.position = position
@@ -813,7 +813,7 @@ class AnnotationParser(object):
                         else:
                             message.warn("annotations not supported for tag '%s'." %
                                          (tag_name),
-                                         position)
+                                         positions=position, code='annotation')
                     comment_block.tags[tag_name.lower()] = tag
                     current_tag = tag
                     continue
@@ -836,7 +836,7 @@ class AnnotationParser(object):
                 if not current_param:
                     message.warn('parameter expected:\n%s' %
                                  (line),
-                                 position)
+                                 positions=position, code='annotation')
                 else:
                     self._validate_multiline_annotation_continuation(line, original_line,
                                                                      column_offset, position)
@@ -847,7 +847,7 @@ class AnnotationParser(object):
                 if not current_tag:
                     message.warn('tag expected:\n%s' %
                                  (line),
-                                 position)
+                                 positions=position, code='annotation')
                 else:
                     self._validate_multiline_annotation_continuation(line, original_line,
                                                                      column_offset, position)
@@ -908,7 +908,7 @@ class AnnotationParser(object):
             marker = ' '*column + '^'
             message.warn('ignoring invalid multiline annotation continuation:\n'
                          '%s\n%s' % (original_line, marker),
-                         position)
+                         positions=position, code='annotation')
 
     @classmethod
     def parse_options(cls, tag, value):
@@ -606,7 +606,7 @@ class Function(Callable):
         if (not rettype.is_equiv(TYPE_GTYPE) and
            rettype.target_giname != 'Gtk.Type'):
             message.warn("function '%s' returns '%r', not a GType" %
-                         (self.name, rettype))
+                         (self.name, rettype), code='gtype')
             return False
 
         return True
@@ -31,6 +31,19 @@ import giscanner
 
 _CACHE_VERSION_FILENAME = '.cache-version'
 
+# Pickled cache entries kept in memory by long-running processes,
+# see enable_resident_cache().  Maps filename -> (mtime, pickled data)
+_resident = None
+
+
+def enable_resident_cache():
+    """Keep every entry loaded or stored by a CacheStore in memory
+as well, so that later loads in the same process do not have to go
+to disk.  Used by the scanner daemon."""
+    global _resident
+    if _resident is None:
+        _resident = {}
+
 def _get_versionhash():
     toplevel = os.path.dirname(giscanner.__file__)
     # Use pyc instead of py to avoid extra IO
@@ -110,13 +123,13 @@ class CacheStore(object):
 
         fp.write(current_hash)
 
-    def _get_filename(self, filename):
+    def _get_filename(self, filename, variant):
         # If we couldn't create the directory we're probably
         # on a read only home directory where we just disable
         # the cache all together.
         if self._directory is None:
             return
-        hexdigest = hashlib.sha1(filename).hexdigest()
+        hexdigest = hashlib.sha1(filename + variant).hexdigest()
         return os.path.join(self._directory, hexdigest)
 
     def _cache_is_valid(self, store_filename, filename):
@@ -139,14 +152,34 @@ class CacheStore(object):
             else:
                 raise
 
+    def _load_resident(self, filename, variant):
+        entry = _resident.get((filename, variant))
+        if entry is None:
+            return None
+        mtime, pickled = entry
+        if os.stat(filename).st_mtime != mtime:
+            del _resident[(filename, variant)]
+            return None
+        return cPickle.loads(pickled)
+
+    def _store_resident(self, filename, variant, data):
+        _resident[(filename, variant)] = (
+            os.stat(filename).st_mtime,
+            cPickle.dumps(data, cPickle.HIGHEST_PROTOCOL))
+
     def _clean(self):
         for filename in os.listdir(self._directory):
             if filename == _CACHE_VERSION_FILENAME:
                 continue
             self._remove_filename(os.path.join(self._directory, filename))
 
-    def store(self, filename, data):
-        store_filename = self._get_filename(filename)
+    def store(self, filename, data, variant=''):
+        """Store data derived from filename; variant tells apart
+different kinds of data derived from the same file."""
+        if _resident is not None:
+            self._store_resident(filename, variant, data)
+
+        store_filename = self._get_filename(filename, variant)
         if store_filename is None:
             return
 
@@ -174,8 +207,13 @@ class CacheStore(object):
             else:
                 raise
 
-    def load(self, filename):
-        store_filename = self._get_filename(filename)
+    def load(self, filename, variant=''):
+        if _resident is not None:
+            data = self._load_resident(filename, variant)
+            if data is not None:
+                return data
+
+        store_filename = self._get_filename(filename, variant)
         if store_filename is None:
             return
         try:
@@ -193,4 +231,6 @@ class CacheStore(object):
             # Broken cache entry, remove it
             self._remove_filename(store_filename)
             data = None
+        if data is not None and _resident is not None:
+            self._store_resident(filename, variant, data)
         return data
@@ -25,7 +25,7 @@ from .mallardwriter import MallardWriter
 from .transformer import Transformer
 
 def doc_main(args):
-    parser = optparse.OptionParser('%prog [options] GIR-file')
+    parser = optparse.OptionParser('%prog [options] GIR-file...')
 
     parser.add_option("-o", "--output",
                       action="store", dest="output",
@@ -34,6 +34,15 @@ def doc_main(args):
                       action="store", dest="language",
                       default="Python",
                       help="Output language")
+    parser.add_option("-j", "--jobs",
+                      action="store", dest="jobs", type="int",
+                      default=1,
+                      help="Number of processes rendering pages")
+    parser.add_option("", "--incremental",
+                      action="store_true", dest="incremental",
+                      default=False,
+                      help="Only rewrite the pages that changed since "
+                           "the last run")
 
     options, args = parser.parse_args(args)
     if not options.output:
@@ -50,9 +59,20 @@ def doc_main(args):
         extra_include_dirs = [os.path.join(top_srcdir, 'gir'), top_builddir]
     else:
         extra_include_dirs = []
-    transformer = Transformer.parse_from_gir(args[1], extra_include_dirs)
+    transformers = Transformer.parse_from_girs(args[1:], extra_include_dirs)
 
-    writer = MallardWriter(transformer, options.language)
-    writer.write(options.output)
+    for transformer in transformers:
+        output = options.output
+        # The pages of several namespaces go to a directory each, they
+        # would all have an index page
+        if len(transformers) > 1:
+            namespace = transformer.namespace
+            output = os.path.join(output, '%s-%s' % (namespace.name,
+                                                     namespace.version))
+            if not os.path.isdir(output):
+                os.mkdir(output)
+        writer = MallardWriter(transformer, options.language)
+        writer.write(output, jobs=options.jobs,
+                     incremental=options.incremental)
 
     return 0
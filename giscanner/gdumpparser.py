@@ -363,7 +363,8 @@ different --identifier-prefix.""" % (xmlnode.attrib['name'], self._namespace.ide
         if isinstance(record, ast.Record):
             node.ctype = record.ctype
         else:
-            message.warn_node(node, "Couldn't find associated structure for '%r'" % (node.name, ))
+            message.warn_node(node, "Couldn't find associated structure for '%r'" % (node.name, ),
+                              code='gtype')
 
         # GtkFileChooserEmbed is an example of a private interface, we
         # just filter them out
@@ -466,7 +467,7 @@ different --identifier-prefix.""" % (xmlnode.attrib['name'], self._namespace.ide
         try:
             fundamental_name = self._transformer.strip_identifier(type_name)
         except TransformerException, e:
-            message.warn(e)
+            message.warn(e, code='gtype')
             return
 
         node = ast.Class(fundamental_name, None,
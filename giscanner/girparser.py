@@ -20,7 +20,8 @@
 
 import os
 
-from xml.etree.cElementTree import parse
+from cStringIO import StringIO
+from xml.etree.cElementTree import parse, TreeBuilder, XMLParser
 
 from . import ast
 from .girwriter import COMPATIBLE_GIR_VERSION
@@ -41,6 +42,80 @@ def _glibns(tag):
 def _cns(tag):
     return '{%s}%s' % (C_NS, tag)
 
+_TYPE_TAGS = frozenset(map(_corens, ('callback', 'array', 'varargs', 'type')))
+
+# Elements inside a namespace which a types_only parser never looks at;
+# they are dropped by the expat target without building elements.
+_TYPES_ONLY_SKIPPED_TAGS = frozenset(
+    map(_corens, ('constant', 'constructor', 'doc', 'field', 'function',
+                  'implements', 'member', 'method', 'prerequisite',
+                  'property', 'virtual-method')) +
+    [_glibns('signal')])
+
+_DOC_TAG = _corens('doc')
+_NAMESPACE_TAG = _corens('namespace')
+
+_READ_SIZE = 64 * 1024
+
+
+class _StreamingTarget(object):
+    """An XMLParser target which hands every child of <repository> and
+<namespace> to the GIRParser as soon as it has been parsed, and drops
+it afterwards, so only one toplevel node is kept in memory at a time.
+Subtrees rooted at a tag in skip_tags are not built at all.
+
+The only text the parser reads is the one of <doc> elements.  This
+target drops all character data, which is fine for types_only parsers;
+_StreamingDocTarget keeps the text of <doc> elements."""
+
+    def __init__(self, parser, skip_tags):
+        self._parser = parser
+        self._skip_tags = skip_tags
+        self._skip_depth = 0
+        self._in_doc = False
+        self._builder = TreeBuilder()
+        self._stack = []
+
+    def start(self, tag, attrib):
+        if self._skip_depth:
+            self._skip_depth += 1
+            return
+        depth = len(self._stack)
+        if depth >= 2 and tag in self._skip_tags:
+            self._skip_depth = 1
+            return
+        elem = self._builder.start(tag, attrib)
+        self._stack.append(elem)
+        self._in_doc = tag == _DOC_TAG
+        if depth == 0:
+            self._parser._parse_repository(elem)
+        elif depth == 1 and tag == _NAMESPACE_TAG:
+            self._parser._parse_namespace(elem)
+
+    def end(self, tag):
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        self._in_doc = False
+        elem = self._builder.end(tag)
+        self._stack.pop()
+        depth = len(self._stack)
+        if depth == 1:
+            self._parser._parse_repository_child(elem)
+        elif depth == 2:
+            self._parser._parse_namespace_child(elem)
+            self._stack[-1].remove(elem)
+
+    def close(self):
+        return self._builder.close()
+
+
+class _StreamingDocTarget(_StreamingTarget):
+
+    def data(self, data):
+        if self._in_doc:
+            self._builder.data(data)
+
 
 class GIRParser(object):
 
@@ -57,17 +132,21 @@ class GIRParser(object):
     def parse(self, filename):
         filename = os.path.abspath(filename)
         self._filename_stack.append(filename)
-        tree = parse(filename)
-        self.parse_tree(tree)
+        f = open(filename, 'rb')
+        try:
+            self._parse_stream(f)
+        finally:
+            f.close()
+        self._filename_stack.pop()
+
+    def parse_data(self, data, filename='<data>'):
+        """Like parse(), but parses a .gir document held in memory."""
+        self._filename_stack.append(filename)
+        self._parse_stream(StringIO(data))
         self._filename_stack.pop()
 
     def parse_tree(self, tree):
-        self._includes.clear()
-        self._namespace = None
-        self._shared_libraries = []
-        self._pkgconfig_packages = set()
-        self._c_includes = set()
-        self._c_prefix = None
+        self._reset()
         self._parse_api(tree.getroot())
 
     def get_namespace(self):
@@ -97,17 +176,43 @@ class GIRParser(object):
 
     def _find_first_child(self, node, name_or_names):
         if isinstance(name_or_names, str):
-            for child in node.getchildren():
+            for child in node:
                 if child.tag == name_or_names:
                     return child
         else:
-            for child in node.getchildren():
+            for child in node:
                 if child.tag in name_or_names:
                     return child
         return None
 
     def _find_children(self, node, name):
-        return [child for child in node.getchildren() if child.tag == name]
+        return [child for child in node if child.tag == name]
+
+    def _reset(self):
+        self._includes.clear()
+        self._namespace = None
+        self._shared_libraries = []
+        self._pkgconfig_packages = set()
+        self._c_includes = set()
+        self._c_prefix = None
+        self._parser_methods = None
+
+    def _parse_stream(self, f):
+        self._reset()
+        if self._types_only:
+            target = _StreamingTarget(self, _TYPES_ONLY_SKIPPED_TAGS)
+        else:
+            target = _StreamingDocTarget(self, frozenset())
+        parser = XMLParser(target=target)
+        while True:
+            data = f.read(_READ_SIZE)
+            if not data:
+                break
+            parser.feed(data)
+        parser.close()
+        assert self._namespace is not None
+        # Bound methods can't be pickled, see CacheStore
+        self._parser_methods = None
 
     def _get_current_file(self):
         if not self._filename_stack:
@@ -119,6 +224,18 @@ class GIRParser(object):
         return curfile
 
     def _parse_api(self, root):
+        self._parse_repository(root)
+        for node in root:
+            self._parse_repository_child(node)
+
+        ns = root.find(_corens('namespace'))
+        assert ns is not None
+        self._parse_namespace(ns)
+        for node in ns:
+            self._parse_namespace_child(node)
+        self._parser_methods = None
+
+    def _parse_repository(self, root):
         assert root.tag == _corens('repository')
         version = root.attrib['version']
         if version != COMPATIBLE_GIR_VERSION:
@@ -126,16 +243,15 @@ class GIRParser(object):
                              % (self._get_current_file(),
                                 version, COMPATIBLE_GIR_VERSION))
 
-        for node in root.getchildren():
-            if node.tag == _corens('include'):
-                self._parse_include(node)
-            elif node.tag == _corens('package'):
-                self._parse_pkgconfig_package(node)
-            elif node.tag == _cns('include'):
-                self._parse_c_include(node)
+    def _parse_repository_child(self, node):
+        if node.tag == _corens('include'):
+            self._parse_include(node)
+        elif node.tag == _corens('package'):
+            self._parse_pkgconfig_package(node)
+        elif node.tag == _cns('include'):
+            self._parse_c_include(node)
 
-        ns = root.find(_corens('namespace'))
-        assert ns is not None
+    def _parse_namespace(self, ns):
         identifier_prefixes = ns.attrib.get(_cns('identifier-prefixes'))
         if identifier_prefixes:
             identifier_prefixes = identifier_prefixes.split(',')
@@ -150,7 +266,7 @@ class GIRParser(object):
             self._shared_libraries.extend(
                 ns.attrib['shared-library'].split(','))
 
-        parser_methods = {
+        self._parser_methods = {
             _corens('alias'): self._parse_alias,
             _corens('bitfield'): self._parse_enumeration_bitfield,
             _corens('callback'): self._parse_callback,
@@ -163,13 +279,13 @@ class GIRParser(object):
             }
 
         if not self._types_only:
-            parser_methods[_corens('constant')] = self._parse_constant
-            parser_methods[_corens('function')] = self._parse_function
+            self._parser_methods[_corens('constant')] = self._parse_constant
+            self._parser_methods[_corens('function')] = self._parse_function
 
-        for node in ns.getchildren():
-            method = parser_methods.get(node.tag)
-            if method is not None:
-                method(node)
+    def _parse_namespace_child(self, node):
+        method = self._parser_methods.get(node.tag)
+        if method is not None:
+            method(node)
 
     def _parse_include(self, node):
         include = ast.Include(node.attrib['name'],
@@ -454,9 +570,8 @@ class GIRParser(object):
             assert False, "Failed to parse inner type"
 
     def _parse_type(self, node):
-        for name in map(_corens, ('callback', 'array', 'varargs', 'type')):
-            typenode = node.find(name)
-            if typenode is not None:
+        for typenode in node:
+            if typenode.tag in _TYPE_TAGS:
                 return self._parse_type_simple(typenode)
         assert False, "Failed to parse toplevel type"
 
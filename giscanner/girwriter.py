@@ -21,6 +21,8 @@
 
 from __future__ import with_statement
 
+from operator import attrgetter
+
 from . import ast
 from .xmlwriter import XMLWriter
 
@@ -28,16 +30,35 @@ from .xmlwriter import XMLWriter
 # Compatible changes we just make inline
 COMPATIBLE_GIR_VERSION = '1.2'
 
+# Sort keys, cheaper than going through the __cmp__ methods of the
+# nodes for every comparison.  Nodes which end up in the same list share
+# a namespace, so ordering them by name is what Node.__cmp__ amounts to.
+_name_key = attrgetter('name')
+
+
+def _namespace_key(node):
+    # We want aliases to be first.  They're a bit
+    # special because the typelib compiler expands them.
+    return (not isinstance(node, ast.Alias), node.name)
+
+
+def _type_key(typeval):
+    # Same order as Type.__cmp__ for lists of types of the same kind
+    return (typeval.target_fundamental or typeval.target_giname or
+            typeval.target_foreign or typeval.ctype)
+
 class GIRWriter(XMLWriter):
 
-    def __init__(self, namespace, shlibs, includes, pkgs, c_includes):
-        super(GIRWriter, self).__init__()
+    def __init__(self, namespace, shlibs, includes, pkgs, c_includes,
+                 output=None):
+        super(GIRWriter, self).__init__(output)
         self.write_comment(
 '''This file was automatically generated from C sources - DO NOT EDIT!
 To affect the contents of this file, edit the original C definitions,
 and/or use gtk-doc annotations. ''')
         self._write_repository(namespace, shlibs, includes, pkgs,
                                c_includes)
+        self.flush()
 
     def _write_repository(self, namespace, shlibs, includes=None,
                           packages=None, c_includes=None):
@@ -83,20 +104,7 @@ and/or use gtk-doc annotations. ''')
                  ('c:identifier-prefixes', ','.join(namespace.identifier_prefixes)),
                  ('c:symbol-prefixes', ','.join(namespace.symbol_prefixes))]
         with self.tagcontext('namespace', attrs):
-            # We define a custom sorting function here because
-            # we want aliases to be first.  They're a bit
-            # special because the typelib compiler expands them.
-            def nscmp(a, b):
-                if isinstance(a, ast.Alias):
-                    if isinstance(b, ast.Alias):
-                        return cmp(a.name, b.name)
-                    else:
-                        return -1
-                elif isinstance(b, ast.Alias):
-                    return 1
-                else:
-                    return cmp(a, b)
-            for node in sorted(namespace.itervalues(), cmp=nscmp):
+            for node in sorted(namespace.itervalues(), key=_namespace_key):
                 self._write_node(node)
 
     def _write_node(self, node):
@@ -337,7 +345,7 @@ and/or use gtk-doc annotations. ''')
             self._write_generic(enum)
             for member in enum.members:
                 self._write_member(member)
-            for method in sorted(enum.static_methods):
+            for method in sorted(enum.static_methods, key=_name_key):
                 self._write_static_method(method)
 
     def _write_bitfield(self, bitfield):
@@ -350,7 +358,7 @@ and/or use gtk-doc annotations. ''')
             self._write_generic(bitfield)
             for member in bitfield.members:
                 self._write_member(member)
-            for method in sorted(bitfield.static_methods):
+            for method in sorted(bitfield.static_methods, key=_name_key):
                 self._write_static_method(method)
 
     def _write_member(self, member):
@@ -404,28 +412,28 @@ and/or use gtk-doc annotations. ''')
         with self.tagcontext(tag_name, attrs):
             self._write_generic(node)
             if isinstance(node, ast.Class):
-                for iface in sorted(node.interfaces):
+                for iface in sorted(node.interfaces, key=_type_key):
                     self.write_tag('implements',
                                    [('name', self._type_to_name(iface))])
             if isinstance(node, ast.Interface):
-                for iface in sorted(node.prerequisites):
+                for iface in sorted(node.prerequisites, key=_type_key):
                     self.write_tag('prerequisite',
                                    [('name', self._type_to_name(iface))])
             if isinstance(node, ast.Class):
-                for method in sorted(node.constructors):
+                for method in sorted(node.constructors, key=_name_key):
                     self._write_constructor(method)
             if isinstance(node, (ast.Class, ast.Interface)):
-                for method in sorted(node.static_methods):
+                for method in sorted(node.static_methods, key=_name_key):
                     self._write_static_method(method)
-            for vfunc in sorted(node.virtual_methods):
+            for vfunc in sorted(node.virtual_methods, key=_name_key):
                 self._write_vfunc(vfunc)
-            for method in sorted(node.methods):
+            for method in sorted(node.methods, key=_name_key):
                 self._write_method(method)
-            for prop in sorted(node.properties):
+            for prop in sorted(node.properties, key=_name_key):
                 self._write_property(prop)
             for field in node.fields:
                 self._write_field(field)
-            for signal in sorted(node.signals):
+            for signal in sorted(node.signals, key=_name_key):
                 self._write_signal(signal)
 
     def _write_boxed(self, boxed):
@@ -435,11 +443,11 @@ and/or use gtk-doc annotations. ''')
         self._append_registered(boxed, attrs)
         with self.tagcontext('glib:boxed', attrs):
             self._write_generic(boxed)
-            for method in sorted(boxed.constructors):
+            for method in sorted(boxed.constructors, key=_name_key):
                 self._write_constructor(method)
-            for method in sorted(boxed.methods):
+            for method in sorted(boxed.methods, key=_name_key):
                 self._write_method(method)
-            for method in sorted(boxed.static_methods):
+            for method in sorted(boxed.static_methods, key=_name_key):
                 self._write_static_method(method)
 
     def _write_property(self, prop):
@@ -498,11 +506,11 @@ and/or use gtk-doc annotations. ''')
             if record.fields:
                 for field in record.fields:
                     self._write_field(field, is_gtype_struct)
-            for method in sorted(record.constructors):
+            for method in sorted(record.constructors, key=_name_key):
                 self._write_constructor(method)
-            for method in sorted(record.methods):
+            for method in sorted(record.methods, key=_name_key):
                 self._write_method(method)
-            for method in sorted(record.static_methods):
+            for method in sorted(record.static_methods, key=_name_key):
                 self._write_static_method(method)
 
     def _write_union(self, union):
@@ -521,11 +529,11 @@ and/or use gtk-doc annotations. ''')
             if union.fields:
                 for field in union.fields:
                     self._write_field(field)
-            for method in sorted(union.constructors):
+            for method in sorted(union.constructors, key=_name_key):
                 self._write_constructor(method)
-            for method in sorted(union.methods):
+            for method in sorted(union.methods, key=_name_key):
                 self._write_method(method)
-            for method in sorted(union.static_methods):
+            for method in sorted(union.static_methods, key=_name_key):
                 self._write_static_method(method)
 
     def _write_field(self, field, is_gtype_struct=False):
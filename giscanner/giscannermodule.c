@@ -489,6 +489,27 @@ pygi_source_scanner_lex_filename (PyGISourceScanner *self,
   return Py_None;
 }
 
+static PyObject *
+pygi_source_scanner_lex_comments (PyGISourceScanner *self,
+				  PyObject          *args)
+{
+  char *filename;
+  GError *error = NULL;
+
+  if (!PyArg_ParseTuple (args, "s:SourceScanner.lex_comments", &filename))
+    return NULL;
+
+  if (!gi_source_scanner_lex_comments (self->scanner, filename, &error))
+    {
+      PyErr_SetString (PyExc_IOError, error->message);
+      g_error_free (error);
+      return NULL;
+    }
+
+  Py_INCREF (Py_None);
+  return Py_None;
+}
+
 static PyObject *
 pygi_source_scanner_set_macro_scan (PyGISourceScanner *self,
 				    PyObject          *args)
@@ -554,6 +575,7 @@ static const PyMethodDef _PyGISourceScanner_methods[] = {
   { "parse_file", (PyCFunction) pygi_source_scanner_parse_file, METH_VARARGS },
   { "parse_macros", (PyCFunction) pygi_source_scanner_parse_macros, METH_VARARGS },
   { "lex_filename", (PyCFunction) pygi_source_scanner_lex_filename, METH_VARARGS },
+  { "lex_comments", (PyCFunction) pygi_source_scanner_lex_comments, METH_VARARGS },
   { "set_macro_scan", (PyCFunction) pygi_source_scanner_set_macro_scan, METH_VARARGS },
   { NULL, NULL, 0 }
 };
@@ -21,31 +21,77 @@ from . import ast
 from . import message
 from .annotationparser import TAG_RETURNS
 
+# These are not introspectable pending us adding
+# larger type tags to the typelib (in theory these could
+# be 128 bit or larger)
+_unsupported_fundamentals = frozenset(
+    [ast.TYPE_VALIST.target_fundamental,
+     ast.TYPE_LONG_LONG.target_fundamental,
+     ast.TYPE_LONG_ULONG.target_fundamental,
+     ast.TYPE_LONG_DOUBLE.target_fundamental])
+
 class IntrospectablePass(object):
 
     def __init__(self, transformer, blocks):
         self._transformer = transformer
         self._namespace = transformer.namespace
         self._blocks = blocks
+        # giname -> node, the nodes don't move while the pass runs
+        self._targets = {}
+        # giname -> whether types pointing to it are introspectable
+        self._target_verdicts = {}
 
     # Public API
 
     def validate(self):
-        self._namespace.walk(self._introspectable_alias_analysis)
-        self._namespace.walk(self._propagate_callable_skips)
-        self._namespace.walk(self._analyze_node)
-        self._namespace.walk(self._introspectable_callable_analysis)
-        self._namespace.walk(self._introspectable_callable_analysis)
-        self._namespace.walk(self._introspectable_pass3)
-        self._namespace.walk(self._remove_non_reachable_backcompat_copies)
-
-    def _parameter_warning(self, parent, param, text, position=None):
+        # One walk to find the nodes, everything after works on lists
+        self._callables = []
+        self._aliases = []
+        self._compounds = []
+        self._targets.clear()
+        self._target_verdicts.clear()
+        self._namespace.walk(self._collect_node)
+
+        self._propagate_skips()
+        # Callables that are skipped or below a skipped node are left alone
+        live_callables = [obj for obj, stack_skipped in self._callables
+                          if not (stack_skipped or obj.skip)]
+        # Our first pass for scriptability
+        for obj in live_callables:
+            for param in obj.parameters:
+                self._introspectable_param_analysis(obj, param)
+            self._introspectable_param_analysis(obj, obj.retval)
+        self._propagate_introspectability(self._aliases + live_callables)
+        for obj in self._compounds:
+            self._introspectable_member_analysis(obj)
+        self._remove_non_reachable_backcompat_copies(live_callables)
+
+    def _collect_node(self, obj, stack):
+        stack_skipped = any(node.skip for node in stack)
+        if isinstance(obj, ast.Callable):
+            self._callables.append((obj, stack_skipped))
+        elif isinstance(obj, ast.Alias):
+            self._aliases.append(obj)
+        elif (isinstance(obj, (ast.Class, ast.Interface,
+                               ast.Record, ast.Union))
+              and not (stack_skipped or obj.skip)):
+            self._compounds.append(obj)
+        return True
+
+    def _parameter_warning(self, parent, param, text, *args):
         # Suppress VFunctions and Callbacks warnings for now
         # they cause more problems then they are worth
         if isinstance(parent, (ast.VFunction, ast.Callback)):
             return
 
+        logger = message.MessageLogger.get()
+        if not logger.is_kept(message.WARNING, 'introspectable'):
+            # Still counted, but nothing is looked up or formatted for it
+            logger.log(message.WARNING, text, code='introspectable')
+            return
+
         block = None
+        position = None
         if hasattr(parent, 'symbol'):
             prefix = '%s: ' % (parent.symbol, )
             block = self._blocks.get(parent.symbol)
@@ -61,8 +107,8 @@ class IntrospectablePass(object):
                 return_tag = block.get_tag(TAG_RETURNS)
                 if return_tag:
                     position = return_tag.position
-        message.warn_node(parent, prefix + context + text,
-                          positions=position)
+        message.warn_node(parent, prefix + context + text, *args,
+                          positions=position, code='introspectable')
 
     def _introspectable_param_analysis(self, parent, node):
         is_return = isinstance(node, ast.Return)
@@ -70,7 +116,7 @@ class IntrospectablePass(object):
         assert is_return or is_parameter
 
         if node.type.target_giname is not None:
-            target = self._transformer.lookup_typenode(node.type)
+            target = self._lookup_typenode(node.type)
         else:
             target = None
 
@@ -78,8 +124,8 @@ class IntrospectablePass(object):
             return
 
         if not node.type.resolved:
-            self._parameter_warning(parent, node,
-"Unresolved type: %r" % (node.type.unresolved_string, ))
+            self._parameter_warning(parent, node, "Unresolved type: %r",
+                                    node.type.unresolved_string)
             parent.introspectable = False
             return
 
@@ -100,8 +146,8 @@ class IntrospectablePass(object):
             and node.scope is None):
                 self._parameter_warning(parent, node,
                     ("Missing (scope) annotation for callback" +
-                     " without GDestroyNotify (valid: %s, %s)")
-                     % (ast.PARAM_SCOPE_CALL, ast.PARAM_SCOPE_ASYNC))
+                     " without GDestroyNotify (valid: %s, %s)"),
+                    ast.PARAM_SCOPE_CALL, ast.PARAM_SCOPE_ASYNC)
                 parent.introspectable = False
                 return
 
@@ -138,99 +184,124 @@ class IntrospectablePass(object):
         if typeval.target_foreign:
             return True
         if typeval.target_fundamental:
-            if typeval.is_equiv(ast.TYPE_VALIST):
-                return False
-            # These are not introspectable pending us adding
-            # larger type tags to the typelib (in theory these could
-            # be 128 bit or larger)
-            if typeval.is_equiv((ast.TYPE_LONG_LONG, ast.TYPE_LONG_ULONG,
-                                 ast.TYPE_LONG_DOUBLE)):
-                return False
-            return True
-        target = self._transformer.lookup_typenode(typeval)
-        if not target:
-            return False
-        return target.introspectable and (not target.skip)
+            return typeval.target_fundamental not in _unsupported_fundamentals
+        verdict = self._target_verdicts.get(typeval.target_giname)
+        if verdict is None:
+            target = self._lookup_typenode(typeval)
+            verdict = (target is not None and target.introspectable
+                       and not target.skip)
+            self._target_verdicts[typeval.target_giname] = verdict
+        return verdict
 
-    def _propagate_parameter_skip(self, parent, node):
-        if node.type.target_giname is not None:
-            target = self._transformer.lookup_typenode(node.type)
-            if target is None:
-                return
-        else:
-            return
+    def _lookup_typenode(self, typeval):
+        giname = typeval.target_giname
+        if giname is None:
+            return None
+        try:
+            return self._targets[giname]
+        except KeyError:
+            target = self._transformer.lookup_typenode(typeval)
+            self._targets[giname] = target
+            return target
 
-        if target.skip:
-            parent.skip = True
+    def _set_not_introspectable(self, obj):
+        # Skips and the parameter analysis are done before the first
+        # verdict is cached, after that flags only change through here
+        obj.introspectable = False
+        if obj.namespace is not None:
+            giname = '%s.%s' % (obj.namespace.name, obj.name)
+            self._target_verdicts.pop(giname, None)
 
-    def _introspectable_alias_analysis(self, obj, stack):
-        if isinstance(obj, ast.Alias):
-            if not self._type_is_introspectable(obj.target):
-                obj.introspectable = False
-        return True
+    def _get_type_targets(self, typeval, targets):
+        """Add the nodes whose flags _type_is_introspectable() looks
+at for typeval to targets."""
+        if not typeval.resolved or isinstance(typeval, ast.TypeUnknown):
+            return
+        if isinstance(typeval, (ast.Array, ast.List)):
+            self._get_type_targets(typeval.element_type, targets)
+        elif isinstance(typeval, ast.Map):
+            self._get_type_targets(typeval.key_type, targets)
+            self._get_type_targets(typeval.value_type, targets)
+        elif not (typeval.target_foreign or typeval.target_fundamental):
+            target = self._lookup_typenode(typeval)
+            if target is not None:
+                targets.append(target)
 
-    def _propagate_callable_skips(self, obj, stack):
-        if isinstance(obj, ast.Callable):
-            for param in obj.parameters:
-                self._propagate_parameter_skip(obj, param)
-            self._propagate_parameter_skip(obj, obj.retval)
-        return True
+    def _propagate_skips(self):
+        """Skip every callable that takes or returns a skipped type,
+and in turn the callables taking or returning those, until nothing
+changes."""
+        users = {}
+        worklist = []
+        for obj, unused in self._callables:
+            for param in obj.parameters + [obj.retval]:
+                target = self._lookup_typenode(param.type)
+                if target is None:
+                    continue
+                users.setdefault(id(target), []).append(obj)
+                if target.skip and not obj.skip:
+                    obj.skip = True
+                    worklist.append(obj)
+        while worklist:
+            target = worklist.pop()
+            for obj in users.get(id(target), []):
+                if not obj.skip:
+                    obj.skip = True
+                    worklist.append(obj)
 
-    def _analyze_node(self, obj, stack):
-        if obj.skip:
-            return False
-        # Our first pass for scriptability
-        if isinstance(obj, ast.Callable):
-            for param in obj.parameters:
-                self._introspectable_param_analysis(obj, param)
-            self._introspectable_param_analysis(obj, obj.retval)
-        if isinstance(obj, (ast.Class, ast.Interface, ast.Record, ast.Union)):
-            for field in obj.fields:
-                if field.type:
-                    if not self._type_is_introspectable(field.type):
-                        field.introspectable = False
-        return True
+    def _is_introspectable(self, obj):
+        if isinstance(obj, ast.Alias):
+            return self._type_is_introspectable(obj.target)
+        for param in obj.parameters:
+            if not self._type_is_introspectable(param.type):
+                return False
+        return self._type_is_introspectable(obj.retval.type)
 
-    def _introspectable_callable_analysis(self, obj, stack):
-        if obj.skip:
-            return False
-        # Propagate introspectability of parameters to entire functions
-        if isinstance(obj, ast.Callable):
-            for param in obj.parameters:
-                if not self._type_is_introspectable(param.type):
-                    obj.introspectable = False
-                    return True
-            if not self._type_is_introspectable(obj.retval.type):
-                obj.introspectable = False
-                return True
-        return True
+    def _propagate_introspectability(self, nodes):
+        """Mark the aliases and callables in nodes that refer to a type
+which is not introspectable, then the ones referring to those, and
+so on until nothing changes."""
+        users = {}
+        worklist = []
+        for obj in nodes:
+            targets = []
+            if isinstance(obj, ast.Alias):
+                self._get_type_targets(obj.target, targets)
+            else:
+                for param in obj.parameters:
+                    self._get_type_targets(param.type, targets)
+                self._get_type_targets(obj.retval.type, targets)
+            for target in targets:
+                users.setdefault(id(target), []).append(obj)
+            if obj.introspectable and not self._is_introspectable(obj):
+                self._set_not_introspectable(obj)
+            if not obj.introspectable:
+                worklist.append(obj)
+        while worklist:
+            target = worklist.pop()
+            for obj in users.get(id(target), []):
+                if obj.introspectable and not self._is_introspectable(obj):
+                    self._set_not_introspectable(obj)
+                    worklist.append(obj)
 
-    def _introspectable_pass3(self, obj, stack):
-        if obj.skip:
-            return False
+    def _introspectable_member_analysis(self, obj):
         # Propagate introspectability for fields
-        if isinstance(obj, (ast.Class, ast.Interface, ast.Record, ast.Union)):
-            for field in obj.fields:
-                if field.anonymous_node:
-                    if not field.anonymous_node.introspectable:
-                        field.introspectable = False
-                else:
-                    if not self._type_is_introspectable(field.type):
-                        field.introspectable = False
+        for field in obj.fields:
+            if field.type:
+                if not self._type_is_introspectable(field.type):
+                    field.introspectable = False
+            if field.anonymous_node:
+                if not field.anonymous_node.introspectable:
+                    field.introspectable = False
         # Propagate introspectability for properties
         if isinstance(obj, (ast.Class, ast.Interface)):
             for prop in obj.properties:
                 if not self._type_is_introspectable(prop.type):
                     prop.introspectable = False
-            for sig in obj.signals:
-                self._introspectable_callable_analysis(sig, [obj])
-        return True
 
-    def _remove_non_reachable_backcompat_copies(self, obj, stack):
-        if obj.skip:
-            return False
-        if (isinstance(obj, ast.Function)
-            and not obj.introspectable
-            and obj.moved_to is not None):
-            self._namespace.remove(obj)
-        return True
+    def _remove_non_reachable_backcompat_copies(self, live_callables):
+        for obj in live_callables:
+            if (isinstance(obj, ast.Function)
+                and not obj.introspectable
+                and obj.moved_to is not None):
+                self._namespace.remove(obj)
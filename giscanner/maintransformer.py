@@ -134,7 +134,7 @@ usage is void (*_gtk_reserved1)(void);"""
             message.log_node(
                 message.FATAL, parent,
                 "can't find parameter %s referenced by %s of %r"
-                % (param_name, origin_name, parent.name))
+                % (param_name, origin_name, parent.name), code='transform')
 
         return param.argname
 
@@ -149,19 +149,19 @@ usage is void (*_gtk_reserved1)(void);"""
         if not target:
             message.warn_node(node,
                 "Can't find symbol %r referenced by Rename annotation" % (
-                rename_to, ))
+                rename_to, ), code='transform')
         elif target.shadowed_by:
             message.warn_node(node,
                 "Function %r already shadowed by %r, can't overwrite with %r" % (
                 target.symbol,
                 target.shadowed_by,
-                rename_to))
+                rename_to), code='transform')
         elif target.shadows:
             message.warn_node(node,
                 "Function %r already shadows %r, can't multiply shadow with %r" % (
                 target.symbol,
                 target.shadows,
-                rename_to))
+                rename_to), code='transform')
         else:
             target.shadowed_by = node.name
             node.shadows = target.name
@@ -283,7 +283,8 @@ usage is void (*_gtk_reserved1)(void);"""
             if isinstance(base, ast.Map) and len(rest) == 2:
                 return ast.Map(*rest)
             message.warn(
-                "Too many parameters in type specification %r" % (type_str, ))
+                "Too many parameters in type specification %r" % (type_str, ),
+                code='transform')
             return base
         def top_combiner(base, *rest):
             if type_node is not None and isinstance(type_node, ast.Type):
@@ -293,7 +294,7 @@ usage is void (*_gtk_reserved1)(void);"""
         result, rest = grab_one(type_str, resolver, top_combiner, combiner)
         if rest:
             message.warn("Trailing components in type specification %r" % (
-                type_str, ))
+                type_str, ), code='transform')
 
         if not result.resolved:
             position = None
@@ -303,7 +304,8 @@ usage is void (*_gtk_reserved1)(void);"""
             else:
                 text = type_str
             message.warn_node(parent, "%s: Unknown type: %r" %
-                              (text, result.ctype), positions=position)
+                              (text, result.ctype), positions=position,
+                              code='transform')
         return result
 
     def _resolve_toplevel(self, type_str, type_node=None, node=None, parent=None):
@@ -340,7 +342,8 @@ usage is void (*_gtk_reserved1)(void);"""
             isinstance(array.element_type, ast.Enum) or
             isinstance(array.element_type, ast.Bitfield)):
             message.warn("invalid (element-type) for a GPtrArray, "
-                        "must be a pointer", options.position)
+                        "must be a pointer", positions=options.position,
+                        code='transform')
 
         # GByteArrays have (element-type) guint8 by default
         if array.array_type == ast.Array.GLIB_BYTEARRAY:
@@ -351,7 +354,7 @@ usage is void (*_gtk_reserved1)(void);"""
                                             ast.TYPE_CHAR]:
                 message.warn("invalid (element-type) for a GByteArray, "
                              "must be one of guint8, gint8 or gchar",
-                             options.position)
+                             positions=options.position, code='transform')
 
     def _apply_annotations_array(self, parent, node, options):
         array_opt = options.get(OPT_ARRAY)
@@ -411,7 +414,7 @@ usage is void (*_gtk_reserved1)(void);"""
             message.warn(
                 'element-type annotation takes at least one option, '
                 'none given',
-                options.position)
+                positions=options.position, code='transform')
             return
 
         if isinstance(node.type, ast.List):
@@ -419,7 +422,7 @@ usage is void (*_gtk_reserved1)(void);"""
                 message.warn(
                     'element-type annotation for a list must have exactly '
                     'one option, not %d options' % (element_type_opt.length(), ),
-                    options.position)
+                    positions=options.position, code='transform')
                 return
             node.type.element_type = self._resolve(element_type_opt.one(),
                                                    node.type, node, parent)
@@ -428,7 +431,7 @@ usage is void (*_gtk_reserved1)(void);"""
                 message.warn(
                     'element-type annotation for a hash table must have exactly '
                     'two options, not %d option(s)' % (element_type_opt.length(), ),
-                    options.position)
+                    positions=options.position, code='transform')
                 return
             element_type = element_type_opt.flat()
             node.type.key_type = self._resolve(element_type[0],
@@ -440,13 +443,14 @@ usage is void (*_gtk_reserved1)(void);"""
                 message.warn(
                     'element-type annotation for an array must have exactly '
                     'one option, not %d options' % (element_type_opt.length(), ),
-                    options.position)
+                    positions=options.position, code='transform')
                 return
             node.type.element_type = self._resolve(element_type_opt.one(),
                                                    node.type, node, parent)
         else:
             message.warn_node(parent,
-                "Unknown container %r for element-type annotation" % (node.type, ))
+                "Unknown container %r for element-type annotation" % (node.type, ),
+                code='transform')
 
     def _get_transfer_default_param(self, parent, node):
         if node.direction in [ast.PARAM_DIRECTION_INOUT,
@@ -720,7 +724,7 @@ usage is void (*_gtk_reserved1)(void);"""
             message.warn(
                 '%s: unknown parameter %r in documentation comment%s' % (
                 block.name, doc_name, text),
-                tag.position)
+                positions=tag.position, code='transform')
 
     def _apply_annotations_callable(self, node, chain, block):
         self._apply_annotations_annotated(node, block)
@@ -739,7 +743,7 @@ usage is void (*_gtk_reserved1)(void);"""
             else:
                 message.warn(
                     "Annotation for '%s' refers to unknown argument '%s'"
-                    % (parent.name, tag))
+                    % (parent.name, tag), code='transform')
 
     def _apply_annotations_field(self, parent, block, field):
         if not block:
@@ -838,7 +842,8 @@ usage is void (*_gtk_reserved1)(void);"""
                 break
         if not matched:
             message.warn_node(node,
-                "Virtual slot %r not found for %r annotation" % (invoker_name, TAG_VFUNC))
+                "Virtual slot %r not found for %r annotation" % (invoker_name, TAG_VFUNC),
+                code='transform')
 
     def _resolve_and_filter_type_list(self, typelist):
         """Given a list of Type instances, return a new list of types with
@@ -908,7 +913,7 @@ the ones that failed to resolve removed."""
             try:
                 no_uscore_prefixed = self._transformer.strip_identifier(type_name)
             except TransformerException, e:
-                message.warn(e)
+                message.warn(e, code='transform')
                 no_uscore_prefixed = None
 
             if no_uscore_prefixed not in uscore_enums:
@@ -930,7 +935,8 @@ the ones that failed to resolve removed."""
                 enum.error_domain = node.error_domain
             else:
                 message.warn_node(node,
-                    """%s: Couldn't find corresponding enumeration""" % (node.symbol, ))
+                    "%s: Couldn't find corresponding enumeration", node.symbol,
+                    code='transform')
 
     def _split_uscored_by_type(self, uscored):
         """'uscored' should be an un-prefixed uscore string.  This
@@ -981,7 +987,8 @@ method or constructor of some type."""
         if not func.parameters:
             if func.is_method:
                 message.warn_node(func,
-                    '%s: Methods must have parameters' % (func.symbol, ))
+                    '%s: Methods must have parameters', func.symbol,
+                    code='transform')
             return False
         first = func.parameters[0]
         target = self._transformer.lookup_typenode(first.type)
@@ -991,13 +998,13 @@ method or constructor of some type."""
             if func.is_method:
                 message.warn_node(func,
                     '%s: Methods must have a pointer as their first '
-                    'parameter' % (func.symbol, ))
+                    'parameter', func.symbol, code='transform')
             return False
         if target.namespace != self._namespace:
             if func.is_method:
                 message.warn_node(func,
                     '%s: Methods must belong to the same namespace as the '
-                    'class they belong to' % (func.symbol, ))
+                    'class they belong to', func.symbol, code='transform')
             return False
 
         # A quick hack here...in the future we should catch C signature/GI signature
@@ -1142,14 +1149,14 @@ method or constructor of some type."""
             if func.is_constructor:
                 message.warn_node(func,
                     '%s: Constructors must return an instance of their class'
-                    % (func.symbol, ))
+                    % (func.symbol, ), code='transform')
             return False
 
         origin_node = self._get_constructor_class(func, subsymbol)
         if origin_node is None:
             message.warn_node(func,
                 "Can't find matching type for constructor; symbol=%r" \
-                % (func.symbol, ))
+                % (func.symbol, ), code='transform')
             return False
 
         # Some sanity checks; only objects and boxeds can have ctors
@@ -1162,7 +1169,7 @@ method or constructor of some type."""
             if func.is_constructor:
                 message.warn_node(func,
                     '%s: Constructors must belong to the same namespace as the '
-                    'class they belong to' % (func.symbol, ))
+                    'class they belong to' % (func.symbol, ), code='transform')
             return False
         # If it takes the object as a first arg, guess it's not a constructor
         if not func.is_constructor and len(func.parameters) > 0:
@@ -1185,7 +1192,7 @@ method or constructor of some type."""
                         "symbol=%r constructed=%r return=%r" % (
                         func.symbol,
                         str(origin_node.create_type()),
-                        str(func.retval.type)))
+                        str(func.retval.type)), code='transform')
                     return False
         else:
             if origin_node != target:
@@ -1194,7 +1201,7 @@ method or constructor of some type."""
                     "constructed=%r return=%r" % (
                     func.symbol,
                     str(origin_node.create_type()),
-                    str(func.retval.type)))
+                    str(func.retval.type)), code='transform')
                 return False
 
         return True
@@ -21,6 +21,8 @@
 # 02110-1301, USA.
 #
 
+import hashlib
+import json
 import os
 import re
 import tempfile
@@ -35,9 +37,104 @@ from .utils import to_underscores
 def _space(num):
     return " " * num
 
+# Compiled templates, by file name; compiling is the expensive part of
+# rendering a page, and every page of a kind uses the same template
+_templates = {}
+
+
+def _get_template(file_name):
+    template = _templates.get(file_name)
+    if template is None:
+        template = Template(filename=file_name, output_encoding='utf-8',
+                            module_directory=tempfile.gettempdir())
+        _templates[file_name] = template
+    return template
+
+# The writer and nodes of MallardWriter.write(), inherited by the
+# processes rendering the pages in parallel; the nodes reference the
+# whole AST, so they are not worth pickling
+_worker_state = None
+
+
+def _render_in_worker(indices):
+    writer, nodes, output = _worker_state
+    for i in indices:
+        writer._render_node(nodes[i], output)
+
+# Name of the file in the output directory recording the digest of the
+# inputs of every page written by an incremental MallardWriter.write();
+# bump the version whenever a change to this module alters the output
+# for unchanged inputs
+_MANIFEST_NAME = '.doctool-manifest.json'
+_MANIFEST_VERSION = 2
+
+
+def _fingerprint(value, update, seen):
+    """Feed a canonical serialization of the AST below value to update.
+
+Nodes point back up to their namespace and to the class they are a
+member of; those references only contribute their name, so that the
+digest of a page covers the node it documents, not the whole namespace.
+Source positions are left out, they are not part of any page."""
+    if value is None or isinstance(value, (bool, int, long, float,
+                                           basestring)):
+        update(repr(value))
+        return
+    if id(value) in seen:
+        update('@')
+        return
+    seen.add(id(value))
+    if isinstance(value, (list, tuple)):
+        update('[')
+        for item in value:
+            _fingerprint(item, update, seen)
+            update(',')
+        update(']')
+    elif isinstance(value, (set, frozenset)):
+        update('{%s}' % (','.join(sorted(repr(item) for item in value)), ))
+    elif isinstance(value, dict):
+        update('{')
+        for key in sorted(value):
+            update('%r:' % (key, ))
+            _fingerprint(value[key], update, seen)
+            update(',')
+        update('}')
+    elif hasattr(value, '__dict__'):
+        update('<%s ' % (value.__class__.__name__, ))
+        for key, item in sorted(vars(value).iteritems()):
+            if key == 'file_positions':
+                continue
+            update('%s=' % (key, ))
+            if isinstance(item, ast.Namespace):
+                update('namespace:%r' % (item.name, ))
+            elif key == 'parent' and isinstance(item, ast.Node):
+                update('node:%r' % (item.name, ))
+            else:
+                _fingerprint(item, update, seen)
+            update(',')
+        update('>')
+    else:
+        update(repr(value))
+
+# The inline markup of gtk-doc comments: #Type, #Type::signal and
+# #Type:property references, %CONSTANTS, @parameters and symbol() calls;
+# the symbol in front of () is found by scanning back from it, which is
+# much cheaper than trying to match one at every word
+_markup_re = re.compile(r'#([a-zA-Z_:-]*)'
+                        r'|%([a-zA-Z_][a-zA-Z0-9_]*)'
+                        r'|@([a-zA-Z_][a-zA-Z0-9_]*)'
+                        r'|\(\)')
+_identifier_chars = frozenset('abcdefghijklmnopqrstuvwxyz'
+                              'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                              '0123456789_')
+
+
 class MallardFormatter(object):
-    def __init__(self, transformer):
+    def __init__(self, transformer, xrefs):
         self._transformer = transformer
+        # Maps C types, Type::signal, Type:property and symbol() to
+        # (page id, link text); see MallardWriter._build_xrefs()
+        self._xrefs = xrefs
 
     def escape(self, text):
         return saxutils.escape(text.encode('utf-8')).decode('utf-8')
@@ -46,60 +143,77 @@ class MallardFormatter(object):
         if doc is None:
             return ''
 
-        result = ''
+        result = []
         for para in doc.split('\n\n'):
-            result += '<p>'
-            result += self.format_inline(para)
-            result += '</p>'
-        return result
+            result.append('<p>')
+            self._format_inline(para, result)
+            result.append('</p>')
+        return ''.join(result)
 
     def format_inline(self, para):
-        result = ''
-
-        poss = []
-        poss.append((para.find('#'), '#'))
-        poss = [pos for pos in poss if pos[0] >= 0]
-        poss.sort(cmp=lambda x, y: cmp(x[0], y[0]))
-        if len(poss) == 0:
-            result += self.escape(para)
-        elif poss[0][1] == '#':
-            pos = poss[0][0]
-            result += self.escape(para[:pos])
-            rest = para[pos + 1:]
-            link = re.split('[^a-zA-Z_:-]', rest, maxsplit=1)[0]
-            if link.endswith(':'):
-                link = link[:-1]
-            namespace = self._transformer.namespace
-            if '::' in link:
-                type_name, signal_name = link.split('::')
-                if type_name in namespace.ctypes:
-                    type_ = namespace.get_by_ctype(type_name)
-                    xref = '%s.%s-%s' % (namespace.name, type_.name, signal_name)
-                    xref_name = '%s.%s::%s' % (namespace.name, type_.name, signal_name)
-                else:
-                    xref = link
-                    xref_name = link
-            elif ':' in link:
-                type_name, property_name = link.split(':')
-                if type_name in namespace.ctypes:
-                    type_ = namespace.get_by_ctype(type_name)
-                    xref = '%s.%s-%s' % (namespace.name, type_.name, property_name)
-                    xref_name = '%s.%s:%s' % (namespace.name, type_.name, property_name)
-                else:
-                    xref = link
-                    xref_name = link
-            elif link in namespace.ctypes:
-                type_ = namespace.get_by_ctype(link)
-                xref = '%s.%s' % (namespace.name, type_.name)
-                xref_name = xref
+        result = []
+        self._format_inline(para, result)
+        return ''.join(result)
+
+    def _format_inline(self, para, result):
+        # None of the markup contains characters that need escaping, so
+        # the paragraph is escaped as a whole
+        para = self.escape(para)
+        pos = 0
+        for match in _markup_re.finditer(para):
+            kind = match.lastindex
+            start = match.start()
+            if kind == 1:
+                link = match.group(1)
+                link_end = match.end()
+                if link.endswith(':'):
+                    link = link[:-1]
+                    link_end -= 1
+                xref, xref_name = self._resolve_link(link)
+                markup = '<link xref="%s">%s</link>%s' % (
+                    xref, xref_name, para[link_end:match.end()])
+            elif kind == 2:
+                markup = self.format_constant(match.group(2))
+            elif kind == 3:
+                # @parameters are left as text
+                continue
             else:
-                xref = link
-                xref_name = link
-            result += '<link xref="%s">%s</link>' % (xref, xref_name)
-            if len(link) < len(rest):
-                result += self.format_inline(rest[len(link):])
+                while start > pos and para[start - 1] in _identifier_chars:
+                    start -= 1
+                symbol = para[start:match.end()]
+                resolved = self._xrefs.get(symbol)
+                # So are calls of unknown symbols
+                if resolved is None or symbol[0].isdigit():
+                    continue
+                markup = '<link xref="%s">%s</link>' % resolved
+            result.append(para[pos:start])
+            result.append(markup)
+            pos = match.end()
+        result.append(para[pos:])
 
-        return result
+    def _resolve_link(self, link):
+        resolved = self._xrefs.get(link)
+        if resolved is not None:
+            return resolved
+        # Members without a page of their own still link to where the
+        # page would be
+        if '::' in link:
+            separator = '::'
+        elif ':' in link:
+            separator = ':'
+        else:
+            return link, link
+        type_name, member_name = link.split(separator, 1)
+        resolved = self._xrefs.get(type_name)
+        if resolved is None:
+            return link, link
+        type_xref = resolved[0]
+        return (type_xref + '-' + member_name,
+                type_xref + separator + member_name)
+
+    def format_constant(self, name):
+        """Return the markup for a %name reference to a constant."""
+        return '%' + name
 
     def format_type(self, type_):
         raise NotImplementedError
@@ -156,12 +270,15 @@ class MallardFormatterPython(MallardFormatter):
         else:
             return type_.target_fundamental
 
-    def format(self, doc):
-        doc = MallardFormatter.format(self, doc)
-        doc = doc.replace('%NULL', 'None')
-        doc = doc.replace('%TRUE', 'True')
-        doc = doc.replace('%FALSE', 'False')
-        return doc
+    _constants = {'NULL': 'None',
+                  'TRUE': 'True',
+                  'FALSE': 'False'}
+
+    def format_constant(self, name):
+        constant = self._constants.get(name)
+        if constant is not None:
+            return constant
+        return MallardFormatter.format_constant(self, name)
 
 class MallardWriter(object):
     def __init__(self, transformer, language):
@@ -169,13 +286,27 @@ class MallardWriter(object):
         self._language = language
 
         if self._language == 'C':
-            self._formatter = MallardFormatterC(self._transformer)
+            formatter_class = MallardFormatterC
         elif self._language == 'Python':
-            self._formatter = MallardFormatterPython(self._transformer)
+            formatter_class = MallardFormatterPython
         else:
             raise SystemExit("Unsupported language: %s" % language)
+        self._xrefs = self._build_xrefs()
+        self._formatter = formatter_class(self._transformer, self._xrefs)
+
+    def write(self, output, jobs=1, incremental=False):
+        nodes = self._get_nodes()
+        if incremental:
+            nodes = self._filter_unchanged(nodes, output)
+        if jobs > 1 and hasattr(os, 'fork'):
+            self._render_parallel(nodes, output, jobs)
+        else:
+            for node in nodes:
+                self._render_node(node, output)
+        if incremental:
+            self._write_manifest(output)
 
-    def write(self, output):
+    def _get_nodes(self):
         nodes = [self._transformer.namespace]
         for node in self._transformer.namespace.itervalues():
             if isinstance(node, ast.Function) and node.moved_to is not None:
@@ -195,10 +326,123 @@ class MallardWriter(object):
                 nodes += getattr(node, 'signals', [])
                 if self._language == 'C':
                     nodes += getattr(node, 'constructors', [])
+        return nodes
+
+    def _build_xrefs(self):
+        """Map the references in doc comments to the pages they link to."""
+        namespace = self._transformer.namespace
+        xrefs = {}
+        for ctype, node in namespace.ctypes.iteritems():
+            xref = '%s.%s' % (namespace.name, node.name)
+            xrefs[ctype] = (xref, xref)
+        for node in self._get_nodes():
+            if isinstance(node, ast.Function):
+                unused, page_id = self._get_page(node)
+                xrefs[node.symbol + '()'] = (page_id, node.symbol + '()')
+            elif isinstance(node, (ast.Property, ast.Signal)) and \
+                 getattr(node.parent, 'ctype', None) is not None:
+                if isinstance(node, ast.Signal):
+                    separator = '::'
+                else:
+                    separator = ':'
+                unused, page_id = self._get_page(node)
+                xrefs[node.parent.ctype + separator + node.name] = (
+                    page_id, '%s.%s%s%s' % (namespace.name, node.parent.name,
+                                            separator, node.name))
+        return xrefs
+
+    def _filter_unchanged(self, nodes, output):
+        """Return the nodes whose page is missing or out of date, and
+remember the digest of every page for _write_manifest()."""
+        manifest_file_name = os.path.join(output, _MANIFEST_NAME)
+        try:
+            fp = open(manifest_file_name)
+            try:
+                manifest = json.load(fp)
+            finally:
+                fp.close()
+        except (IOError, ValueError):
+            manifest = {}
+        if manifest.get('version') != _MANIFEST_VERSION:
+            manifest = {}
+        old_pages = manifest.get('pages', {})
+
+        # Every page links to other pages through the xrefs, and class
+        # pages show the parents of the class
+        shared = hashlib.sha1()
+        shared.update('%d:%s:' % (_MANIFEST_VERSION, self._language))
+        namespace = self._transformer.namespace
+        for key, (xref, unused) in sorted(self._xrefs.iteritems()):
+            shared.update('%s=%s,' % (key, xref))
+        for node in namespace.itervalues():
+            if isinstance(node, ast.Class) and node.parent is not None:
+                shared.update('%s<%s,' % (node.name, node.parent))
+        shared = shared.hexdigest()
+
+        template_digests = {}
+        self._pages = {}
+        changed = []
         for node in nodes:
-            self._render_node(node, output)
+            template_name, page_id = self._get_page(node)
+            file_name = self._get_template_file_name(template_name)
+            if file_name not in template_digests:
+                fp = open(file_name)
+                try:
+                    template_digests[file_name] = \
+                        hashlib.sha1(fp.read()).hexdigest()
+                finally:
+                    fp.close()
+            digest = hashlib.sha1()
+            digest.update(shared)
+            digest.update(template_digests[file_name])
+            _fingerprint(node, digest.update, set())
+            digest = digest.hexdigest()
+            self._pages[page_id] = digest
 
-    def _render_node(self, node, output):
+            page_file_name = os.path.join(output, page_id + '.page')
+            if old_pages.get(page_id) != digest or \
+               not os.path.exists(page_file_name):
+                changed.append(node)
+
+        for page_id in old_pages:
+            if page_id in self._pages:
+                continue
+            page_file_name = os.path.join(output, page_id + '.page')
+            if os.path.exists(page_file_name):
+                os.unlink(page_file_name)
+        return changed
+
+    def _write_manifest(self, output):
+        manifest_file_name = os.path.join(output, _MANIFEST_NAME)
+        # Replace the old manifest atomically, an interrupted run must not
+        # leave pages behind that are recorded as up to date
+        temp_file_name = manifest_file_name + '.tmp'
+        fp = open(temp_file_name, 'w')
+        try:
+            json.dump(dict(version=_MANIFEST_VERSION, pages=self._pages),
+                      fp, indent=0, sort_keys=True)
+        finally:
+            fp.close()
+        os.rename(temp_file_name, manifest_file_name)
+        self._pages = None
+
+    def _render_parallel(self, nodes, output, jobs):
+        global _worker_state
+        import multiprocessing
+
+        # Interleave the nodes, so that the namespace and class pages,
+        # which take the longest, are spread over the workers
+        chunks = [range(i, len(nodes), jobs) for i in range(jobs)]
+        _worker_state = (self, nodes, output)
+        pool = multiprocessing.Pool(jobs)
+        try:
+            pool.map(_render_in_worker, chunks)
+        finally:
+            pool.close()
+            pool.join()
+            _worker_state = None
+
+    def _get_page(self, node):
         namespace = self._transformer.namespace
         if isinstance(node, ast.Namespace):
             template_name = 'mallard-%s-namespace.tmpl' % self._language
@@ -230,7 +474,9 @@ class MallardWriter(object):
         else:
             template_name = 'mallard-%s-default.tmpl' % self._language
             page_id = '%s.%s' % (namespace.name, node.name)
+        return template_name, page_id
 
+    def _get_template_file_name(self, template_name):
         if 'UNINSTALLED_INTROSPECTION_SRCDIR' in os.environ:
             top_srcdir = os.environ['UNINSTALLED_INTROSPECTION_SRCDIR']
             template_dir = os.path.join(top_srcdir, 'giscanner')
@@ -238,10 +484,12 @@ class MallardWriter(object):
             template_dir = os.path.dirname(__file__)
 
         file_name = os.path.join(template_dir, template_name)
-        file_name = os.path.abspath(file_name)
-        template = Template(filename=file_name, output_encoding='utf-8',
-                            module_directory=tempfile.gettempdir())
-        result = template.render(namespace=namespace,
+        return os.path.abspath(file_name)
+
+    def _render_node(self, node, output):
+        template_name, page_id = self._get_page(node)
+        template = _get_template(self._get_template_file_name(template_name))
+        result = template.render(namespace=self._transformer.namespace,
                                  node=node,
                                  page_id=page_id,
                                  formatter=self._formatter)
@@ -29,6 +29,9 @@ from . import utils
  ERROR,
  FATAL) = range(3)
 
+# The categories of warnings and errors, see MessageLogger.suppress()
+CODES = ('annotation', 'transform', 'introspectable', 'symbol', 'gtype')
+
 
 class Position(object):
     """Represents a position in the source file which we
@@ -64,6 +67,34 @@ class Position(object):
         return Position(self.filename, self.line+offset, self.column)
 
 
+class Diagnostic(object):
+    """A message recorded by MessageLogger, with its text as it was
+when the message was logged."""
+
+    __slots__ = ('log_type', 'code', 'text', 'positions', 'prefix')
+
+    def __init__(self, log_type, code, text, positions, prefix=None):
+        self.log_type = log_type
+        self.code = code
+        self.text = text
+        self.positions = positions
+        self.prefix = prefix
+
+    def get_key(self):
+        return (self.log_type, self.code, self.text, self.prefix,
+                tuple((position.filename, position.line, position.column)
+                      for position in self.positions))
+
+
+_TYPE_NAMES = {WARNING: "Warning",
+               ERROR: "Error",
+               FATAL: "Fatal"}
+
+_SARIF_LEVELS = {WARNING: "warning",
+                 ERROR: "error",
+                 FATAL: "error"}
+
+
 class MessageLogger(object):
     _instance = None
 
@@ -75,6 +106,10 @@ class MessageLogger(object):
         self._namespace = namespace
         self._enable_warnings = False
         self._warning_count = 0
+        self._break_on_warning = utils.have_debug_flag('warning')
+        self._suppressed_codes = set()
+        self._seen = None
+        self._diagnostics = None
 
     @classmethod
     def get(cls, *args, **kwargs):
@@ -85,13 +120,65 @@ class MessageLogger(object):
     def enable_warnings(self, enable):
         self._enable_warnings = enable
 
+    def set_text_output(self, enable):
+        """Whether messages are written to the output stream; see
+enable_export() to keep them for write_json() and write_sarif()
+instead."""
+        if not enable:
+            self._output = None
+        elif self._output is None:
+            self._output = sys.stderr
+
+    def suppress(self, code):
+        """Drop the warnings and errors of the given code without
+counting, recording or formatting them."""
+        self._suppressed_codes.add(code)
+
+    def enable_export(self, enable):
+        """Keep the messages that are shown, or would be shown without
+set_text_output(False), for write_json() and write_sarif()."""
+        if enable:
+            if self._diagnostics is None:
+                self._diagnostics = []
+        else:
+            self._diagnostics = None
+
+    def enable_deduplication(self, enable):
+        """Record each distinct message only once."""
+        if enable:
+            self._seen = set()
+        else:
+            self._seen = None
+
     def get_warning_count(self):
         return self._warning_count
 
-    def log(self, log_type, text, positions=None, prefix=None):
+    def is_kept(self, log_type, code=None):
+        """Whether a message of the given type and code would be shown
+or exported, without counting or recording anything.  Callers use this
+to skip building a message that log() would only count."""
+        if log_type == FATAL:
+            return True
+        return self._enable_warnings and code not in self._suppressed_codes
+
+    def get_diagnostics(self):
+        return list(self._diagnostics or [])
+
+    def log(self, log_type, text, positions=None, prefix=None, code=None,
+            args=()):
         """Log a warning, using optional file positioning information.
-If the warning is related to a ast.Node type, see log_node()."""
-        utils.break_on_debug_flag('warning')
+If args are given, text is a format string for them, which is only
+formatted if the warning is shown or exported.  If the warning is
+related to a ast.Node type, see log_node()."""
+        self._log(log_type, code, text, args, positions, prefix)
+
+    def _log(self, log_type, code, text, args, positions, prefix=None,
+             node=None, context=None):
+        if self._break_on_warning:
+            utils.break_on_debug_flag('warning')
+
+        if log_type != FATAL and code in self._suppressed_codes:
+            return
 
         self._warning_count += 1
 
@@ -104,24 +191,55 @@ If the warning is related to a ast.Node type, see log_node()."""
             positions = list(positions)
         if isinstance(positions, Position):
             positions = [positions]
-
         if not positions:
-            positions = [Position('<unknown>')]
+            positions = []
+
+        if args:
+            text = text % args
+        elif not isinstance(text, basestring):
+            text = str(text)
+        if node is not None:
+            if not positions and not context:
+                text = "context=%r %s" % (node, text)
+            if context:
+                text = "%s: %s" % (getattr(context, 'symbol', context.name),
+                                   text)
+            elif not positions and hasattr(node, 'name'):
+                text = "(%s)%s: %s" % (node.__class__.__name__, node.name,
+                                       text)
+
+        diagnostic = Diagnostic(log_type, code, text, positions, prefix)
+        if self._seen is not None and log_type != FATAL:
+            key = diagnostic.get_key()
+            if key in self._seen:
+                self._warning_count -= 1
+                return
+            self._seen.add(key)
+        if self._diagnostics is not None:
+            self._diagnostics.append(diagnostic)
+
+        lines = self._format(diagnostic)
+        if self._output is not None:
+            self._output.write(''.join(lines))
 
-        for position in positions[:-1]:
-            self._output.write("%s:\n" % (position.format(cwd=self._cwd), ))
+        if log_type == FATAL:
+            utils.break_on_debug_flag('fatal')
+            raise SystemExit(lines[-1])
+
+    def _format(self, diagnostic):
+        """Return the lines of text for a message, one for each of
+its positions."""
+        positions = diagnostic.positions or [Position('<unknown>')]
+        lines = ["%s:\n" % (position.format(cwd=self._cwd), )
+                 for position in positions[:-1]]
         last_position = positions[-1].format(cwd=self._cwd)
 
-        if log_type == WARNING:
-            error_type = "Warning"
-        elif log_type == ERROR:
-            error_type = "Error"
-        elif log_type == FATAL:
-            error_type = "Fatal"
-        if prefix:
+        error_type = _TYPE_NAMES[diagnostic.log_type]
+        text = diagnostic.text
+        if diagnostic.prefix:
             text = (
 '''%s: %s: %s: %s: %s\n''' % (last_position, error_type, self._namespace.name,
-                            prefix, text))
+                            diagnostic.prefix, text))
         else:
             if self._namespace:
                 text = (
@@ -129,13 +247,69 @@ If the warning is related to a ast.Node type, see log_node()."""
             else:
                 text = (
 '''%s: %s: %s\n''' % (last_position, error_type, text))
+        lines.append(text)
+        return lines
 
-        self._output.write(text)
-        if log_type == FATAL:
-            utils.break_on_debug_flag('fatal')
-            raise SystemExit(text)
-
-    def log_node(self, log_type, node, text, context=None, positions=None):
+    def _get_records(self):
+        if self._namespace:
+            namespace = self._namespace.name
+        else:
+            namespace = None
+        for diagnostic in self.get_diagnostics():
+            positions = [dict(file=position.filename,
+                              line=position.line,
+                              column=position.column)
+                         for position in diagnostic.positions]
+            yield dict(type=_TYPE_NAMES[diagnostic.log_type].lower(),
+                       code=diagnostic.code,
+                       namespace=namespace,
+                       prefix=diagnostic.prefix,
+                       text=diagnostic.text,
+                       positions=positions)
+
+    def write_json(self, fp):
+        """Write all recorded messages to fp as a JSON list."""
+        import json
+        json.dump(list(self._get_records()), fp, indent=1, sort_keys=True)
+        fp.write('\n')
+
+    def write_sarif(self, fp):
+        """Write all recorded messages to fp as a SARIF 2.1.0 log."""
+        import json
+        results = []
+        rules = set()
+        for diagnostic, record in zip(self.get_diagnostics(),
+                                      self._get_records()):
+            code = diagnostic.code or 'general'
+            rules.add(code)
+            text = record['text']
+            if diagnostic.prefix:
+                text = '%s: %s' % (diagnostic.prefix, text)
+            locations = []
+            for position in record['positions']:
+                region = {}
+                if position['line'] is not None:
+                    region['startLine'] = position['line']
+                if position['column'] is not None:
+                    region['startColumn'] = position['column']
+                location = dict(artifactLocation=dict(uri=position['file']))
+                if region:
+                    location['region'] = region
+                locations.append(dict(physicalLocation=location))
+            results.append(dict(ruleId=code,
+                                level=_SARIF_LEVELS[diagnostic.log_type],
+                                message=dict(text=text),
+                                locations=locations))
+        driver = dict(name='g-ir-scanner',
+                      rules=[dict(id=rule) for rule in sorted(rules)])
+        log = {'$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+               'version': '2.1.0',
+               'runs': [dict(tool=dict(driver=driver), results=results)]}
+        json.dump(log, fp, indent=1, sort_keys=True)
+        fp.write('\n')
+
+    def log_node(self, log_type, node, text, context=None, positions=None,
+                 code=None, args=()):
         """Log a warning, using information about file positions from
 the given node.  The optional context argument, if given, should be
 another ast.Node type which will also be displayed.  If no file position
@@ -149,37 +323,31 @@ context will be used."""
             positions = context.file_positions
         else:
             positions = []
-            if not context:
-                text = "context=%r %s" % (node, text)
-
-        if context:
-            text = "%s: %s" % (getattr(context, 'symbol', context.name), text)
-        elif not positions and hasattr(node, 'name'):
-            text = "(%s)%s: %s" % (node.__class__.__name__, node.name, text)
 
-        self.log(log_type, text, positions)
+        self._log(log_type, code, text, args, positions, node=node,
+                  context=context)
 
-    def log_symbol(self, log_type, symbol, text):
+    def log_symbol(self, log_type, symbol, text, code=None, args=()):
         """Log a warning in the context of the given symbol."""
         self.log(log_type, text, symbol.position,
-                 prefix="symbol=%r" % (symbol.ident, ))
+                 prefix="symbol=%r" % (symbol.ident, ), code=code, args=args)
 
 
-def log_node(log_type, node, text, context=None, positions=None):
+def log_node(log_type, node, text, *args, **kwargs):
     ml = MessageLogger.get()
-    ml.log_node(log_type, node, text, context=context, positions=positions)
+    ml.log_node(log_type, node, text, args=args, **kwargs)
 
-def warn(text, positions=None, prefix=None):
+def warn(text, *args, **kwargs):
     ml = MessageLogger.get()
-    ml.log(WARNING, text, positions, prefix)
+    ml.log(WARNING, text, args=args, **kwargs)
 
-def warn_node(node, text, context=None, positions=None):
-    log_node(WARNING, node, text, context=context, positions=positions)
+def warn_node(node, text, *args, **kwargs):
+    log_node(WARNING, node, text, *args, **kwargs)
 
-def warn_symbol(symbol, text):
+def warn_symbol(symbol, text, *args, **kwargs):
     ml = MessageLogger.get()
-    ml.log_symbol(WARNING, symbol, text)
+    ml.log_symbol(WARNING, symbol, text, args=args, **kwargs)
 
-def fatal(text, positions=None, prefix=None):
+def fatal(text, *args, **kwargs):
     ml = MessageLogger.get()
-    ml.log(FATAL, text, positions, prefix)
+    ml.log(FATAL, text, args=args, **kwargs)
@@ -0,0 +1,411 @@
+# -*- Mode: Python -*-
+# GObject-Introspection - a framework for introspecting GObject libraries
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.
+#
+
+"""A persistent g-ir-scanner process.
+
+A large part of a g-ir-scanner run is spent starting the interpreter,
+importing the scanner and loading the GIR files of every include.  The
+daemon pays for that once: it listens on a Unix socket, runs each
+request through scanner_main() in its own process and keeps the parsed
+includes resident between requests.  The g-ir-scanner wrapper forwards
+its command line to the daemon when one is running, see run_client().
+
+Requests are handled one at a time, since a scan changes the working
+directory, the environment and the standard streams of the process.
+The daemon greets a connection once it starts serving it; a client
+which is not greeted quickly, e.g. during a parallel build, scans
+in-process instead of queueing up behind the other requests.
+
+The requests contain the whole environment of the client and their
+results are trusted, so both sides make sure that the socket lives in
+a directory only the user can access and that the other end runs as
+the same user.
+
+The scanner code, and which copy of it is imported, is fixed when the
+daemon starts.  Every request carries a hash of the client's, see
+get_code_version(), and the daemon turns away clients that differ, for
+instance an uninstalled scanner during "make check".
+"""
+
+import errno
+import hashlib
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import traceback
+
+_HEADER = struct.Struct('!I')
+
+# Looked at when the scanner modules are imported, to pick the copy of
+# the scanner and its C extension
+_IMPORT_ENVIRONMENT = ('UNINSTALLED_INTROSPECTION_SRCDIR',
+                       'UNINSTALLED_INTROSPECTION_BUILDDIR')
+
+# How long a client waits for a busy daemon before scanning itself
+_GREETING_TIMEOUT = 0.5
+
+# struct ucred, as returned for SO_PEERCRED; Python 2 only knows the
+# option on some platforms, it has the same value everywhere on Linux
+_UCRED = struct.Struct('3i')
+if hasattr(socket, 'SO_PEERCRED'):
+    _SO_PEERCRED = socket.SO_PEERCRED
+elif sys.platform.startswith('linux'):
+    _SO_PEERCRED = 17
+else:
+    _SO_PEERCRED = None
+
+
+def get_socket_path():
+    path = os.environ.get('GI_SCANNER_DAEMON_SOCKET')
+    if path:
+        return path
+    rundir = os.environ.get('XDG_RUNTIME_DIR')
+    if not rundir:
+        # Not the shared temporary directory itself, anyone could
+        # create the socket there before the daemon does
+        rundir = os.path.join(tempfile.gettempdir(),
+                              'g-ir-scanner-%d' % (os.getuid(), ))
+    return os.path.join(rundir, 'g-ir-scanner.socket')
+
+
+def get_code_version():
+    """Return a hash of the scanner code this process runs and of the
+settings that chose it; a daemon only serves clients with the same."""
+    import __builtin__
+    import giscanner
+    parts = [sys.executable, str(getattr(__builtin__, 'DATADIR', None))]
+    for name in _IMPORT_ENVIRONMENT:
+        value = os.environ.get(name)
+        if value is not None:
+            value = os.path.abspath(value)
+        parts.append('%s=%s' % (name, value))
+    for dirname in giscanner.__path__:
+        dirname = os.path.abspath(dirname)
+        parts.append(dirname)
+        # Like the cache store, mtimes are good enough and much cheaper
+        # than hashing the contents
+        for filename in sorted(os.listdir(dirname)):
+            if filename.endswith(('.py', '.so', '.pyd', '.la')):
+                mtime = os.stat(os.path.join(dirname, filename)).st_mtime
+                parts.append('%s %r' % (filename, mtime))
+    return hashlib.sha1('\n'.join(parts)).hexdigest()
+
+
+def _check_private(path, is_socket=False):
+    """Return None if path is owned by the user and not accessible to
+anyone else, a description of the problem otherwise."""
+    try:
+        st = os.lstat(path)
+    except OSError, e:
+        return e.strerror
+    if st.st_uid != os.getuid():
+        return "owned by uid %d" % (st.st_uid, )
+    if is_socket:
+        if not stat.S_ISSOCK(st.st_mode):
+            return "not a socket"
+    elif not stat.S_ISDIR(st.st_mode):
+        return "not a directory"
+    if stat.S_IMODE(st.st_mode) & 0077:
+        return "accessible to other users (mode %04o)" % (
+            stat.S_IMODE(st.st_mode), )
+    return None
+
+
+def _check_socket_path(path):
+    dirname = os.path.dirname(os.path.abspath(path))
+    problem = _check_private(dirname)
+    if problem is not None:
+        return "%s: %s" % (dirname, problem)
+    problem = _check_private(path, is_socket=True)
+    if problem is not None:
+        return "%s: %s" % (path, problem)
+    return None
+
+
+def _get_peer_uid(sock):
+    """Return the uid of the process at the other end of sock, or
+None if the platform does not tell."""
+    if _SO_PEERCRED is None:
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, _SO_PEERCRED, _UCRED.size)
+    pid, uid, gid = _UCRED.unpack(creds)
+    return uid
+
+
+def _to_str(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+
+def _send(sock, data):
+    payload = json.dumps(data)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise EOFError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return ''.join(chunks)
+
+
+def _recv(sock):
+    size, = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return json.loads(_recv_exactly(sock, size))
+
+
+def _exit_code(e):
+    # Mirror what the interpreter does with an uncaught SystemExit
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    sys.stderr.write('%s\n' % (e.code, ))
+    return 1
+
+
+def run_client(args):
+    """Forward a g-ir-scanner invocation to a running daemon.
+Returns the exit code of the scan, or None if no daemon is available
+or it is busy, and the caller should scan in-process."""
+    if '--daemon' in args or 'GI_SCANNER_DISABLE_DAEMON' in os.environ:
+        return None
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = get_socket_path()
+    if not os.path.exists(path):
+        return None
+    problem = _check_socket_path(path)
+    if problem is not None:
+        sys.stderr.write("g-ir-scanner: not using the scanner daemon, "
+                         "%s\n" % (problem, ))
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+            peer_uid = _get_peer_uid(sock)
+            if peer_uid is not None and peer_uid != os.getuid():
+                sys.stderr.write("g-ir-scanner: not using the scanner "
+                                 "daemon, %s is served by uid %d\n" % (
+                                 path, peer_uid))
+                return None
+            sock.settimeout(_GREETING_TIMEOUT)
+            _recv(sock)
+            sock.settimeout(None)
+            _send(sock, dict(args=args,
+                             cwd=os.getcwd(),
+                             env=dict(os.environ),
+                             version=get_code_version()))
+            result = _recv(sock)
+        except (socket.error, EOFError, ValueError):
+            # No daemon listening, busy with another request or it went
+            # away in the middle of ours; scanning is idempotent so just
+            # run locally
+            return None
+    finally:
+        sock.close()
+
+    if 'refused' in result:
+        sys.stderr.write("g-ir-scanner: not using the scanner daemon, "
+                         "%s\n" % (result['refused'], ))
+        return None
+
+    sys.stdout.write(result['stdout'].encode('latin-1'))
+    sys.stderr.write(result['stderr'].encode('latin-1'))
+    return result['exit_code']
+
+
+class ScannerDaemon(object):
+
+    def __init__(self, path):
+        self._path = path
+        self._version = get_code_version()
+
+    # Private
+
+    def _prepare_directory(self):
+        dirname = os.path.dirname(os.path.abspath(self._path))
+        try:
+            os.mkdir(dirname, 0700)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+        problem = _check_private(dirname)
+        if problem is not None:
+            raise SystemExit("ERROR: refusing to use %r for the scanner "
+                             "daemon socket: %s" % (dirname, problem))
+
+    def _remove_stale_socket(self):
+        if not os.path.lexists(self._path):
+            return
+        problem = _check_private(self._path, is_socket=True)
+        if problem is not None:
+            raise SystemExit("ERROR: refusing to replace %r: %s" % (
+                self._path, problem))
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self._path)
+        except socket.error, e:
+            if e.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+                raise
+            os.unlink(self._path)
+        else:
+            raise SystemExit(
+                "ERROR: a scanner daemon is already listening on %r" % (
+                    self._path, ))
+        finally:
+            probe.close()
+
+    def _scan(self, args):
+        from giscanner.scannermain import scanner_main
+        return scanner_main(args)
+
+    def _reset_state(self):
+        from giscanner import message
+        from giscanner import utils
+        # The logger captures the output stream and counts warnings,
+        # and the debug flags come from the environment
+        message.MessageLogger._instance = None
+        utils._debugflags = None
+
+    def _run(self, request):
+        args = [_to_str(arg) for arg in request['args']]
+        env = dict((_to_str(k), _to_str(v))
+                   for k, v in request['env'].iteritems())
+
+        saved_cwd = os.getcwd()
+        saved_env = dict(os.environ)
+        saved_streams = sys.stdout, sys.stderr
+        for stream in saved_streams:
+            stream.flush()
+        # The programs run by a scan, like cpp, the compiler and the
+        # dump program, write to the file descriptors directly, so
+        # point those to the files sent back to the client
+        outputs = [tempfile.TemporaryFile(), tempfile.TemporaryFile()]
+        saved_fds = [os.dup(1), os.dup(2)]
+        try:
+            os.dup2(outputs[0].fileno(), 1)
+            os.dup2(outputs[1].fileno(), 2)
+            # Unbuffered, to keep our output in order with theirs
+            sys.stdout = os.fdopen(os.dup(1), 'w', 0)
+            sys.stderr = os.fdopen(os.dup(2), 'w', 0)
+            os.chdir(_to_str(request['cwd']))
+            os.environ.clear()
+            os.environ.update(env)
+            self._reset_state()
+            try:
+                exit_code = self._scan(args)
+            except SystemExit, e:
+                exit_code = _exit_code(e)
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+        finally:
+            for stream in sys.stdout, sys.stderr:
+                if stream not in saved_streams:
+                    stream.close()
+            sys.stdout, sys.stderr = saved_streams
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            for fd in saved_fds:
+                os.close(fd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+            os.chdir(saved_cwd)
+            self._reset_state()
+
+        output = []
+        for fp in outputs:
+            fp.seek(0)
+            # Whatever the programs wrote, it gets to the client as is
+            output.append(fp.read().decode('latin-1'))
+            fp.close()
+        return dict(exit_code=exit_code or 0,
+                    stdout=output[0],
+                    stderr=output[1])
+
+    def _handle(self, conn):
+        try:
+            peer_uid = _get_peer_uid(conn)
+            if peer_uid is not None and peer_uid != os.getuid():
+                return
+            _send(conn, dict(ready=True))
+            request = _recv(conn)
+        except (socket.error, EOFError, ValueError):
+            # Most likely a client which gave up waiting for us
+            return
+        if request.get('version') != self._version:
+            result = dict(refused="it runs a different copy or version "
+                                  "of the scanner")
+        else:
+            result = self._run(request)
+        try:
+            _send(conn, result)
+        except socket.error:
+            pass
+
+    # Public API
+
+    def serve_forever(self):
+        from giscanner.cachestore import enable_resident_cache
+        enable_resident_cache()
+
+        self._prepare_directory()
+        self._remove_stale_socket()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the owner may submit scans, they run arbitrary programs
+        old_umask = os.umask(0077)
+        try:
+            listener.bind(self._path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(5)
+
+        try:
+            while True:
+                conn, unused = listener.accept()
+                try:
+                    self._handle(conn)
+                finally:
+                    conn.close()
+        finally:
+            listener.close()
+            os.unlink(self._path)
+
+
+def daemon_main():
+    if not hasattr(socket, 'AF_UNIX'):
+        raise SystemExit("ERROR: --daemon requires Unix domain sockets")
+    daemon = ScannerDaemon(get_socket_path())
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
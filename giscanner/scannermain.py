@@ -23,10 +23,10 @@
 import errno
 import optparse
 import os
-import shutil
 import subprocess
 import sys
 import tempfile
+from cStringIO import StringIO
 
 from giscanner import message
 from giscanner.annotationparser import AnnotationParser
@@ -152,12 +152,33 @@ match the namespace prefix.""")
     parser.add_option('', "--warn-error",
                       action="store_true", dest="warn_fatal",
                       help="Turn warnings into fatal errors")
+    parser.add_option('', "--warn-suppress",
+                      action="append", dest="warn_suppress", default=[],
+                      metavar="CODE", choices=list(message.CODES),
+                      help="Ignore the warnings of a category: %s" % (
+                          ", ".join(message.CODES), ))
+    parser.add_option('', "--warn-deduplicate",
+                      action="store_true", dest="warn_deduplicate",
+                      default=False,
+                      help="Report identical warnings only once")
+    parser.add_option('', "--diagnostics-output",
+                      action="store", dest="diagnostics_output",
+                      metavar="FILE",
+                      help="Write the warnings to FILE, instead of "
+                           "showing them")
+    parser.add_option('', "--diagnostics-format",
+                      action="store", dest="diagnostics_format",
+                      default="json", choices=["json", "sarif"],
+                      help="Format of --diagnostics-output: json or sarif")
     parser.add_option("-v", "--verbose",
                       action="store_true", dest="verbose",
                       help="be verbose")
     parser.add_option("", "--c-include",
                       action="append", dest="c_includes", default=[],
                       help="headers which should be included in C programs")
+    parser.add_option("", "--daemon",
+                      action="store_true", dest="daemon", default=False,
+                      help="run as a persistent scanner daemon serving scan requests")
 
     group = get_preprocessor_option_group(parser)
     parser.add_option_group(group)
@@ -190,12 +211,12 @@ def passthrough_gir(path, f):
     parser = GIRParser()
     parser.parse(path)
 
-    writer = GIRWriter(parser.get_namespace(),
-                       parser.get_shared_libraries(),
-                       parser.get_includes(),
-                       parser.get_pkgconfig_packages(),
-                       parser.get_c_includes())
-    f.write(writer.get_xml())
+    GIRWriter(parser.get_namespace(),
+              parser.get_shared_libraries(),
+              parser.get_includes(),
+              parser.get_pkgconfig_packages(),
+              parser.get_c_includes(),
+              output=f)
 
 def test_codegen(optstring):
     (namespace, out_h_filename, out_c_filename) = optstring.split(',')
@@ -278,6 +299,18 @@ see --identifier-prefix and --symbol-prefix."""
                      identifier_prefixes=identifier_prefixes,
                      symbol_prefixes=symbol_prefixes)
 
+def create_logger(namespace, options, output=None):
+    logger = message.MessageLogger.get(namespace=namespace, output=output)
+    if options.warn_all or options.diagnostics_output:
+        logger.enable_warnings(True)
+    if options.diagnostics_output:
+        logger.set_text_output(False)
+        logger.enable_export(True)
+    for code in options.warn_suppress:
+        logger.suppress(code)
+    logger.enable_deduplication(options.warn_deduplicate)
+    return logger
+
 def create_transformer(namespace, options):
     transformer = Transformer(namespace,
                               accept_unprefixed=options.accept_unprefixed)
@@ -336,46 +369,100 @@ def create_source_scanner(options, args):
     ss.parse_macros(filenames)
     return ss
 
-def write_output(data, options):
+def reparse_validate(data):
+    """Parse the generated .gir data and write it back out again, all
+in memory.  The result must be identical to the original data, otherwise
+the parser and the writer disagree and we exit with an error."""
+    parser = GIRParser()
+    parser.parse_data(data)
+    output = StringIO()
+    GIRWriter(parser.get_namespace(),
+              parser.get_shared_libraries(),
+              parser.get_includes(),
+              parser.get_pkgconfig_packages(),
+              parser.get_c_includes(),
+              output=output)
+    passthrough = output.getvalue()
+    if passthrough == data:
+        return
+    # Leave both versions around for inspection
+    names = []
+    for version in (data, passthrough):
+        fd, name = tempfile.mkstemp(suffix='.gir')
+        f = os.fdopen(fd, 'w')
+        f.write(version)
+        f.close()
+        names.append(name)
+    _error("Failed to re-parse gir file; scanned=%r passthrough=%r" % (
+        names[0], names[1]))
+
+def write_output(write_gir, options):
+    """Write the .gir to the output given in options; write_gir
+is called with the file object to write to."""
     if options.output == "-":
-        output = sys.stdout
-    elif options.reparse_validate_gir:
-        main_f, main_f_name = tempfile.mkstemp(suffix='.gir')
-        main_f = os.fdopen(main_f, 'w')
-        main_f.write(data)
-        main_f.close()
-
-        temp_f, temp_f_name = tempfile.mkstemp(suffix='.gir')
-        temp_f = os.fdopen(temp_f, 'w')
-        passthrough_gir(main_f_name, temp_f)
-        temp_f.close()
-        if not utils.files_are_identical(main_f_name, temp_f_name):
-            _error("Failed to re-parse gir file; scanned=%r passthrough=%r" % (
-                main_f_name, temp_f_name))
-        os.unlink(temp_f_name)
         try:
-            shutil.move(main_f_name, options.output)
-        except OSError, e:
-            if e.errno == errno.EPERM:
-                os.unlink(main_f_name)
-                return 0
-            raise
-        return 0
-    else:
-        try:
-            output = open(options.output, "w")
+            write_gir(sys.stdout)
         except IOError, e:
-            _error("opening output for writing: %s" % (e.strerror, ))
-
+            _error("while writing output: %s" % (e.strerror, ))
+        return
+
+    if options.reparse_validate_gir:
+        buf = StringIO()
+        write_gir(buf)
+        data = buf.getvalue()
+        reparse_validate(data)
+        write_gir = lambda f: f.write(data)
+
+    # The .gir is written while it is generated; write it next to the
+    # target first so a failed run never leaves a truncated file that
+    # looks up to date.
+    temp_name = options.output + '.tmp'
     try:
-        output.write(data)
+        output = open(temp_name, "w")
     except IOError, e:
-        _error("while writing output: %s" % (e.strerror, ))
+        _error("opening output for writing: %s" % (e.strerror, ))
+
+    try:
+        try:
+            write_gir(output)
+            output.close()
+        except IOError, e:
+            _error("while writing output: %s" % (e.strerror, ))
+        try:
+            if os.name == 'nt' and os.path.exists(options.output):
+                # rename() does not replace files on Windows
+                os.unlink(options.output)
+            os.rename(temp_name, options.output)
+        except OSError, e:
+            # As before, a target we may not replace is left alone
+            if e.errno != errno.EPERM:
+                _error("while writing output: %s" % (e.strerror, ))
+    finally:
+        output.close()
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+
+def write_diagnostics(logger, filename, diagnostics_format):
+    if filename == '-':
+        f = sys.stdout
+    else:
+        f = open(filename, 'w')
+    try:
+        if diagnostics_format == 'sarif':
+            logger.write_sarif(f)
+        else:
+            logger.write_json(f)
+    finally:
+        if f is not sys.stdout:
+            f.close()
 
 def scanner_main(args):
     parser = _get_option_parser()
     (options, args) = parser.parse_args(args)
 
+    if options.daemon:
+        from giscanner.scannerdaemon import daemon_main
+        return daemon_main()
     if options.passthrough_gir:
         passthrough_gir(options.passthrough_gir, sys.stdout)
     if options.test_codegen:
@@ -398,45 +485,51 @@ def scanner_main(args):
         _error("Must specify --program or --library")
 
     namespace = create_namespace(options)
-    logger = message.MessageLogger.get(namespace=namespace)
-    if options.warn_all:
-        logger.enable_warnings(True)
-    transformer = create_transformer(namespace, options)
+    logger = create_logger(namespace, options)
+    try:
+        transformer = create_transformer(namespace, options)
 
-    packages = set(options.packages)
-    packages.update(transformer.get_pkgconfig_packages())
-    if packages:
-        exit_code = process_packages(options, packages)
-        if exit_code:
-            return exit_code
+        packages = set(options.packages)
+        packages.update(transformer.get_pkgconfig_packages())
+        if packages:
+            exit_code = process_packages(options, packages)
+            if exit_code:
+                return exit_code
 
-    ss = create_source_scanner(options, args)
+        ss = create_source_scanner(options, args)
 
-    ap = AnnotationParser()
-    blocks = ap.parse(ss.get_comments())
+        ap = AnnotationParser()
+        blocks = ap.parse(ss.get_comments())
 
-    # Transform the C symbols into AST nodes
-    transformer.set_annotations(blocks)
-    transformer.parse(ss.get_symbols())
+        # Transform the C symbols into AST nodes
+        transformer.set_annotations(blocks)
+        transformer.parse(ss.get_symbols())
 
-    if not options.header_only:
-        shlibs = create_binary(transformer, options, args)
-    else:
-        shlibs = []
+        if not options.header_only:
+            shlibs = create_binary(transformer, options, args)
+        else:
+            shlibs = []
 
-    main = MainTransformer(transformer, blocks)
-    main.transform()
+        main = MainTransformer(transformer, blocks)
+        main.transform()
 
-    utils.break_on_debug_flag('tree')
+        utils.break_on_debug_flag('tree')
 
-    final = IntrospectablePass(transformer, blocks)
-    final.validate()
+        final = IntrospectablePass(transformer, blocks)
+        final.validate()
 
-    warning_count = logger.get_warning_count()
-    if options.warn_fatal and warning_count > 0:
-        message.fatal("warnings configured as fatal")
-        return 1
-    elif warning_count > 0 and options.warn_all is False:
+        warning_count = logger.get_warning_count()
+        if options.warn_fatal and warning_count > 0:
+            message.fatal("warnings configured as fatal")
+            return 1
+    finally:
+        # Also when the scan failed, these explain why
+        if options.diagnostics_output:
+            write_diagnostics(logger, options.diagnostics_output,
+                              options.diagnostics_format)
+
+    if (warning_count > 0 and options.warn_all is False and
+        not options.diagnostics_output):
         print ("g-ir-scanner: %s: warning: %d warnings suppressed (use --warn-all to see them)"
                % (transformer.namespace.name, warning_count, ))
 
@@ -446,10 +539,10 @@ def scanner_main(args):
     else:
         exported_packages = options.packages
 
-    writer = Writer(transformer.namespace, shlibs, transformer.get_includes(),
-                    exported_packages, options.c_includes)
-    data = writer.get_xml()
+    def write_gir(f):
+        Writer(transformer.namespace, shlibs, transformer.get_includes(),
+               exported_packages, options.c_includes, output=f)
 
-    write_output(data, options)
+    write_output(write_gir, options)
 
     return 0
@@ -150,6 +150,9 @@ gboolean            gi_source_scanner_lex_filename     (GISourceScanner  *igener
 						        const gchar      *filename);
 gboolean            gi_source_scanner_parse_file       (GISourceScanner  *igenerator,
 						        FILE             *file);
+gboolean            gi_source_scanner_lex_comments     (GISourceScanner  *scanner,
+						        const gchar      *filename,
+						        GError          **error);
 void                gi_source_scanner_parse_macros     (GISourceScanner  *scanner,
 							GList            *filenames);
 void                gi_source_scanner_set_macro_scan   (GISourceScanner  *scanner,
@@ -38,11 +38,13 @@ class TransformerException(Exception):
     pass
 
 
-_xdg_data_dirs = [x for x in os.environ.get('XDG_DATA_DIRS', '').split(os.pathsep)]
-_xdg_data_dirs.append(DATADIR)
-
-if os.name != 'nt':
-    _xdg_data_dirs.append('/usr/share')
+def _get_xdg_data_dirs():
+    # Not cached, the scanner daemon changes the environment between scans
+    xdg_data_dirs = os.environ.get('XDG_DATA_DIRS', '').split(os.pathsep)
+    xdg_data_dirs.append(DATADIR)
+    if os.name != 'nt':
+        xdg_data_dirs.append('/usr/share')
+    return xdg_data_dirs
 
 
 class Transformer(object):
@@ -59,6 +61,7 @@ class Transformer(object):
         self._includepaths = []
         self._passthrough_mode = False
         self._annotations = {}
+        self._parsers = {} # <string filename -> GIRParser>
 
     def get_includes(self):
         return self._include_names
@@ -88,7 +91,7 @@ class Transformer(object):
             positions.update(original.file_positions)
             positions.update(node.file_positions)
             message.fatal("Namespace conflict for '%s'" % (node.name, ),
-                          positions)
+                          positions=positions)
         else:
             self._namespace.append(node)
 
@@ -169,7 +172,7 @@ None."""
 
     def _find_include(self, include):
         searchdirs = self._includepaths[:]
-        for path in _xdg_data_dirs:
+        for path in _get_xdg_data_dirs():
             searchdirs.append(os.path.join(path, 'gir-1.0'))
         searchdirs.append(os.path.join(DATADIR, 'gir-1.0'))
 
@@ -184,25 +187,38 @@ None."""
 
     @classmethod
     def parse_from_gir(cls, filename, extra_include_dirs=None):
-        self = cls(None)
-        if extra_include_dirs is not None:
-            self.set_include_paths(extra_include_dirs)
-        self.set_passthrough_mode()
-        self._parse_include(filename)
-        parser = self._cachestore.load(filename)
-        self._namespace = parser.get_namespace()
-        del self._includes[self._namespace.name]
-        return self
+        return cls.parse_from_girs([filename], extra_include_dirs)[0]
+
+    @classmethod
+    def parse_from_girs(cls, filenames, extra_include_dirs=None):
+        """Return a transformer for each of the GIR files; a GIR file
+included by several of them is only loaded once, and its namespace is
+shared between them."""
+        parsers = {}
+        transformers = []
+        for filename in filenames:
+            self = cls(None)
+            self._parsers = parsers
+            if extra_include_dirs is not None:
+                self.set_include_paths(extra_include_dirs)
+            self.set_passthrough_mode()
+            parser = self._parse_include(filename)
+            self._namespace = parser.get_namespace()
+            del self._includes[self._namespace.name]
+            transformers.append(self)
+        return transformers
 
     def _parse_include(self, filename, uninstalled=False):
-        parser = None
-        if self._cachestore is not None:
-            parser = self._cachestore.load(filename)
+        parser = self._parsers.get(os.path.abspath(filename))
+        if parser is None and self._cachestore is not None:
+            parser = self._cachestore.load(filename, self._get_cache_variant())
         if parser is None:
             parser = GIRParser(types_only=not self._passthrough_mode)
             parser.parse(filename)
             if self._cachestore is not None:
-                self._cachestore.store(filename, parser)
+                self._cachestore.store(filename, parser,
+                                       self._get_cache_variant())
+        self._parsers[os.path.abspath(filename)] = parser
 
         for include in parser.get_includes():
             self.register_include(include)
@@ -212,6 +228,14 @@ None."""
                 self._pkg_config_packages.add(pkg)
         namespace = parser.get_namespace()
         self._includes[namespace.name] = namespace
+        return parser
+
+    def _get_cache_variant(self):
+        # A types_only parser drops the docs and most of the nodes, the
+        # doc tool must not get one cached by the scanner
+        if self._passthrough_mode:
+            return 'passthrough'
+        return ''
 
     def _iter_namespaces(self):
         """Return an iterator over all included namespaces; the
@@ -384,7 +408,7 @@ raise ValueError."""
                 try:
                     name = self._strip_symbol(child)
                 except TransformerException, e:
-                    message.warn_symbol(symbol, e)
+                    message.warn_symbol(symbol, e, code='symbol')
                     return None
             members.append(ast.Member(name.lower(),
                                       child.const_int,
@@ -394,7 +418,7 @@ raise ValueError."""
         try:
             enum_name = self.strip_identifier(symbol.ident)
         except TransformerException, e:
-            message.warn_symbol(symbol, e)
+            message.warn_symbol(symbol, e, code='symbol')
             return None
         if symbol.base_type.is_bitfield:
             klass = ast.Bitfield
@@ -413,7 +437,7 @@ raise ValueError."""
         try:
             name = self._strip_symbol(symbol)
         except TransformerException, e:
-            message.warn_symbol(symbol, e)
+            message.warn_symbol(symbol, e, code='symbol')
             return None
         func = ast.Function(name, return_, parameters, False, symbol.ident)
         func.add_symbol_reference(symbol)
@@ -533,7 +557,7 @@ raise ValueError."""
             try:
                 name = self.strip_identifier(symbol.ident)
             except TransformerException, e:
-                message.warn(e)
+                message.warn(e, code='symbol')
                 return None
             if symbol.base_type.name:
                 target = self.create_type_from_ctype_string(symbol.base_type.name)
@@ -658,7 +682,7 @@ raise ValueError."""
         try:
             name = self._strip_symbol(symbol)
         except TransformerException, e:
-            message.warn_symbol(symbol, e)
+            message.warn_symbol(symbol, e, code='symbol')
             return None
         if symbol.const_string is not None:
             typeval = ast.TYPE_STRING
@@ -681,7 +705,7 @@ raise ValueError."""
         try:
             name = self.strip_identifier(symbol.ident)
         except TransformerException, e:
-            message.warn_symbol(symbol, e)
+            message.warn_symbol(symbol, e, code='symbol')
             return None
         struct = ast.Record(name, symbol.ident, disguised=disguised)
         self._parse_fields(symbol, struct)
@@ -693,7 +717,7 @@ raise ValueError."""
         try:
             name = self.strip_identifier(symbol.ident)
         except TransformerException, e:
-            message.warn(e)
+            message.warn(e, code='symbol')
             return None
         union = ast.Union(name, symbol.ident)
         self._parse_fields(symbol, union)
@@ -741,7 +765,7 @@ raise ValueError."""
                     try:
                         name = self.strip_identifier(symbol.ident)
                     except TransformerException, e:
-                        message.warn(e)
+                        message.warn(e, code='symbol')
                         return None
                 compound = klass(name, symbol.ident)
 
@@ -771,13 +795,13 @@ raise ValueError."""
             try:
                 name = self._strip_symbol(symbol)
             except TransformerException, e:
-                message.warn_symbol(symbol, e)
+                message.warn_symbol(symbol, e, code='symbol')
                 return None
         else:
             try:
                 name = self.strip_identifier(symbol.ident)
             except TransformerException, e:
-                message.warn(e)
+                message.warn(e, code='symbol')
                 return None
         callback = ast.Callback(name, retval, parameters, False,
                                 ctype=symbol.ident)
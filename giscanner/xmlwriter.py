@@ -21,6 +21,7 @@
 from __future__ import with_statement
 
 import os
+import re
 
 from contextlib import contextmanager
 from cStringIO import StringIO
@@ -76,18 +77,46 @@ with LibtoolImporter(None, None):
         from giscanner._giscanner import collect_attributes
 
 
+# Lines are buffered and handed to the output in chunks of about this size
+_FLUSH_SIZE = 64 * 1024
+
+_non_ascii_search = re.compile(r'[\x80-\xff]').search
+
+
 class XMLWriter(object):
 
-    def __init__(self):
-        self._data = StringIO()
-        self._data.write('<?xml version="1.0"?>\n')
+    def __init__(self, output=None):
+        """Create a writer.  If output is given, it is a file-like
+object the document is written to as it is generated, otherwise it
+is kept in memory and can be retrieved with get_xml()."""
+        if output is None:
+            output = StringIO()
+        self._output = output
+        self._buffer = []
+        self._buffer_size = 0
         self._tag_stack = []
         self._indent = 0
         self._indent_unit = 2
+        self._indent_strings = {}
         self.enable_whitespace()
+        self._write('<?xml version="1.0"?>\n')
 
     # Private
 
+    def _write(self, data):
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        if self._buffer_size >= _FLUSH_SIZE:
+            self.flush()
+
+    def _get_indent_string(self):
+        try:
+            return self._indent_strings[self._indent]
+        except KeyError:
+            indent = self._indent_char * self._indent
+            self._indent_strings[self._indent] = indent
+            return indent
+
     def _open_tag(self, tag_name, attributes=None):
         if attributes is None:
             attributes = []
@@ -105,27 +134,36 @@ class XMLWriter(object):
     def enable_whitespace(self):
         self._indent_char = ' '
         self._newline_char = '\n'
+        self._indent_strings.clear()
 
     def disable_whitespace(self):
         self._indent_char = ''
         self._newline_char = ''
+        self._indent_strings.clear()
+
+    def flush(self):
+        if self._buffer:
+            self._output.write(''.join(self._buffer))
+            del self._buffer[:]
+            self._buffer_size = 0
 
     def get_xml(self):
-        return self._data.getvalue()
+        self.flush()
+        return self._output.getvalue()
 
     def write_line(self, line=u'', indent=True, do_escape=False):
-        if isinstance(line, str):
-            line = line.decode('utf-8')
-        assert isinstance(line, unicode)
+        if isinstance(line, unicode):
+            line = line.encode('utf-8')
+        elif _non_ascii_search(line) is not None:
+            # Not plain ASCII; make sure it is valid UTF-8 as we
+            # write the bytes out unchanged.
+            line.decode('utf-8')
         if do_escape:
-            line = escape(line.encode('utf-8')).decode('utf-8')
+            line = escape(line)
         if indent:
-            self._data.write('%s%s%s' % (
-                    self._indent_char * self._indent,
-                    line.encode('utf-8'),
-                    self._newline_char))
+            self._write(self._get_indent_string() + line + self._newline_char)
         else:
-            self._data.write('%s%s' % (line.encode('utf-8'), self._newline_char))
+            self._write(line + self._newline_char)
 
     def write_comment(self, text):
         self.write_line('<!-- %s -->' % (text, ))
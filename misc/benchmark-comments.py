@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Measure how fast the comments of C sources can be extracted.  Run from
+# a built tree, e.g.:
+#   UNINSTALLED_INTROSPECTION_SRCDIR=.. PYTHONPATH=../_build \
+#     ./benchmark-comments.py ../../glib/glib ../../glib/gio [--repeat=N]
+#
+# Arguments are source files or directories, whose .c and .h files are
+# used.  SourceScanner.extract_comments() is compared against lexing the
+# same files with the C lexer, which is how the scanner collects the
+# comments of .c files.
+
+import optparse
+import os
+import sys
+import time
+import __builtin__
+
+srcdir = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR',
+                   os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, srcdir)
+__builtin__.__dict__['DATADIR'] = srcdir
+
+from giscanner.sourcescanner import SourceScanner
+
+
+def find_sources(args):
+    filenames = []
+    for arg in args:
+        if not os.path.isdir(arg):
+            filenames.append(os.path.abspath(arg))
+            continue
+        for name in sorted(os.listdir(arg)):
+            if name.endswith(('.c', '.h')):
+                filenames.append(os.path.abspath(os.path.join(arg, name)))
+    return filenames
+
+
+def extract(filenames):
+    ss = SourceScanner()
+    ss.extract_comments(filenames)
+    return len(ss.get_comments())
+
+
+def lex(filenames):
+    ss = SourceScanner()
+    for filename in filenames:
+        ss._scanner.append_filename(filename)
+        ss._scanner.lex_filename(filename)
+    return len([comment for comment in ss.get_comments()
+                if comment[0].startswith('/**\n')])
+
+
+def run(name, func, filenames, n_bytes, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        n_comments = func(filenames)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    print '%-8s %6d blocks  best of %d: %.3fs  %.1f MB/s' % (
+        name, n_comments, repeat, best, n_bytes / best / (1024 * 1024))
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser('%prog [options] SOURCE...')
+    parser.add_option('', '--repeat', type='int', default=3)
+    options, args = parser.parse_args()
+    if not args:
+        parser.error("Need source files or directories")
+
+    filenames = find_sources(args)
+    n_bytes = sum(os.stat(filename).st_size for filename in filenames)
+    print '%d files, %.1f MB' % (len(filenames), n_bytes / (1024.0 * 1024))
+    run('extract', extract, filenames, n_bytes, options.repeat)
+    run('lex', lex, filenames, n_bytes, options.repeat)
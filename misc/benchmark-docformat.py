@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# Measure how long the g-ir-doc-tool formatter takes to turn the doc
+# comments of a GIR file into Mallard markup.  Run from a built tree, e.g.:
+#   UNINSTALLED_INTROSPECTION_SRCDIR=.. \
+#   UNINSTALLED_INTROSPECTION_BUILDDIR=../_build PYTHONPATH=../_build \
+#     ./benchmark-docformat.py ../_build/GLib-2.0.gir [--repeat=N]
+#
+# Every doc string found below the namespace is formatted, the ones of
+# parameters, return values, fields and enum members included.
+
+import optparse
+import os
+import re
+import sys
+import time
+import __builtin__
+
+srcdir = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR',
+                   os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, srcdir)
+__builtin__.__dict__['DATADIR'] = srcdir
+
+from giscanner import ast
+from giscanner.mallardwriter import MallardWriter, MallardFormatterC
+from giscanner.transformer import Transformer
+
+
+def collect_docs(value, docs, seen):
+    if id(value) in seen or isinstance(value, (ast.Namespace, basestring)):
+        return
+    seen.add(id(value))
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            collect_docs(item, docs, seen)
+    elif isinstance(value, ast.Annotated):
+        if value.doc:
+            docs.append(value.doc)
+        for key, item in vars(value).iteritems():
+            if key != 'parent':
+                collect_docs(item, docs, seen)
+
+
+class RescanningFormatterC(MallardFormatterC):
+    """Searches the namespace for every link, like the formatter used to."""
+
+    def format(self, doc):
+        if doc is None:
+            return ''
+
+        result = ''
+        for para in doc.split('\n\n'):
+            result += '<p>'
+            result += self.format_inline(para)
+            result += '</p>'
+        return result
+
+    def format_inline(self, para):
+        result = ''
+
+        pos = para.find('#')
+        if pos < 0:
+            return self.escape(para)
+        result += self.escape(para[:pos])
+        rest = para[pos + 1:]
+        link = re.split('[^a-zA-Z_:-]', rest, maxsplit=1)[0]
+        if link.endswith(':'):
+            link = link[:-1]
+        namespace = self._transformer.namespace
+        type_name = link.split(':', 1)[0]
+        if type_name in namespace.ctypes:
+            type_ = namespace.get_by_ctype(type_name)
+            xref = '%s.%s' % (namespace.name, type_.name)
+            xref_name = xref
+            if '::' in link:
+                xref += '-' + link.split('::', 1)[1]
+                xref_name += '::' + link.split('::', 1)[1]
+            elif ':' in link:
+                xref += '-' + link.split(':', 1)[1]
+                xref_name += ':' + link.split(':', 1)[1]
+        else:
+            xref = link
+            xref_name = link
+        result += '<link xref="%s">%s</link>' % (xref, xref_name)
+        if len(link) < len(rest):
+            result += self.format_inline(rest[len(link):])
+
+        return result
+
+
+def run(name, formatter, docs, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        size = 0
+        for doc in docs:
+            size += len(formatter.format(doc))
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    print '%-10s %6d docs %9d chars  best of %d: %.3fs' % (
+        name, len(docs), size, repeat, best)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser('%prog [options] GIRFILE')
+    parser.add_option('', '--repeat', type='int', default=3)
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error("Need an input GIR filename")
+
+    if 'UNINSTALLED_INTROSPECTION_BUILDDIR' in os.environ:
+        builddir = os.environ['UNINSTALLED_INTROSPECTION_BUILDDIR']
+        include_dirs = [os.path.join(srcdir, 'gir'), builddir]
+    else:
+        include_dirs = []
+    transformer = Transformer.parse_from_gir(args[0], include_dirs)
+    docs = []
+    collect_docs(list(transformer.namespace.itervalues()), docs, set())
+
+    start = time.time()
+    writer = MallardWriter(transformer, 'C')
+    print 'xref index %6d keys  %.3fs' % (len(writer._xrefs),
+                                          time.time() - start)
+    run('rescan', RescanningFormatterC(transformer, {}), docs, options.repeat)
+    run('indexed', writer._formatter, docs, options.repeat)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# Measure how long g-ir-doc-tool takes to write the pages of a large
+# namespace.  Run from a built tree, e.g.:
+#   UNINSTALLED_INTROSPECTION_SRCDIR=.. \
+#   UNINSTALLED_INTROSPECTION_BUILDDIR=../_build PYTHONPATH=../_build \
+#     ./benchmark-doctool.py ../_build/tests/doctool/DocExamples-1.0.gir \
+#     [--scale=N] [--jobs=N] [--language=C]
+#
+# The namespace of the GIR file is scaled up by adding N renamed copies
+# of each of its entries, 50 by default.
+
+import copy
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import __builtin__
+
+srcdir = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR',
+                   os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, srcdir)
+__builtin__.__dict__['DATADIR'] = srcdir
+
+from giscanner import ast
+from giscanner import mallardwriter
+from giscanner.mallardwriter import MallardWriter
+from giscanner.transformer import Transformer
+
+
+def scale_namespace(namespace, scale):
+    originals = list(namespace.itervalues())
+    for i in range(scale):
+        for node in originals:
+            if not isinstance(node, (ast.Class, ast.Interface, ast.Record,
+                                     ast.Enum, ast.Function)):
+                continue
+            # Share the namespace, copy everything below the node
+            clone = copy.deepcopy(node, {id(namespace): namespace})
+            clone.name = '%s%d' % (node.name, i)
+            clone.namespace = None
+            namespace.append(clone)
+
+
+class UncachedMallardWriter(MallardWriter):
+    """Compiles the template of every page, like the writer used to."""
+
+    def _render_node(self, node, output):
+        mallardwriter._templates.clear()
+        MallardWriter._render_node(self, node, output)
+
+
+def run(name, writer, jobs):
+    mallardwriter._templates.clear()
+    outdir = tempfile.mkdtemp(prefix='doctool-')
+    try:
+        start = time.time()
+        writer.write(outdir, jobs=jobs)
+        elapsed = time.time() - start
+        n_pages = len(os.listdir(outdir))
+    finally:
+        shutil.rmtree(outdir)
+    print '%-12s %6d pages  %.3fs  %.2fms/page' % (
+        name, n_pages, elapsed, 1000.0 * elapsed / n_pages)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser('%prog [options] GIRFILE')
+    parser.add_option('', '--scale', type='int', default=50)
+    parser.add_option('-j', '--jobs', type='int', default=4)
+    parser.add_option('-l', '--language', default='C')
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error("Need an input GIR filename")
+
+    if 'UNINSTALLED_INTROSPECTION_BUILDDIR' in os.environ:
+        builddir = os.environ['UNINSTALLED_INTROSPECTION_BUILDDIR']
+        include_dirs = [os.path.join(srcdir, 'gir'), builddir]
+    else:
+        include_dirs = []
+    transformer = Transformer.parse_from_gir(args[0], include_dirs)
+    scale_namespace(transformer.namespace, options.scale)
+
+    run('uncached', UncachedMallardWriter(transformer, options.language), 1)
+    run('cached', MallardWriter(transformer, options.language), 1)
+    run('jobs=%d' % (options.jobs, ),
+        MallardWriter(transformer, options.language), options.jobs)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Measure how long GIRWriter takes to write a large namespace.
+# Run from a built tree, e.g.:
+#   UNINSTALLED_INTROSPECTION_SRCDIR=.. PYTHONPATH=../_build \
+#     ./benchmark-girwriter.py [--classes=N] [--repeat=N]
+#
+# The synthetic namespace defaults to roughly the size of Gtk-3.0:
+# 250 classes, each with 20 methods, 8 properties and 4 signals.
+
+import optparse
+import os
+import sys
+import tempfile
+import time
+import __builtin__
+
+srcdir = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR',
+                   os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, srcdir)
+__builtin__.__dict__['DATADIR'] = srcdir
+
+from giscanner import ast
+from giscanner.girwriter import GIRWriter
+
+
+def make_callable_params(n_params):
+    parameters = []
+    for i in range(n_params):
+        parameters.append(ast.Parameter('arg%d' % (i, ),
+                                        ast.Type(target_fundamental='gint',
+                                                 ctype='gint')))
+    return parameters
+
+
+def make_namespace(n_classes, n_methods, n_properties, n_signals):
+    namespace = ast.Namespace('Bench', '1.0')
+    for i in range(n_classes):
+        name = 'Widget%d' % (i, )
+        symbol_prefix = 'widget%d' % (i, )
+        klass = ast.Class(name, None,
+                          ctype='Bench' + name,
+                          gtype_name='Bench' + name,
+                          get_type='bench_%s_get_type' % (symbol_prefix, ))
+        for j in range(n_methods):
+            retval = ast.Return(ast.Type(target_fundamental='utf8',
+                                         ctype='const gchar*'))
+            method = ast.Function('method_%d' % (j, ), retval,
+                                  make_callable_params(j % 4), False,
+                                  'bench_%s_method_%d' % (symbol_prefix, j))
+            method.doc = 'Does the thing number %d with <b>&</b>.' % (j, )
+            klass.methods.append(method)
+        for j in range(n_properties):
+            klass.properties.append(ast.Property(
+                'property-%d' % (j, ),
+                ast.Type(target_fundamental='gboolean', ctype='gboolean'),
+                True, True, False, False))
+        for j in range(n_signals):
+            retval = ast.Return(ast.Type(target_fundamental='none',
+                                         ctype='void'))
+            klass.signals.append(ast.Signal('signal-%d' % (j, ), retval,
+                                            make_callable_params(2)))
+        namespace.append(klass)
+    return namespace
+
+
+def write_to_memory(namespace):
+    writer = GIRWriter(namespace, ['libbench.so'], [], [], [])
+    return len(writer.get_xml())
+
+
+def write_to_file(namespace):
+    fd, filename = tempfile.mkstemp(suffix='.gir')
+    f = os.fdopen(fd, 'w')
+    try:
+        GIRWriter(namespace, ['libbench.so'], [], [], [], output=f)
+        f.close()
+        return os.stat(filename).st_size
+    finally:
+        os.unlink(filename)
+
+
+def run(name, func, namespace, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        size = func(namespace)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    print '%-10s %8d bytes  best of %d: %.3fs' % (name, size, repeat, best)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser('%prog [options]')
+    parser.add_option('', '--classes', type='int', default=250)
+    parser.add_option('', '--methods', type='int', default=20)
+    parser.add_option('', '--properties', type='int', default=8)
+    parser.add_option('', '--signals', type='int', default=4)
+    parser.add_option('', '--repeat', type='int', default=3)
+    options, args = parser.parse_args()
+
+    namespace = make_namespace(options.classes, options.methods,
+                               options.properties, options.signals)
+    run('memory', write_to_memory, namespace, options.repeat)
+    run('file', write_to_file, namespace, options.repeat)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# Compile GIR files and report the size of the resulting typelibs, to
+# keep an eye on how much has to be paged in at application startup.
+# Run from a built tree, e.g.:
+#   ./benchmark-typelib-size.py --compiler=../_build/g-ir-compiler \
+#     [--compare=/usr/bin/g-ir-compiler] [GIRFILE...]
+#
+# Without GIR files, the ones in gir/ are used, together with the
+# GLib, GObject and Gio GIRs of the build directory of the compiler.
+# Pass --verbose to also see the string sharing statistics of each
+# compile.
+
+import glob
+import optparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+srcdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def default_girs(compiler):
+    girs = glob.glob(os.path.join(srcdir, 'gir', '*.gir'))
+    builddir = os.path.dirname(os.path.abspath(compiler))
+    for name in ['GLib-2.0.gir', 'GObject-2.0.gir', 'Gio-2.0.gir']:
+        path = os.path.join(builddir, 'gir', name)
+        if os.path.exists(path):
+            girs.append(path)
+    return sorted(girs, key=os.path.basename)
+
+
+def compile_gir(compiler, gir, includedirs, outdir, verbose):
+    basename = os.path.basename(gir)
+    typelib = os.path.join(outdir, basename[:-len('.gir')] + '.typelib')
+    args = [compiler, '-o', typelib, gir]
+    for includedir in includedirs:
+        args.insert(1, '--includedir=' + includedir)
+    if verbose:
+        args.insert(1, '--verbose')
+    # GLib prints the statistics messages to stdout, errors to stderr
+    process = subprocess.Popen(args, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT)
+    output, unused = process.communicate()
+    if process.returncode != 0:
+        sys.stderr.write(output)
+        raise SystemExit("ERROR: failed to compile %s" % (gir, ))
+    if verbose:
+        for line in output.splitlines():
+            if 'sharing' in line or 'suffixes' in line:
+                print '  %s: %s' % (basename, line.split(': ', 1)[-1])
+    return os.stat(typelib).st_size
+
+
+def measure(compiler, girs, includedirs, verbose):
+    outdir = tempfile.mkdtemp(prefix='typelib-size-')
+    try:
+        sizes = {}
+        for gir in girs:
+            sizes[gir] = compile_gir(compiler, gir, includedirs, outdir,
+                                     verbose)
+        return sizes
+    finally:
+        shutil.rmtree(outdir)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser('%prog [options] [GIRFILE...]')
+    parser.add_option('', '--compiler', default='g-ir-compiler',
+                      help="g-ir-compiler to measure")
+    parser.add_option('', '--compare', default=None,
+                      help="another g-ir-compiler to compare against")
+    parser.add_option('', '--includedir', action='append', default=[],
+                      help="include directory for GIR files")
+    parser.add_option('-v', '--verbose', action='store_true', default=False)
+    options, girs = parser.parse_args()
+
+    if not girs:
+        girs = default_girs(options.compiler)
+    includedirs = options.includedir + sorted(
+        set(os.path.dirname(os.path.abspath(gir)) for gir in girs))
+
+    sizes = measure(options.compiler, girs, includedirs, options.verbose)
+    if options.compare:
+        baseline = measure(options.compare, girs, includedirs, False)
+    else:
+        baseline = None
+
+    total = base_total = 0
+    for gir in girs:
+        name = os.path.basename(gir)
+        total += sizes[gir]
+        if baseline is None:
+            print '%-28s %9d' % (name, sizes[gir])
+            continue
+        base_total += baseline[gir]
+        print '%-28s %9d %9d %+6.1f%%' % (
+            name, baseline[gir], sizes[gir],
+            100.0 * (sizes[gir] - baseline[gir]) / baseline[gir])
+    if baseline is None:
+        print '%-28s %9d' % ('total', total)
+    else:
+        print '%-28s %9d %9d %+6.1f%%' % (
+            'total', base_total, total,
+            100.0 * (total - base_total) / base_total)
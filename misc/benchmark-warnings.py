@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# Measure what the introspectable pass spends on warnings nobody asked
+# for, i.e. without --warn-all.  Run from a built tree, e.g.:
+#   UNINSTALLED_INTROSPECTION_SRCDIR=.. \
+#   UNINSTALLED_INTROSPECTION_BUILDDIR=../_build PYTHONPATH=../_build \
+#     ./benchmark-warnings.py ../_build/Regress-1.0.gir \
+#       --source=../tests/scanner/regress.c [--repeat=N]
+#
+# The (transfer) annotations of all parameters and return values of the
+# GIR file are dropped first, so that every one of them warns.  The pass
+# is run once to record its warnings, then only the warnings are timed;
+# the rest of the pass is the same either way.  The doc blocks of the
+# --source files are looked up for the positions, as the scanner does.
+
+import optparse
+import os
+import sys
+import time
+import __builtin__
+
+srcdir = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR',
+                   os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, srcdir)
+__builtin__.__dict__['DATADIR'] = srcdir
+
+from giscanner import ast
+from giscanner import message
+from giscanner.annotationmain import parse_files
+from giscanner.annotationparser import TAG_RETURNS
+from giscanner.introspectablepass import IntrospectablePass
+from giscanner.transformer import Transformer
+
+
+def drop_transfer(value, seen):
+    if id(value) in seen or isinstance(value, (ast.Namespace, basestring)):
+        return
+    seen.add(id(value))
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            drop_transfer(item, seen)
+    elif isinstance(value, ast.Annotated):
+        if isinstance(value, ast.TypeContainer):
+            value.transfer = None
+        for key, item in vars(value).iteritems():
+            if key != 'parent':
+                drop_transfer(item, seen)
+
+
+class EagerIntrospectablePass(IntrospectablePass):
+    """Builds every warning before logging it, like the pass used to."""
+
+    def _parameter_warning(self, parent, param, text, *args):
+        if isinstance(parent, (ast.VFunction, ast.Callback)):
+            return
+
+        if args:
+            text = text % args
+        block = None
+        position = None
+        if hasattr(parent, 'symbol'):
+            prefix = '%s: ' % (parent.symbol, )
+            block = self._blocks.get(parent.symbol)
+            if block:
+                position = block.position
+        else:
+            prefix = ''
+        if isinstance(param, ast.Parameter):
+            context = "argument %s: " % (param.argname, )
+        else:
+            context = "return value: "
+            if block:
+                return_tag = block.get_tag(TAG_RETURNS)
+                if return_tag:
+                    position = return_tag.position
+        message.warn_node(parent, prefix + context + text,
+                          positions=position, code='introspectable')
+
+
+class RecordingIntrospectablePass(IntrospectablePass):
+
+    def __init__(self, transformer, blocks):
+        IntrospectablePass.__init__(self, transformer, blocks)
+        self.warnings = []
+
+    def _parameter_warning(self, parent, param, text, *args):
+        self.warnings.append((parent, param, text) + args)
+
+
+def run(name, cls, transformer, blocks, warnings, repeat):
+    validator = cls(transformer, blocks)
+    logger = message.MessageLogger.get()
+    best = None
+    for i in range(repeat):
+        count = logger.get_warning_count()
+        start = time.time()
+        for args in warnings:
+            validator._parameter_warning(*args)
+        elapsed = time.time() - start
+        count = logger.get_warning_count() - count
+        if best is None or elapsed < best:
+            best = elapsed
+    print '%-6s %6d warnings  best of %d: %.2fms' % (name, count, repeat,
+                                                     best * 1000)
+
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser('%prog [options] GIRFILE')
+    parser.add_option('', '--repeat', type='int', default=20)
+    parser.add_option('', '--source', action='append', default=[],
+                      help="C file whose doc blocks the scanner would use")
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error("Need an input GIR filename")
+
+    if 'UNINSTALLED_INTROSPECTION_BUILDDIR' in os.environ:
+        builddir = os.environ['UNINSTALLED_INTROSPECTION_BUILDDIR']
+        include_dirs = [os.path.join(srcdir, 'gir'), builddir]
+    else:
+        include_dirs = []
+    transformer = Transformer.parse_from_gir(args[0], include_dirs)
+    drop_transfer(list(transformer.namespace.itervalues()), set())
+    message.MessageLogger.get(namespace=transformer.namespace)
+    blocks = parse_files(options.source)
+    recorder = RecordingIntrospectablePass(transformer, blocks)
+    recorder.validate()
+
+    for name, cls in (('eager', EagerIntrospectablePass),
+                      ('lazy', IntrospectablePass)):
+        run(name, cls, transformer, blocks, recorder.warnings, options.repeat)
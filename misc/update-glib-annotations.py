@@ -4,6 +4,7 @@
 #   ./update-glib-annotations.py ../../glib ../../glib/_build
 
 
+import multiprocessing
 import os
 import sys
 
@@ -17,8 +18,11 @@ for d in possible_builddirs:
         builddir = d
         break
 assert builddir is not None
+# Only comments are needed, so the sources are not preprocessed; the
+# files of every module are spread over all processors
 annotation_tool_base_args = [os.path.join(builddir, 'g-ir-annotation-tool'),
-                             '--extract']
+                             '--extract', '--comments-only',
+                             '--jobs=%d' % (multiprocessing.cpu_count(), )]
 
 
 def directory_includes(dirs, srcdir, builddir):
@@ -36,7 +40,7 @@ def directory_includes(dirs, srcdir, builddir):
     return result
 
 
-def extract_annotations(module, srcdir, builddir, outfile):
+def start_extract_annotations(module, srcdir, builddir, outfile):
     sources = []
     subdir = os.path.join(srcdir, module['name'])
     includes = directory_includes(module['includes'],
@@ -46,11 +50,11 @@ def extract_annotations(module, srcdir, builddir, outfile):
         if sourcename.endswith('.c'):
             sources.append(os.path.join(subdir, sourcename))
 
-    return subprocess.check_call(annotation_tool_base_args +
-                                 module['defines'] +
-                                 includes +
-                                 sources,
-                                 stdout=outfile)
+    return subprocess.Popen(annotation_tool_base_args +
+                            module['defines'] +
+                            includes +
+                            sorted(sources),
+                            stdout=outfile)
 
 
 if __name__ == '__main__':
@@ -77,6 +81,7 @@ if __name__ == '__main__':
                 'includes':     ['glib', 'gmodule', 'gobject', 'gio'],
                 'defines':      ['-DGOBJECT_COMPILATION', '-DGIO_COMPILATION']}]
 
+    running = []
     for module in modules:
         srcname = module['srcname']
         tmpname = module['srcname'] + '.tmp'
@@ -88,8 +93,18 @@ if __name__ == '__main__':
             os.unlink(srcname)
 
         srcfile = open(tmpname, 'w')
-        extract_annotations(module, srcdir, builddir, srcfile)
+        proc = start_extract_annotations(module, srcdir, builddir, srcfile)
+        running.append((proc, srcfile, module))
+
+    for proc, srcfile, module in running:
+        srcname = module['srcname']
+        tmpname = module['srcname'] + '.tmp'
+
+        returncode = proc.wait()
         srcfile.close()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode,
+                                                annotation_tool_base_args[0])
         os.rename(tmpname, srcname)
 
         print "Updated %r" % (srcname, )
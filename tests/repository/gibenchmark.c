@@ -0,0 +1,748 @@
+/* -*- mode: C; c-file-style: "gnu"; indent-tabs-mode: nil; -*-
+ *
+ * Measures the girepository lookup paths on a set of typelibs and
+ * prints the results as JSON, so that they can be compared between
+ * builds.  It is built with the other tests but not run by
+ * "make check":
+ *
+ *   GI_TYPELIB_PATH=... ./gibenchmark [--iterations=N] \
+ *       [--namespace=Regress --namespace=...] [--typelib-dir=DIR]
+ *
+ * Large synthetic typelibs can be benchmarked by compiling a generated
+ * .gir with g-ir-compiler into a directory passed with --typelib-dir.
+ * To compare the validation modes on the Gtk stack, use e.g.
+ * --namespace=Gtk --namespace=Gdk --namespace=Gio.  Function calls are
+ * only measured on GIMarshallingTests.  With --count-allocations, the
+ * namespace walks also report how many allocations they made; this
+ * makes every other measurement slower, so don't mix the two.
+ */
+
+#include "girepository.h"
+#include "gitypelib-internal.h"
+
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+
+#include <glib/gstdio.h>
+
+static int iterations = 100;
+static char **namespaces = NULL;
+static char **typelib_dirs = NULL;
+static char *output = NULL;
+static gboolean count_allocations = FALSE;
+
+/* Only counted with --count-allocations */
+static guint n_allocations = 0;
+
+static const char *default_namespaces[] = {
+  "Regress", "Everything", "GIMarshallingTests", NULL
+};
+
+static GOptionEntry options[] = {
+  { "iterations", 'n', 0, G_OPTION_ARG_INT, &iterations,
+    "Number of times each measurement is repeated", "N" },
+  { "namespace", 0, 0, G_OPTION_ARG_STRING_ARRAY, &namespaces,
+    "Namespace to benchmark, may be given several times", "NAMESPACE" },
+  { "typelib-dir", 0, 0, G_OPTION_ARG_FILENAME_ARRAY, &typelib_dirs,
+    "Directory to prepend to the typelib search path", "DIR" },
+  { "output", 'o', 0, G_OPTION_ARG_FILENAME, &output,
+    "Write the JSON results to FILE instead of stdout", "FILE" },
+  { "count-allocations", 0, 0, G_OPTION_ARG_NONE, &count_allocations,
+    "Count the allocations made by the namespace walks", NULL },
+  { NULL }
+};
+
+typedef struct {
+  const char *namespace;
+  GPtrArray *names;         /* const char * */
+  GArray *gtypes;           /* GType */
+  GArray *error_domains;    /* GQuark */
+  GString *results;
+} Benchmark;
+
+static gpointer
+counting_malloc (gsize n_bytes)
+{
+  n_allocations++;
+  return malloc (n_bytes);
+}
+
+static gpointer
+counting_realloc (gpointer mem,
+                  gsize    n_bytes)
+{
+  if (mem == NULL)
+    n_allocations++;
+  return realloc (mem, n_bytes);
+}
+
+static gpointer
+counting_calloc (gsize n_blocks,
+                 gsize n_block_bytes)
+{
+  n_allocations++;
+  return calloc (n_blocks, n_block_bytes);
+}
+
+static GMemVTable counting_vtable = {
+  counting_malloc,
+  counting_realloc,
+  free,
+  counting_calloc,
+  counting_malloc,
+  counting_realloc
+};
+
+static void
+add_result_full (Benchmark  *bench,
+                 const char *name,
+                 guint       n_calls,
+                 gdouble     elapsed,
+                 gint        allocations)
+{
+  if (bench->results->len > 0)
+    g_string_append (bench->results, ",\n");
+  g_string_append_printf (bench->results,
+                          "        \"%s\": { \"calls\": %u, \"seconds\": %.6f, "
+                          "\"usec_per_call\": %.3f",
+                          name, n_calls, elapsed,
+                          n_calls ? elapsed * 1e6 / n_calls : 0.0);
+  if (allocations >= 0)
+    g_string_append_printf (bench->results, ", \"allocations\": %d", allocations);
+  g_string_append (bench->results, " }");
+}
+
+static void
+add_result (Benchmark  *bench,
+            const char *name,
+            guint       n_calls,
+            gdouble     elapsed)
+{
+  add_result_full (bench, name, n_calls, elapsed, -1);
+}
+
+static void
+collect_lookup_keys (GIRepository *repo,
+                     Benchmark    *bench)
+{
+  gint n_infos, i;
+
+  n_infos = g_irepository_get_n_infos (repo, bench->namespace);
+  for (i = 0; i < n_infos; i++)
+    {
+      GIBaseInfo *info;
+
+      info = g_irepository_get_info (repo, bench->namespace, i);
+      g_ptr_array_add (bench->names, (gpointer) g_base_info_get_name (info));
+
+      if (GI_IS_REGISTERED_TYPE_INFO (info))
+        {
+          GType gtype;
+
+          /* Needs the shared library; types we can't resolve are skipped */
+          gtype = g_registered_type_info_get_g_type ((GIRegisteredTypeInfo *) info);
+          if (gtype != G_TYPE_NONE && gtype != G_TYPE_INVALID)
+            g_array_append_val (bench->gtypes, gtype);
+        }
+
+      if (g_base_info_get_type (info) == GI_INFO_TYPE_ENUM)
+        {
+          const char *domain;
+
+          domain = g_enum_info_get_error_domain ((GIEnumInfo *) info);
+          if (domain != NULL)
+            {
+              GQuark quark = g_quark_from_string (domain);
+              g_array_append_val (bench->error_domains, quark);
+            }
+        }
+
+      g_base_info_unref (info);
+    }
+}
+
+static gboolean
+bench_require (Benchmark             *bench,
+               const char            *name,
+               GIRepositoryLoadFlags  flags,
+               gboolean               touch_entries)
+{
+  GTimer *timer;
+  gdouble elapsed = 0;
+  int i;
+
+  timer = g_timer_new ();
+  for (i = 0; i < iterations; i++)
+    {
+      GIRepository *repo;
+      GError *error = NULL;
+
+      /* A private repository, so that every iteration loads the
+       * typelib and its dependencies from scratch */
+      repo = g_object_new (G_TYPE_IREPOSITORY, NULL);
+
+      g_timer_start (timer);
+      if (!g_irepository_require (repo, bench->namespace, NULL, flags, &error))
+        {
+          g_printerr ("%s\n", error->message);
+          g_error_free (error);
+          g_object_unref (repo);
+          g_timer_destroy (timer);
+          return FALSE;
+        }
+
+      /* With validation on access, this is where the blobs are checked */
+      if (touch_entries)
+        {
+          gint n_infos, j;
+
+          n_infos = g_irepository_get_n_infos (repo, bench->namespace);
+          for (j = 0; j < n_infos; j++)
+            g_base_info_unref (g_irepository_get_info (repo, bench->namespace, j));
+        }
+      elapsed += g_timer_elapsed (timer, NULL);
+
+      g_object_unref (repo);
+    }
+  g_timer_destroy (timer);
+
+  add_result (bench, name, iterations, elapsed);
+  return TRUE;
+}
+
+static gboolean
+fill_validation_cache (Benchmark *bench)
+{
+  GIRepository *repo;
+  GError *error = NULL;
+  gboolean success;
+
+  repo = g_object_new (G_TYPE_IREPOSITORY, NULL);
+  success = g_irepository_require (repo, bench->namespace, NULL,
+                                   G_IREPOSITORY_LOAD_FLAG_VALIDATE, &error) != NULL;
+  if (!success)
+    {
+      g_printerr ("%s\n", error->message);
+      g_error_free (error);
+    }
+  g_object_unref (repo);
+  return success;
+}
+
+static void
+bench_find_by_name (GIRepository *repo,
+                    Benchmark    *bench)
+{
+  GTimer *timer;
+  guint i, n_calls = 0;
+  int iter;
+
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    for (i = 0; i < bench->names->len; i++)
+      {
+        GIBaseInfo *info;
+
+        info = g_irepository_find_by_name (repo, bench->namespace,
+                                           g_ptr_array_index (bench->names, i));
+        g_assert (info != NULL);
+        g_base_info_unref (info);
+        n_calls++;
+      }
+  add_result (bench, "find_by_name", n_calls, g_timer_elapsed (timer, NULL));
+  g_timer_destroy (timer);
+}
+
+static void
+bench_find_by_gtype (GIRepository *repo,
+                     Benchmark    *bench)
+{
+  GTimer *timer;
+  guint i, n_calls = 0;
+  int iter;
+
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    for (i = 0; i < bench->gtypes->len; i++)
+      {
+        GIBaseInfo *info;
+
+        info = g_irepository_find_by_gtype (repo,
+                                            g_array_index (bench->gtypes, GType, i));
+        if (info != NULL)
+          g_base_info_unref (info);
+        n_calls++;
+      }
+  add_result (bench, "find_by_gtype", n_calls, g_timer_elapsed (timer, NULL));
+  g_timer_destroy (timer);
+}
+
+static void
+bench_find_by_error_domain (GIRepository *repo,
+                            Benchmark    *bench)
+{
+  GTimer *timer;
+  guint i, n_calls = 0;
+  int iter;
+
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    for (i = 0; i < bench->error_domains->len; i++)
+      {
+        GIEnumInfo *info;
+
+        info = g_irepository_find_by_error_domain (repo,
+                                                   g_array_index (bench->error_domains, GQuark, i));
+        if (info != NULL)
+          g_base_info_unref ((GIBaseInfo *) info);
+        n_calls++;
+      }
+  add_result (bench, "find_by_error_domain", n_calls, g_timer_elapsed (timer, NULL));
+  g_timer_destroy (timer);
+}
+
+static void
+bench_get_info (GIRepository *repo,
+                Benchmark    *bench)
+{
+  GTimer *timer;
+  guint n_calls = 0;
+  gint n_infos, i;
+  int iter;
+
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    {
+      n_infos = g_irepository_get_n_infos (repo, bench->namespace);
+      for (i = 0; i < n_infos; i++)
+        {
+          GIBaseInfo *info;
+
+          info = g_irepository_get_info (repo, bench->namespace, i);
+          g_base_info_unref (info);
+          n_calls++;
+        }
+    }
+  add_result (bench, "get_info", n_calls, g_timer_elapsed (timer, NULL));
+  g_timer_destroy (timer);
+}
+
+static gboolean
+bench_validate (GIRepository *repo,
+                Benchmark    *bench)
+{
+  const char *path;
+  GMappedFile *mfile;
+  GITypelib *typelib;
+  GTimer *timer;
+  GError *error = NULL;
+  gdouble elapsed;
+  int iter;
+
+  path = g_irepository_get_typelib_path (repo, bench->namespace);
+  mfile = g_mapped_file_new (path, FALSE, &error);
+  if (mfile == NULL)
+    goto error;
+  typelib = g_typelib_new_from_mapped_file (mfile, &error);
+  if (typelib == NULL)
+    {
+      g_mapped_file_unref (mfile);
+      goto error;
+    }
+
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    {
+      if (!g_typelib_validate (typelib, &error))
+        {
+          g_timer_destroy (timer);
+          g_typelib_free (typelib);
+          goto error;
+        }
+    }
+  elapsed = g_timer_elapsed (timer, NULL);
+  g_timer_destroy (timer);
+  g_typelib_free (typelib);
+
+  add_result (bench, "validate", iterations, elapsed);
+  return TRUE;
+
+ error:
+  g_printerr ("%s: %s\n", path, error->message);
+  g_error_free (error);
+  return FALSE;
+}
+
+/* Visits every method, field and argument of the namespace the way
+ * a binding does at startup, with the refcounted getters */
+static guint
+walk_namespace_get (GIRepository *repo,
+                    const char   *namespace)
+{
+  guint n_infos_seen = 0;
+  gint n_infos, i, j, k;
+
+  n_infos = g_irepository_get_n_infos (repo, namespace);
+  for (i = 0; i < n_infos; i++)
+    {
+      GIBaseInfo *info;
+      gint n_methods = 0, n_fields = 0;
+
+      info = g_irepository_get_info (repo, namespace, i);
+      switch (g_base_info_get_type (info))
+        {
+        case GI_INFO_TYPE_OBJECT:
+          n_methods = g_object_info_get_n_methods ((GIObjectInfo *) info);
+          n_fields = g_object_info_get_n_fields ((GIObjectInfo *) info);
+          break;
+        case GI_INFO_TYPE_STRUCT:
+          n_methods = g_struct_info_get_n_methods ((GIStructInfo *) info);
+          n_fields = g_struct_info_get_n_fields ((GIStructInfo *) info);
+          break;
+        default:
+          break;
+        }
+
+      for (j = 0; j < n_fields; j++)
+        {
+          GIFieldInfo *field;
+
+          if (g_base_info_get_type (info) == GI_INFO_TYPE_OBJECT)
+            field = g_object_info_get_field ((GIObjectInfo *) info, j);
+          else
+            field = g_struct_info_get_field ((GIStructInfo *) info, j);
+          g_base_info_unref (field);
+          n_infos_seen++;
+        }
+
+      for (j = 0; j < n_methods; j++)
+        {
+          GIFunctionInfo *method;
+          gint n_args;
+
+          if (g_base_info_get_type (info) == GI_INFO_TYPE_OBJECT)
+            method = g_object_info_get_method ((GIObjectInfo *) info, j);
+          else
+            method = g_struct_info_get_method ((GIStructInfo *) info, j);
+
+          n_args = g_callable_info_get_n_args (method);
+          for (k = 0; k < n_args; k++)
+            {
+              GIArgInfo *arg = g_callable_info_get_arg (method, k);
+              g_base_info_unref (arg);
+              n_infos_seen++;
+            }
+          g_base_info_unref (method);
+          n_infos_seen++;
+        }
+
+      g_base_info_unref (info);
+      n_infos_seen++;
+    }
+  return n_infos_seen;
+}
+
+/* The same walk with caller-allocated infos and the iterators */
+static guint
+walk_namespace_load (GIRepository *repo,
+                     const char   *namespace)
+{
+  guint n_infos_seen = 0;
+  gint n_infos, i;
+
+  n_infos = g_irepository_get_n_infos (repo, namespace);
+  for (i = 0; i < n_infos; i++)
+    {
+      GIBaseInfo info;
+      GIFieldInfo field;
+      GIFunctionInfo method;
+      GIArgInfo arg;
+      GIInfoIter iter = { 0, };
+      GIInfoIter method_iter = { 0, };
+      gboolean is_object;
+
+      if (!g_irepository_load_info (repo, namespace, i, &info))
+        continue;
+      n_infos_seen++;
+
+      is_object = g_base_info_get_type (&info) == GI_INFO_TYPE_OBJECT;
+      if (!is_object && g_base_info_get_type (&info) != GI_INFO_TYPE_STRUCT)
+        continue;
+
+      while (is_object ?
+             g_object_info_iterate_fields (&info, &iter, &field) :
+             g_struct_info_iterate_fields (&info, &iter, &field))
+        n_infos_seen++;
+
+      while (is_object ?
+             g_object_info_iterate_methods (&info, &method_iter, &method) :
+             g_struct_info_iterate_methods (&info, &method_iter, &method))
+        {
+          GIInfoIter arg_iter = { 0, };
+
+          while (g_callable_info_iterate_args (&method, &arg_iter, &arg))
+            n_infos_seen++;
+          n_infos_seen++;
+        }
+    }
+  return n_infos_seen;
+}
+
+static void
+bench_walk (GIRepository *repo,
+            Benchmark    *bench,
+            const char   *name,
+            guint       (*walk) (GIRepository *, const char *))
+{
+  GTimer *timer;
+  guint n_calls = 0, allocations_before;
+  int iter;
+
+  allocations_before = n_allocations;
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    n_calls += walk (repo, bench->namespace);
+  add_result_full (bench, name, n_calls, g_timer_elapsed (timer, NULL),
+                   count_allocations ? (gint) (n_allocations - allocations_before) : -1);
+  g_timer_destroy (timer);
+}
+
+/* The functions called by bench_invoke(), all without side effects */
+static const struct {
+  const char *name;
+  int n_in_args;
+} invoke_functions[] = {
+  { "int_return_max", 0 },
+  { "int_in_max", 1 },
+  { "utf8_none_return", 0 },
+};
+
+static void
+bench_invoke (GIRepository *repo,
+              Benchmark    *bench)
+{
+  GIFunctionInfo *infos[G_N_ELEMENTS (invoke_functions)];
+  GIArgument in_arg, return_value;
+  GError *error = NULL;
+  GTimer *timer;
+  guint i, n_calls = 0;
+  int iter, j;
+
+  /* Only GIMarshallingTests has functions that are safe to call
+   * in a loop */
+  if (strcmp (bench->namespace, "GIMarshallingTests") != 0)
+    return;
+
+  for (i = 0; i < G_N_ELEMENTS (invoke_functions); i++)
+    {
+      infos[i] = (GIFunctionInfo *) g_irepository_find_by_name (repo, bench->namespace,
+                                                                invoke_functions[i].name);
+      g_assert (infos[i] != NULL);
+    }
+  in_arg.v_int = G_MAXINT;
+
+  /* The first call of each function prepares it; every call after
+   * that should only be the ffi_call() and the argument checks */
+  timer = g_timer_new ();
+  for (iter = 0; iter < iterations; iter++)
+    for (j = 0; j < 1000; j++)
+      for (i = 0; i < G_N_ELEMENTS (invoke_functions); i++)
+        {
+          if (!g_function_info_invoke (infos[i], &in_arg,
+                                       invoke_functions[i].n_in_args,
+                                       NULL, 0, &return_value, &error))
+            g_error ("%s", error->message);
+          n_calls++;
+        }
+  add_result (bench, "invoke", n_calls, g_timer_elapsed (timer, NULL));
+
+  /* What g_function_info_invoke() used to do on each call */
+  n_calls = 0;
+  g_timer_start (timer);
+  for (iter = 0; iter < iterations; iter++)
+    for (j = 0; j < 1000; j++)
+      for (i = 0; i < G_N_ELEMENTS (invoke_functions); i++)
+        {
+          gpointer func;
+
+          if (!g_typelib_symbol (g_base_info_get_typelib ((GIBaseInfo *) infos[i]),
+                                 g_function_info_get_symbol (infos[i]), &func))
+            g_error ("Could not locate %s", g_function_info_get_symbol (infos[i]));
+          if (!g_callable_info_invoke ((GICallableInfo *) infos[i], func,
+                                       &in_arg, invoke_functions[i].n_in_args,
+                                       NULL, 0, &return_value,
+                                       FALSE, FALSE, &error))
+            g_error ("%s", error->message);
+          n_calls++;
+        }
+  add_result (bench, "invoke_unprepared", n_calls, g_timer_elapsed (timer, NULL));
+  g_timer_destroy (timer);
+
+  for (i = 0; i < G_N_ELEMENTS (invoke_functions); i++)
+    g_base_info_unref ((GIBaseInfo *) infos[i]);
+}
+
+static gboolean
+run_benchmark (GIRepository *repo,
+               Benchmark    *bench,
+               GString      *json)
+{
+  GError *error = NULL;
+
+  if (!g_irepository_require (repo, bench->namespace, NULL, 0, &error))
+    {
+      g_printerr ("%s\n", error->message);
+      g_error_free (error);
+      return FALSE;
+    }
+
+  collect_lookup_keys (repo, bench);
+
+  /* Validation on access has to run before the typelib is in the
+   * validation cache, a cache hit skips it */
+  if (!bench_require (bench, "require", 0, FALSE) ||
+      !bench_require (bench, "require_get_info", 0, TRUE) ||
+      !bench_require (bench, "require_validate_on_access_get_info",
+                      G_IREPOSITORY_LOAD_FLAG_VALIDATE_ON_ACCESS, TRUE))
+    return FALSE;
+
+  /* Full validation without the cache is measured by bench_validate() */
+  if (!fill_validation_cache (bench) ||
+      !bench_require (bench, "require_validate_cached",
+                      G_IREPOSITORY_LOAD_FLAG_VALIDATE, FALSE))
+    return FALSE;
+  bench_find_by_name (repo, bench);
+  bench_find_by_gtype (repo, bench);
+  bench_find_by_error_domain (repo, bench);
+  bench_get_info (repo, bench);
+  bench_invoke (repo, bench);
+  bench_walk (repo, bench, "walk_get", walk_namespace_get);
+  bench_walk (repo, bench, "walk_load", walk_namespace_load);
+  if (!bench_validate (repo, bench))
+    return FALSE;
+
+  g_string_append_printf (json,
+                          "    {\n"
+                          "      \"namespace\": \"%s\",\n"
+                          "      \"version\": \"%s\",\n"
+                          "      \"n_infos\": %u,\n"
+                          "      \"n_gtypes\": %u,\n"
+                          "      \"n_error_domains\": %u,\n"
+                          "      \"results\": {\n%s\n      }\n"
+                          "    }",
+                          bench->namespace,
+                          g_irepository_get_version (repo, bench->namespace),
+                          bench->names->len,
+                          bench->gtypes->len,
+                          bench->error_domains->len,
+                          bench->results->str);
+  return TRUE;
+}
+
+int
+main (int argc, char **argv)
+{
+  GOptionContext *context;
+  GIRepository *repo;
+  GError *error = NULL;
+  GString *json;
+  const char **to_run;
+  char *cache_path;
+  gboolean success = TRUE;
+  int fd, i;
+
+  /* The allocation counters have to be installed before GLib
+   * allocates anything, so before the options are parsed */
+  for (i = 1; i < argc; i++)
+    if (strcmp (argv[i], "--count-allocations") == 0)
+      {
+        g_mem_set_vtable (&counting_vtable);
+        /* Have GSlice, which GIRealInfo uses, go through the vtable */
+        g_setenv ("G_SLICE", "always-malloc", TRUE);
+        break;
+      }
+
+  g_type_init ();
+
+  context = g_option_context_new ("- benchmark typelib lookups");
+  g_option_context_add_main_entries (context, options, NULL);
+  if (!g_option_context_parse (context, &argc, &argv, &error))
+    {
+      g_printerr ("%s\n", error->message);
+      return 1;
+    }
+  g_option_context_free (context);
+
+  if (iterations <= 0)
+    {
+      g_printerr ("--iterations must be positive\n");
+      return 1;
+    }
+
+  for (i = 0; typelib_dirs && typelib_dirs[i]; i++)
+    g_irepository_prepend_search_path (typelib_dirs[i]);
+
+  /* Keep the validation results of the benchmark out of the user's cache */
+  cache_path = g_build_filename (g_get_tmp_dir (), "gibenchmark-XXXXXX", NULL);
+  fd = g_mkstemp (cache_path);
+  if (fd < 0)
+    {
+      g_printerr ("Could not create %s\n", cache_path);
+      return 1;
+    }
+  close (fd);
+  g_setenv ("GI_TYPELIB_VALIDATION_CACHE", cache_path, TRUE);
+
+  to_run = namespaces ? (const char **) namespaces : default_namespaces;
+  repo = g_irepository_get_default ();
+
+  json = g_string_new (NULL);
+  g_string_append_printf (json, "{\n  \"iterations\": %d,\n  \"namespaces\": [\n",
+                          iterations);
+
+  for (i = 0; to_run[i]; i++)
+    {
+      Benchmark bench;
+
+      bench.namespace = to_run[i];
+      bench.names = g_ptr_array_new ();
+      bench.gtypes = g_array_new (FALSE, FALSE, sizeof (GType));
+      bench.error_domains = g_array_new (FALSE, FALSE, sizeof (GQuark));
+      bench.results = g_string_new (NULL);
+
+      if (i > 0)
+        g_string_append (json, ",\n");
+      success = run_benchmark (repo, &bench, json);
+
+      g_ptr_array_free (bench.names, TRUE);
+      g_array_free (bench.gtypes, TRUE);
+      g_array_free (bench.error_domains, TRUE);
+      g_string_free (bench.results, TRUE);
+
+      if (!success)
+        break;
+    }
+
+  g_string_append (json, "\n  ]\n}\n");
+
+  if (success)
+    {
+      if (output != NULL)
+        {
+          if (!g_file_set_contents (output, json->str, json->len, &error))
+            {
+              g_printerr ("%s\n", error->message);
+              g_error_free (error);
+              success = FALSE;
+            }
+        }
+      else
+        g_print ("%s", json->str);
+    }
+
+  g_string_free (json, TRUE);
+  g_unlink (cache_path);
+  g_free (cache_path);
+  return success ? 0 : 1;
+}
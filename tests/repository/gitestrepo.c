@@ -44,6 +44,7 @@ main(int argc, char **argv)
   GError *error = NULL;
   GIBaseInfo *info;
   GIBaseInfo *siginfo;
+  GIBaseInfo *typeinfo;
   GIEnumInfo *errorinfo;
   GType gtype;
   const char *prefix;
@@ -52,6 +53,12 @@ main(int argc, char **argv)
 
   repo = g_irepository_get_default ();
 
+  /* Not loaded yet; the miss is cached until another namespace is loaded */
+  info = g_irepository_find_by_gtype (repo, G_TYPE_CANCELLABLE);
+  g_assert (info == NULL);
+  info = g_irepository_find_by_gtype (repo, G_TYPE_CANCELLABLE);
+  g_assert (info == NULL);
+
   ret = g_irepository_require (repo, "Gio", NULL, 0, &error);
   if (!ret)
     g_error ("%s", error->message);
@@ -72,6 +79,23 @@ main(int argc, char **argv)
 
   g_print ("Successfully found GCancellable\n");
 
+  /* Both Gio and GObject have the G prefix; the GType index of the
+   * typelib that doesn't have the type must not give a false hit */
+  typeinfo = g_irepository_find_by_gtype (repo, G_TYPE_OBJECT);
+  g_assert (typeinfo != NULL);
+  g_assert_cmpstr (g_base_info_get_namespace (typeinfo), ==, "GObject");
+  g_assert_cmpstr (g_base_info_get_name (typeinfo), ==, "Object");
+  g_base_info_unref (typeinfo);
+
+  /* Registered, but in no typelib */
+  gtype = g_type_register_static_simple (G_TYPE_OBJECT, "GITestRepoUnknown",
+                                         sizeof (GObjectClass), NULL,
+                                         sizeof (GObject), NULL, 0);
+  typeinfo = g_irepository_find_by_gtype (repo, gtype);
+  g_assert (typeinfo == NULL);
+  typeinfo = g_irepository_find_by_gtype (repo, gtype);
+  g_assert (typeinfo == NULL);
+
   test_constructor_return_type (info);
 
   info = g_irepository_find_by_name (repo, "Gio", "ThisDoesNotExist");
@@ -146,5 +170,10 @@ main(int argc, char **argv)
   g_assert (g_base_info_get_type ((GIBaseInfo *)errorinfo) == GI_INFO_TYPE_ENUM);
   g_assert (strcmp (g_base_info_get_name ((GIBaseInfo*)errorinfo), "ResolverError") == 0);
 
+  errorinfo = g_irepository_find_by_error_domain (repo, g_quark_from_static_string ("gi-test-repo-unknown"));
+  g_assert (errorinfo == NULL);
+  errorinfo = g_irepository_find_by_error_domain (repo, g_quark_from_static_string ("gi-test-repo-unknown"));
+  g_assert (errorinfo == NULL);
+
   exit(0);
 }
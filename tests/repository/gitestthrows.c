@@ -15,6 +15,7 @@ main(int argc, char **argv)
   GIArgument ret_arg;
   GError *error;
   gboolean invoke_return;
+  int i;
 
   g_type_init ();
 
@@ -30,21 +31,35 @@ main(int argc, char **argv)
   g_assert (g_base_info_get_type (info) == GI_INFO_TYPE_FUNCTION);
   g_assert (g_function_info_get_flags ((GIFunctionInfo *)info) & GI_FUNCTION_THROWS);
 
-  in_arg[0].v_string = g_strdup ("non-existent-file/hope");
-  error = NULL;
-  invoke_return = g_function_info_invoke ((GIFunctionInfo *)info,
-                                          in_arg,
-                                          1,
-                                          NULL,
-                                          0,
-                                          &ret_arg,
-                                          &error);
-  g_free(in_arg[0].v_string);
+  /* The second call uses the function prepared by the first one */
+  for (i = 0; i < 2; i++)
+    {
+      in_arg[0].v_string = g_strdup ("non-existent-file/hope");
+      error = NULL;
+      invoke_return = g_function_info_invoke ((GIFunctionInfo *)info,
+                                              in_arg,
+                                              1,
+                                              NULL,
+                                              0,
+                                              &ret_arg,
+                                              &error);
+      g_free(in_arg[0].v_string);
 
+      g_assert (invoke_return == FALSE);
+      g_assert (error != NULL);
+      g_assert (error->domain == G_FILE_ERROR);
+      g_assert (error->code == G_FILE_ERROR_NOENT);
+      g_clear_error (&error);
+    }
+
+  invoke_return = g_function_info_invoke ((GIFunctionInfo *)info,
+                                          NULL, 0, NULL, 0,
+                                          &ret_arg, &error);
   g_assert (invoke_return == FALSE);
   g_assert (error != NULL);
-  g_assert (error->domain == G_FILE_ERROR);
-  g_assert (error->code == G_FILE_ERROR_NOENT);
+  g_assert (error->domain == G_INVOKE_ERROR);
+  g_assert (error->code == G_INVOKE_ERROR_ARGUMENT_MISMATCH);
+  g_clear_error (&error);
 
   exit(0);
 }
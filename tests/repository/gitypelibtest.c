@@ -3,11 +3,14 @@
  */
 
 #include "girepository.h"
+#include "gitypelib-internal.h"
 
 #include <stdlib.h>
 #include <string.h>
 #include <unistd.h>
 
+#include <glib/gstdio.h>
+
 static void
 test_enum_and_flags_cidentifier(GIRepository *repo)
 {
@@ -168,6 +171,305 @@ test_fundamental_get_ref_function_pointer (GIRepository *repo)
     g_base_info_unref (info);
 }
 
+static void
+test_find_by_gtype (GIRepository *repo)
+{
+    GITypelib *ret;
+    GError *error = NULL;
+    gint n_infos, i;
+
+    ret = g_irepository_require (repo, "GIMarshallingTests", NULL, 0, &error);
+    if (!ret)
+        g_error ("%s", error->message);
+
+    /* Every registered type has to be found again by its GType,
+     * whether or not the typelib carries a GType index */
+    n_infos = g_irepository_get_n_infos (repo, "GIMarshallingTests");
+    for (i = 0; i < n_infos; i++) {
+        GIBaseInfo *info, *found;
+        GType gtype;
+
+        info = g_irepository_get_info (repo, "GIMarshallingTests", i);
+        if (!GI_IS_REGISTERED_TYPE_INFO (info)) {
+            g_base_info_unref (info);
+            continue;
+        }
+
+        gtype = g_registered_type_info_get_g_type ((GIRegisteredTypeInfo *) info);
+        if (gtype == G_TYPE_NONE) {
+            g_base_info_unref (info);
+            continue;
+        }
+
+        found = g_irepository_find_by_gtype (repo, gtype);
+        if (!found)
+            g_error ("Could not find GIMarshallingTests.%s by GType %s",
+                     g_base_info_get_name (info), g_type_name (gtype));
+        g_assert_cmpstr (g_base_info_get_name (found), ==,
+                         g_base_info_get_name (info));
+
+        g_base_info_unref (found);
+        g_base_info_unref (info);
+    }
+
+    /* Unknown names hash to some entry too, which must not match */
+    g_assert (g_irepository_find_by_gtype (repo, G_TYPE_INT) == NULL);
+}
+
+static void
+test_validate_on_load (void)
+{
+    GIRepositoryLoadFlags flags[] = {
+        G_IREPOSITORY_LOAD_FLAG_VALIDATE_ON_ACCESS,
+        G_IREPOSITORY_LOAD_FLAG_VALIDATE,
+        /* Now from the validation cache */
+        G_IREPOSITORY_LOAD_FLAG_VALIDATE
+    };
+    char *cache_path;
+    guint i;
+    int fd;
+
+    cache_path = g_build_filename (g_get_tmp_dir (), "gitypelibtest-XXXXXX", NULL);
+    fd = g_mkstemp (cache_path);
+    g_assert (fd >= 0);
+    close (fd);
+    g_setenv ("GI_TYPELIB_VALIDATION_CACHE", cache_path, TRUE);
+
+    for (i = 0; i < G_N_ELEMENTS (flags); i++) {
+        GIRepository *repo;
+        GError *error = NULL;
+        gint n_infos, j;
+
+        repo = g_object_new (G_TYPE_IREPOSITORY, NULL);
+        if (!g_irepository_require (repo, "GIMarshallingTests", NULL, flags[i], &error))
+            g_error ("%s", error->message);
+
+        n_infos = g_irepository_get_n_infos (repo, "GIMarshallingTests");
+        for (j = 0; j < n_infos; j++) {
+            GIBaseInfo *info;
+
+            info = g_irepository_get_info (repo, "GIMarshallingTests", j);
+            g_assert (info != NULL);
+            g_base_info_unref (info);
+        }
+
+        g_object_unref (repo);
+    }
+
+    g_unlink (cache_path);
+    g_free (cache_path);
+}
+
+static gboolean
+validate_copy (const char *contents,
+               gsize       len)
+{
+    GITypelib *typelib;
+    GError *error = NULL;
+    gboolean valid;
+
+    typelib = g_typelib_new_from_memory (g_memdup (contents, len), len, &error);
+    g_assert_no_error (error);
+    valid = g_typelib_validate (typelib, &error);
+    if (!valid)
+        g_clear_error (&error);
+    g_typelib_free (typelib);
+    return valid;
+}
+
+static void
+test_validate_sections (GIRepository *repo)
+{
+    const char *path;
+    char *contents;
+    gsize len;
+    Header *header;
+    Section *section;
+    GError *error = NULL;
+
+    path = g_irepository_get_typelib_path (repo, "GIMarshallingTests");
+    g_assert (path != NULL);
+    if (!g_file_get_contents (path, &contents, &len, &error))
+        g_error ("%s", error->message);
+    g_assert (validate_copy (contents, len));
+
+    header = (Header *) contents;
+    g_assert (header->sections != 0);
+    for (section = (Section *) &contents[header->sections];
+         section->id != GI_SECTION_END;
+         section++) {
+        guint32 offset = section->offset;
+        guint32 *words = (guint32 *) &contents[offset];
+        guint32 word;
+
+        /* Past the end */
+        section->offset = len;
+        g_assert (!validate_copy (contents, len));
+        section->offset = offset;
+
+        /* The first word is the offset of the hash table, except in the
+         * symbol index, where it's the number of symbols */
+        word = words[0];
+        words[0] = G_MAXUINT32 - 3;
+        g_assert (!validate_copy (contents, len));
+        words[0] = word;
+    }
+    g_assert (validate_copy (contents, len));
+
+    g_free (contents);
+}
+
+static void
+test_validate_loaded (void)
+{
+    GIRepository *repo;
+    GITypelib *typelib;
+    const char *path;
+    char *contents;
+    gsize len;
+    Header *header;
+    Section *section;
+    GError *error = NULL;
+
+    repo = g_object_new (G_TYPE_IREPOSITORY, NULL);
+    if (!g_irepository_require (repo, "GIMarshallingTests", NULL, 0, &error))
+        g_error ("%s", error->message);
+    path = g_irepository_get_typelib_path (repo, "GIMarshallingTests");
+    if (!g_file_get_contents (path, &contents, &len, &error))
+        g_error ("%s", error->message);
+    g_object_unref (repo);
+
+    /* Break the directory index, and load it without validation */
+    header = (Header *) contents;
+    for (section = (Section *) &contents[header->sections];
+         section->id != GI_SECTION_DIRECTORY_INDEX;
+         section++)
+        g_assert (section->id != GI_SECTION_END);
+    *(guint32 *) &contents[section->offset] = G_MAXUINT32 - 3;
+
+    repo = g_object_new (G_TYPE_IREPOSITORY, NULL);
+    typelib = g_typelib_new_from_memory ((guint8 *) contents, len, &error);
+    g_assert_no_error (error);
+    if (!g_irepository_load_typelib (repo, typelib, 0, &error))
+        g_error ("%s", error->message);
+
+    /* Requiring it again with validation must not just return it */
+    g_assert (!g_irepository_require (repo, "GIMarshallingTests", NULL,
+                                      G_IREPOSITORY_LOAD_FLAG_VALIDATE_ON_ACCESS,
+                                      &error));
+    g_assert_error (error, G_IREPOSITORY_ERROR, G_IREPOSITORY_ERROR_TYPELIB_INVALID);
+    g_clear_error (&error);
+
+    g_object_unref (repo);
+}
+
+static void
+test_enumerate_versions (GIRepository *repo)
+{
+    GList *versions;
+    int i;
+
+    /* The second time round the directory listings come from the index */
+    for (i = 0; i < 2; i++) {
+        versions = g_irepository_enumerate_versions (repo, "GIMarshallingTests");
+        g_assert (g_list_find_custom (versions, "1.0", (GCompareFunc) strcmp) != NULL);
+        g_list_foreach (versions, (GFunc) g_free, NULL);
+        g_list_free (versions);
+    }
+
+    versions = g_irepository_enumerate_versions (repo, "ThisNamespaceDoesNotExist");
+    g_assert (versions == NULL);
+}
+
+static void
+_check_symbol (GIRepository *repo,
+               const char   *symbol,
+               const char   *container_name,
+               const char   *name)
+{
+    GIFunctionInfo *function_info;
+    GIBaseInfo *container;
+
+    function_info = g_irepository_find_by_symbol (repo, "GIMarshallingTests", symbol);
+    if (!function_info)
+        g_error ("Could not find %s", symbol);
+    g_assert_cmpstr (g_function_info_get_symbol (function_info), ==, symbol);
+    g_assert_cmpstr (g_base_info_get_name (function_info), ==, name);
+
+    container = g_base_info_get_container (function_info);
+    if (container_name == NULL)
+        g_assert (container == NULL);
+    else
+        g_assert_cmpstr (g_base_info_get_name (container), ==, container_name);
+    g_base_info_unref (function_info);
+}
+
+static void
+test_find_by_symbol (GIRepository *repo)
+{
+    _check_symbol (repo, "gi_marshalling_tests_int_return_max", NULL, "int_return_max");
+    _check_symbol (repo, "gi_marshalling_tests_object_method", "Object", "method");
+    _check_symbol (repo, "gi_marshalling_tests_object_new", "Object", "new");
+    _check_symbol (repo, "gi_marshalling_tests_boxed_struct_new", "BoxedStruct", "new");
+
+    g_assert (g_irepository_find_by_symbol (repo, "GIMarshallingTests",
+                                            "gi_marshalling_tests_no_such_function") == NULL);
+    /* Not a function, but the name of an entry */
+    g_assert (g_irepository_find_by_symbol (repo, "GIMarshallingTests", "Object") == NULL);
+}
+
+static void
+test_iterate (GIRepository *repo)
+{
+    GIBaseInfo object_info, struct_info;
+    GIFunctionInfo method;
+    GIFieldInfo field;
+    GIArgInfo arg;
+    GIInfoIter iter = { 0, };
+    GIInfoIter arg_iter;
+    gint n, n_args;
+
+    g_assert (g_irepository_load_info_by_name (repo, "GIMarshallingTests", "Object", &object_info));
+    g_assert_cmpint (g_base_info_get_type (&object_info), ==, GI_INFO_TYPE_OBJECT);
+    g_assert (!g_irepository_load_info_by_name (repo, "GIMarshallingTests", "NoSuchEntry", &object_info));
+    g_assert (g_irepository_load_info_by_name (repo, "GIMarshallingTests", "Object", &object_info));
+
+    /* The iterators visit the same infos as the indexed getters */
+    n = 0;
+    while (g_object_info_iterate_methods (&object_info, &iter, &method)) {
+        GIFunctionInfo *expected = g_object_info_get_method (&object_info, n);
+
+        g_assert (g_base_info_equal (&method, expected));
+        g_assert (g_base_info_get_container (&method) == &object_info);
+
+        n_args = 0;
+        memset (&arg_iter, 0, sizeof (arg_iter));
+        while (g_callable_info_iterate_args (&method, &arg_iter, &arg)) {
+            GIArgInfo *expected_arg = g_callable_info_get_arg (expected, n_args);
+            g_assert_cmpstr (g_base_info_get_name (&arg), ==, g_base_info_get_name (expected_arg));
+            g_base_info_unref (expected_arg);
+            n_args++;
+        }
+        g_assert_cmpint (n_args, ==, g_callable_info_get_n_args (expected));
+
+        g_base_info_unref (expected);
+        n++;
+    }
+    g_assert_cmpint (n, ==, g_object_info_get_n_methods (&object_info));
+    g_assert_cmpint (n, >, 0);
+
+    g_assert (g_irepository_load_info_by_name (repo, "GIMarshallingTests", "SimpleStruct", &struct_info));
+    memset (&iter, 0, sizeof (iter));
+    n = 0;
+    while (g_struct_info_iterate_fields (&struct_info, &iter, &field)) {
+        GIFieldInfo *expected = g_struct_info_get_field (&struct_info, n);
+        g_assert (g_base_info_equal (&field, expected));
+        g_base_info_unref (expected);
+        n++;
+    }
+    g_assert_cmpint (n, ==, g_struct_info_get_n_fields (&struct_info));
+}
+
 int
 main(int argc, char **argv)
 {
@@ -183,6 +485,13 @@ main(int argc, char **argv)
     test_size_of_gvalue (repo);
     test_is_pointer_for_struct_arg (repo);
     test_fundamental_get_ref_function_pointer (repo);
+    test_find_by_gtype (repo);
+    test_find_by_symbol (repo);
+    test_iterate (repo);
+    test_validate_on_load ();
+    test_validate_sections (repo);
+    test_validate_loaded ();
+    test_enumerate_versions (repo);
 
     exit(0);
 }
@@ -0,0 +1,191 @@
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import __builtin__
+from StringIO import StringIO
+
+path = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR', None)
+assert path is not None
+sys.path.insert(0, path)
+
+# Not correct, but enough to get the tests going uninstalled
+__builtin__.__dict__['DATADIR'] = path
+
+from giscanner import scannerdaemon
+from giscanner import utils
+from giscanner.scannerdaemon import ScannerDaemon, get_socket_path, run_client
+
+
+class EchoDaemon(ScannerDaemon):
+    """Runs a shell command instead of a scan; the arguments are
+argv[1] for the command and argv[2] for the exit code."""
+
+    def _scan(self, args):
+        print 'python stdout'
+        sys.stderr.write('python stderr\n')
+        os.system(args[1])
+        return int(args[2])
+
+
+class DebugFlagDaemon(ScannerDaemon):
+    """Prints whether the debug flag given as argv[1] is set."""
+
+    def _scan(self, args):
+        print utils.have_debug_flag(args[1])
+        return 0
+
+
+def start_daemon(socket_path, cls=EchoDaemon, version=None):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            daemon = cls(socket_path)
+            if version is not None:
+                daemon._version = version
+            daemon.serve_forever()
+        finally:
+            os._exit(0)
+    for i in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.05)
+    return pid
+
+
+def stop_daemon(pid, socket_path):
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+    os.unlink(socket_path)
+
+
+def call(args):
+    saved_streams = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = StringIO(), StringIO()
+    try:
+        exit_code = run_client(['g-ir-scanner'] + args)
+        return exit_code, sys.stdout.getvalue(), sys.stderr.getvalue()
+    finally:
+        sys.stdout, sys.stderr = saved_streams
+
+
+def test_default_path(tmpdir):
+    saved_env = dict(os.environ)
+    try:
+        os.environ.pop('GI_SCANNER_DAEMON_SOCKET', None)
+        os.environ.pop('XDG_RUNTIME_DIR', None)
+        os.environ['TMPDIR'] = tmpdir
+        tempfile.tempdir = None
+        path = get_socket_path()
+        # Never directly in the shared temporary directory
+        assert os.path.dirname(os.path.dirname(path)) == tmpdir, path
+
+        # Someone else created the directory, or made it world-readable
+        os.mkdir(os.path.dirname(path), 0755)
+        try:
+            ScannerDaemon(path)._prepare_directory()
+        except SystemExit:
+            pass
+        else:
+            assert False, "accepted a directory readable by others"
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        tempfile.tempdir = None
+
+
+def test_roundtrip(socket_path):
+    pid = start_daemon(socket_path)
+    try:
+        exit_code, stdout, stderr = call(
+            ['echo shell stdout; echo shell stderr >&2', '3'])
+    finally:
+        stop_daemon(pid, socket_path)
+    assert exit_code == 3, exit_code
+    # Output of programs run by the scan goes to the client, in order
+    assert stdout == 'python stdout\nshell stdout\n', repr(stdout)
+    assert stderr == 'python stderr\nshell stderr\n', repr(stderr)
+
+
+def test_busy(socket_path):
+    pid = start_daemon(socket_path)
+    try:
+        first = threading.Thread(target=call, args=(['sleep 3', '0'], ))
+        first.start()
+        time.sleep(0.5)
+        start = time.time()
+        exit_code, stdout, stderr = call(['true', '0'])
+        elapsed = time.time() - start
+        first.join()
+    finally:
+        stop_daemon(pid, socket_path)
+    # Not queued behind the first request
+    assert exit_code is None, exit_code
+    assert elapsed < 2, elapsed
+
+
+def test_other_version(socket_path):
+    pid = start_daemon(socket_path, version='0' * 40)
+    try:
+        exit_code, stdout, stderr = call(['echo shell stdout', '0'])
+    finally:
+        stop_daemon(pid, socket_path)
+    # An installed daemon must not serve an uninstalled scanner
+    assert exit_code is None, exit_code
+    assert 'different copy or version' in stderr, stderr
+
+
+def test_environment(socket_path):
+    pid = start_daemon(socket_path, cls=DebugFlagDaemon)
+    saved_env = dict(os.environ)
+    try:
+        os.environ['GI_SCANNER_DEBUG'] = 'first'
+        first = call(['first'])
+        os.environ['GI_SCANNER_DEBUG'] = 'second'
+        second = call(['first'])
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        stop_daemon(pid, socket_path)
+    # Read from the environment of each request, not of the first one
+    assert first == (0, 'True\n', ''), first
+    assert second == (0, 'False\n', ''), second
+
+
+def test_unsafe_socket(tmpdir):
+    socket_path = os.path.join(tmpdir, 'public', 'daemon.socket')
+    os.mkdir(os.path.dirname(socket_path))
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(1)
+    try:
+        # Anybody could have created the socket in there
+        os.chmod(os.path.dirname(socket_path), 0777)
+        assert scannerdaemon._check_socket_path(socket_path) is not None
+        os.environ['GI_SCANNER_DAEMON_SOCKET'] = socket_path
+        exit_code, stdout, stderr = call(['true', '0'])
+        assert exit_code is None, exit_code
+        assert 'not using the scanner daemon' in stderr, stderr
+    finally:
+        listener.close()
+
+
+if __name__ == '__main__':
+    os.environ.pop('GI_SCANNER_DISABLE_DAEMON', None)
+    tmpdir = tempfile.mkdtemp(prefix='scannerdaemon-')
+    try:
+        test_default_path(tmpdir)
+        os.environ['GI_SCANNER_DAEMON_SOCKET'] = os.path.join(
+            tmpdir, 'daemon.socket')
+        test_roundtrip(os.environ['GI_SCANNER_DAEMON_SOCKET'])
+        test_busy(os.environ['GI_SCANNER_DAEMON_SOCKET'])
+        test_other_version(os.environ['GI_SCANNER_DAEMON_SOCKET'])
+        test_environment(os.environ['GI_SCANNER_DAEMON_SOCKET'])
+        test_unsafe_socket(tmpdir)
+    finally:
+        shutil.rmtree(tmpdir)
+    print 'TEST  scanner daemon'
@@ -701,6 +701,18 @@ void regress_random_function_with_skipped_structure (int x,
 						     RegressSkippedStructure *foo,
 						     double v);
 
+/* Callbacks using a skipped type are skipped, and so are the ones
+ * using those, however long the chain is.  The aliases are looked at
+ * before the skips are known, but are not introspectable either. */
+typedef void (*RegressSkippedCallback1) (RegressSkippedStructure *foo);
+typedef void (*RegressSkippedCallback2) (RegressSkippedCallback1 callback);
+typedef void (*RegressSkippedCallback3) (RegressSkippedCallback2 callback);
+typedef RegressSkippedCallback3 RegressSkippedCallbackAlias;
+typedef RegressSkippedCallbackAlias RegressSkippedCallbackAlias2;
+
+void regress_random_function_with_skipped_callback (RegressSkippedCallback3 callback);
+void regress_random_function_with_skipped_callback_alias (RegressSkippedCallbackAlias2 callback);
+
 /**
  * RegressIntset:
  *
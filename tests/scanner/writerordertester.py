@@ -0,0 +1,112 @@
+import os
+import random
+import sys
+import __builtin__
+
+path = os.getenv('UNINSTALLED_INTROSPECTION_SRCDIR', None)
+assert path is not None
+sys.path.insert(0, path)
+
+# Not correct, but enough to get the tests going uninstalled
+__builtin__.__dict__['DATADIR'] = path
+
+from giscanner import ast
+from giscanner.girwriter import GIRWriter
+
+
+def make_function(name, symbol):
+    retval = ast.Return(ast.Type(target_fundamental='none', ctype='void'))
+    return ast.Function(name, retval, [], False, symbol)
+
+
+def make_namespace(shuffle):
+    def shuffled(items):
+        items = list(items)
+        shuffle(items)
+        return items
+
+    namespace = ast.Namespace('Order', '1.0')
+
+    klass = ast.Class('Widget', None,
+                      ctype='OrderWidget',
+                      gtype_name='OrderWidget',
+                      get_type='order_widget_get_type')
+    for name in shuffled(['show', 'hide', 'destroy', 'add', 'zoom']):
+        klass.methods.append(make_function(name, 'order_widget_' + name))
+    for name in shuffled(['new', 'new_with_label']):
+        klass.constructors.append(make_function(name, 'order_widget_' + name))
+    for name in shuffled(['visible', 'label', 'width-request']):
+        klass.properties.append(ast.Property(
+            name, ast.Type(target_fundamental='gboolean', ctype='gboolean'),
+            True, True, False, False))
+    for name in shuffled(['clicked', 'activate', 'size-allocate']):
+        retval = ast.Return(ast.Type(target_fundamental='none'))
+        klass.signals.append(ast.Signal(name, retval, []))
+    for name in shuffled(['Order.Buildable', 'Order.Activatable']):
+        klass.interfaces.append(ast.Type(target_giname=name))
+
+    record = ast.Record('Rectangle', 'OrderRectangle')
+    for name in shuffled(['union', 'intersect', 'equal']):
+        record.methods.append(make_function(name, 'order_rectangle_' + name))
+
+    nodes = [klass, record,
+             ast.Alias('Zeta', ast.Type(target_fundamental='gint')),
+             ast.Alias('Alpha', ast.Type(target_fundamental='gint')),
+             make_function('init', 'order_init'),
+             make_function('quit', 'order_quit'),
+             ast.Constant('MAJOR_VERSION',
+                          ast.Type(target_fundamental='gint'), '3',
+                          'ORDER_MAJOR_VERSION')]
+    for node in shuffled(nodes):
+        namespace.append(node)
+    return namespace
+
+
+def write(namespace):
+    return GIRWriter(namespace, [], [], [], []).get_xml()
+
+
+def names_in_order(xml, tag):
+    names = []
+    for line in xml.split('\n'):
+        line = line.strip()
+        if line.startswith('<%s ' % (tag, )):
+            names.append(line.split('name="', 1)[1].split('"', 1)[0])
+    return names
+
+
+def test_deterministic():
+    expected = write(make_namespace(lambda items: None))
+    for seed in range(20):
+        rng = random.Random(seed)
+        xml = write(make_namespace(rng.shuffle))
+        assert xml == expected, "output depends on insertion order"
+
+
+def test_ordering():
+    xml = write(make_namespace(random.Random(0).shuffle))
+
+    # Direct children of <namespace> are indented by four spaces
+    toplevel = [line.split('name="', 1)[1].split('"', 1)[0]
+                for line in xml.split('\n')
+                if (line.startswith('    <') and
+                    not line.startswith('    </'))]
+    # Aliases first, then everything else by name
+    assert toplevel == ['Alpha', 'Zeta', 'MAJOR_VERSION', 'Rectangle',
+                        'Widget', 'init', 'quit'], toplevel
+
+    assert names_in_order(xml, 'method') == [
+        'equal', 'intersect', 'union',
+        'add', 'destroy', 'hide', 'show', 'zoom']
+    assert names_in_order(xml, 'constructor') == ['new', 'new_with_label']
+    assert names_in_order(xml, 'property') == [
+        'label', 'visible', 'width-request']
+    assert names_in_order(xml, 'glib:signal') == [
+        'activate', 'clicked', 'size-allocate']
+    assert names_in_order(xml, 'implements') == ['Activatable', 'Buildable']
+
+
+if __name__ == '__main__':
+    test_deterministic()
+    test_ordering()
+    print 'TEST  writer ordering'
@@ -0,0 +1,14 @@
+#include "common.h"
+
+// OPTIONS: --diagnostics-output=diagnostics.json
+
+/**
+ * test_diagnostics_json:
+ * @param: (transfer):
+ *
+ * Returns: (transfer none): Some stuff
+ */
+GSList *test_diagnostics_json(int param);
+
+// EXPECT:7: warning: annotation: transfer annotation needs a value
+// EXPECT:9: warning: introspectable: test_diagnostics_json: return value: Missing (element-type) annotation
@@ -0,0 +1,20 @@
+#include "common.h"
+
+// OPTIONS: --diagnostics-output=diagnostics.sarif --diagnostics-format=sarif
+
+typedef struct {
+   int i;
+} MyStruct;
+
+// EXPECT:7: warning: symbol: symbol='MyStruct': Unknown namespace for identifier 'MyStruct'
+
+/**
+ * test_diagnostics_sarif:
+ * @param: (transfer):
+ *
+ * Returns: (transfer none): Some stuff
+ */
+GSList *test_diagnostics_sarif(int param);
+
+// EXPECT:13: warning: annotation: transfer annotation needs a value
+// EXPECT:15: warning: introspectable: test_diagnostics_sarif: return value: Missing (element-type) annotation
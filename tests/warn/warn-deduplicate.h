@@ -0,0 +1,11 @@
+// OPTIONS: --warn-deduplicate
+
+/**
+ * test_deduplicate:
+ * @param: (transfer) (transfer):
+ * @param2: (transfer) (transfer):
+ */
+void test_deduplicate(int param, int param2);
+
+// EXPECT:5: Warning: Test: transfer annotation needs a value
+// EXPECT:6: Warning: Test: transfer annotation needs a value
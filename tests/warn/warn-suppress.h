@@ -0,0 +1,24 @@
+#include "common.h"
+
+// OPTIONS: --warn-suppress=annotation --warn-suppress=introspectable
+
+/**
+ * test_suppress_annotation:
+ * @param: (transfer):
+ */
+void test_suppress_annotation(int param);
+
+/**
+ * test_suppress_transform:
+ * @wrong_name: an integer
+ */
+void test_suppress_transform(int param);
+
+// EXPECT:13: Warning: Test: test_suppress_transform: unknown parameter 'wrong_name' in documentation comment, should be 'param'
+
+/**
+ * test_suppress_introspectable:
+ *
+ * Returns: (transfer none): Some stuff
+ */
+GSList *test_suppress_introspectable(void);
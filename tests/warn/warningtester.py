@@ -1,7 +1,10 @@
 import difflib
+import json
 import os
 import os.path
+import shlex
 import sys
+import tempfile
 from StringIO import StringIO
 import __builtin__
 
@@ -16,10 +19,11 @@ from giscanner.annotationparser import AnnotationParser
 from giscanner.ast import Include, Namespace
 from giscanner.introspectablepass import IntrospectablePass
 from giscanner.maintransformer import MainTransformer
-from giscanner.message import MessageLogger
+from giscanner.message import Position
 from giscanner.sourcescanner import SourceScanner
 from giscanner.transformer import Transformer
-from giscanner.scannermain import process_packages
+from giscanner.scannermain import (_get_option_parser, create_logger,
+                                   process_packages, write_diagnostics)
 
 currentdir = os.path.dirname(os.path.abspath(sys.argv[0]))
 current_name = os.path.basename(currentdir)
@@ -71,13 +75,61 @@ def _extract_expected(filename):
             retval.append((sort_key, line[10:]))
     return retval
 
+def _extract_options(filename):
+    """Parse the g-ir-scanner options given on // OPTIONS: lines."""
+    args = []
+    for line in open(filename):
+        if line.startswith('// OPTIONS:'):
+            args.extend(shlex.split(line[11:]))
+    options, unused = _get_option_parser().parse_args(args)
+    return options
+
+def _read_diagnostics(logger, diagnostics_format):
+    """Export the recorded warnings and return them as lines of
+the form FILE:LINE:COLUMN: TYPE: CODE: TEXT."""
+    fd, filename = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        write_diagnostics(logger, filename, diagnostics_format)
+        data = json.load(open(filename))
+    finally:
+        os.unlink(filename)
+
+    lines = []
+    if diagnostics_format == 'sarif':
+        for result in data['runs'][0]['results']:
+            position = Position('<unknown>')
+            if result['locations']:
+                location = result['locations'][-1]['physicalLocation']
+                region = location.get('region', {})
+                position = Position(location['artifactLocation']['uri'],
+                                    region.get('startLine'),
+                                    region.get('startColumn'))
+            lines.append('%s: %s: %s: %s' % (
+                position.format(cwd=''), result['level'], result['ruleId'],
+                result['message']['text']))
+    else:
+        for record in data:
+            position = Position('<unknown>')
+            if record['positions']:
+                last = record['positions'][-1]
+                position = Position(last['file'], last['line'],
+                                    last['column'])
+            text = record['text']
+            if record['prefix']:
+                text = '%s: %s' % (record['prefix'], text)
+            lines.append('%s: %s: %s: %s' % (
+                position.format(cwd=''), record['type'], record['code'],
+                text))
+    return '\n'.join(lines)
+
 def check(args):
     filename = args[0]
 
     output = StringIO()
     namespace = Namespace("Test", "1.0")
-    logger = MessageLogger.get(namespace=namespace,
-                               output=output)
+    scanner_options = _extract_options(filename)
+    logger = create_logger(namespace, scanner_options, output=output)
     logger.enable_warnings(True)
     transformer = Transformer(namespace)
     transformer.set_include_paths([os.path.join(top_srcdir, 'gir'), top_builddir])
@@ -106,6 +158,12 @@ def check(args):
     final.validate()
 
     raw = output.getvalue()
+    if scanner_options.diagnostics_output:
+        if raw:
+            raise SystemExit(
+                "ERROR in %r: warnings shown with --diagnostics-output:\n%s" % (
+                os.path.basename(filename), raw))
+        raw = _read_diagnostics(logger, scanner_options.diagnostics_format)
     if raw.endswith('\n'):
         raw = raw[:-1]
     warnings = raw.split('\n')
@@ -40,15 +40,24 @@ gboolean no_init = FALSE;
 gchar **includedirs = NULL;
 gchar **input = NULL;
 gchar *output = NULL;
+gchar *output_dir = NULL;
 gchar *mname = NULL;
 gchar *shlib = NULL;
 gboolean include_cwd = FALSE;
 gboolean debug = FALSE;
 gboolean verbose = FALSE;
+gint jobs = 0;
+
+/* One module to compile in multi-input mode */
+typedef struct {
+  GIrModule *module;
+  gchar *filename;
+  gint level;
+} CompileJob;
 
 static gboolean
-write_out_typelib (gchar *prefix,
-		   GITypelib *typelib)
+write_out_typelib (const gchar *path,
+		   GITypelib   *typelib)
 {
   FILE *file;
   gsize written;
@@ -59,7 +68,7 @@ write_out_typelib (gchar *prefix,
   GError *error = NULL;
   gboolean success = FALSE;
 
-  if (output == NULL)
+  if (path == NULL)
     {
       file = stdout;
       file_obj = NULL;
@@ -72,10 +81,7 @@ write_out_typelib (gchar *prefix,
     }
   else
     {
-      if (prefix)
-	filename = g_strdup_printf ("%s-%s", prefix, output);  
-      else
-	filename = g_strdup (output);
+      filename = g_strdup (path);
       file_obj = g_file_new_for_path (filename);
       tmp_filename = g_strdup_printf ("%s.tmp", filename);
       tmp_file_obj = g_file_new_for_path (tmp_filename);
@@ -96,7 +102,7 @@ write_out_typelib (gchar *prefix,
     goto out;
   }
 
-  if (output != NULL)
+  if (path != NULL)
     fclose (file);
   if (tmp_filename != NULL)
     {
@@ -132,6 +138,8 @@ static GOptionEntry options[] =
   { "no-init", 0, 0, G_OPTION_ARG_NONE, &no_init, "do not create _init() function", NULL },
   { "includedir", 0, 0, G_OPTION_ARG_FILENAME_ARRAY, &includedirs, "include directories in GIR search path", NULL }, 
   { "output", 'o', 0, G_OPTION_ARG_FILENAME, &output, "output file", "FILE" }, 
+  { "output-dir", 0, 0, G_OPTION_ARG_FILENAME, &output_dir, "output directory, for several input files", "DIRECTORY" },
+  { "jobs", 'j', 0, G_OPTION_ARG_INT, &jobs, "number of modules to build in parallel", "N" },
   { "module", 'm', 0, G_OPTION_ARG_STRING, &mname, "module to compile", "NAME" }, 
   { "shared-library", 'l', 0, G_OPTION_ARG_FILENAME, &shlib, "shared library", "FILE" }, 
   { "debug", 0, 0, G_OPTION_ARG_NONE, &debug, "show debug messages", NULL }, 
@@ -140,6 +148,128 @@ static GOptionEntry options[] =
   { NULL, }
 };
 
+static GITypelib *
+build_module (GIrModule *module)
+{
+  GITypelib *typelib;
+  GError *error = NULL;
+
+  g_debug ("[building] module %s", module->name);
+
+  typelib = _g_ir_module_build_typelib (module);
+  if (typelib == NULL)
+    g_error ("Failed to build typelib for module '%s'\n", module->name);
+  if (!g_typelib_validate (typelib, &error))
+    g_error ("Invalid typelib for module '%s': %s",
+	     module->name, error->message);
+
+  return typelib;
+}
+
+static void
+compile_job (CompileJob *job,
+	     gint       *failed)
+{
+  GITypelib *typelib;
+
+  typelib = build_module (job->module);
+  if (!write_out_typelib (job->filename, typelib))
+    g_atomic_int_inc (failed);
+  g_typelib_free (typelib);
+}
+
+static CompileJob *
+find_job (GPtrArray *compile_jobs,
+	  GIrModule *module)
+{
+  guint i;
+
+  for (i = 0; i < compile_jobs->len; i++)
+    {
+      CompileJob *job = g_ptr_array_index (compile_jobs, i);
+      if (job->module == module)
+	return job;
+    }
+  return NULL;
+}
+
+/* Building a module appends cross-reference nodes to it, so it must
+ * not be built while another module that includes it, directly or
+ * through other modules, is being built.  A module's level is higher
+ * than the levels of all the input modules it includes, so modules of
+ * the same level are independent.  Modules that are only included are
+ * not built, but they pass on the levels of what they include.
+ */
+static gint
+compute_level (GPtrArray  *compile_jobs,
+	       GHashTable *levels,
+	       GIrModule  *module)
+{
+  GList *l;
+  gpointer value;
+  gint level = 0;
+
+  if (g_hash_table_lookup_extended (levels, module, NULL, &value))
+    return GPOINTER_TO_INT (value);
+
+  for (l = module->include_modules; l; l = l->next)
+    {
+      GIrModule *include = l->data;
+      gint include_level;
+
+      include_level = compute_level (compile_jobs, levels, include);
+      if (find_job (compile_jobs, include) != NULL)
+	include_level++;
+      level = MAX (level, include_level);
+    }
+
+  g_hash_table_insert (levels, module, GINT_TO_POINTER (level));
+  return level;
+}
+
+static gint
+compile_all (GPtrArray *compile_jobs)
+{
+  GThreadPool *pool;
+  GError *error = NULL;
+  gint failed = 0;
+  GHashTable *levels;
+  gint level, max_level = 0;
+  guint i;
+
+  levels = g_hash_table_new (NULL, NULL);
+  for (i = 0; i < compile_jobs->len; i++)
+    {
+      CompileJob *job = g_ptr_array_index (compile_jobs, i);
+
+      job->level = compute_level (compile_jobs, levels, job->module);
+      max_level = MAX (max_level, job->level);
+    }
+  g_hash_table_destroy (levels);
+
+  for (level = 0; level <= max_level; level++)
+    {
+      pool = g_thread_pool_new ((GFunc) compile_job, &failed, jobs, TRUE, &error);
+      if (pool == NULL)
+	{
+	  g_fprintf (stderr, "failed to start threads: %s\n", error->message);
+	  return 1;
+	}
+
+      for (i = 0; i < compile_jobs->len; i++)
+	{
+	  CompileJob *job = g_ptr_array_index (compile_jobs, i);
+	  if (job->level == level)
+	    g_thread_pool_push (pool, job, NULL);
+	}
+
+      /* Wait for this level before starting on the modules including it */
+      g_thread_pool_free (pool, FALSE, TRUE);
+    }
+
+  return failed ? 1 : 0;
+}
+
 int
 main (int argc, char ** argv)
 {
@@ -147,7 +277,9 @@ main (int argc, char ** argv)
   GError *error = NULL;
   GIrParser *parser;
   GIrModule *module;
-  gint i;
+  GPtrArray *compile_jobs;
+  gint n_inputs;
+  gint i, ret;
   g_typelib_check_sanity ();
 
   context = g_option_context_new ("");
@@ -159,7 +291,10 @@ main (int argc, char ** argv)
   if (debug)
     logged_levels = logged_levels | G_LOG_LEVEL_DEBUG;
   if (verbose)
-    logged_levels = logged_levels | G_LOG_LEVEL_MESSAGE;
+    {
+      logged_levels = logged_levels | G_LOG_LEVEL_MESSAGE;
+      _g_irnode_enable_stats ();
+    }
   g_log_set_always_fatal (G_LOG_LEVEL_WARNING | G_LOG_LEVEL_CRITICAL);
 
   g_log_set_default_handler (log_handler, NULL);
@@ -171,55 +306,109 @@ main (int argc, char ** argv)
       return 1;
     }
 
+  n_inputs = g_strv_length (input);
+  if (n_inputs > 1)
+    {
+      if (output_dir == NULL)
+	{
+	  g_fprintf (stderr, "--output-dir is required with several input files\n");
+	  return 1;
+	}
+      if (output != NULL || shlib != NULL)
+	{
+	  g_fprintf (stderr, "--output and --shared-library can only be used with a single input file\n");
+	  return 1;
+	}
+    }
+
   g_debug ("[parsing] start, %d includes", 
 	   includedirs ? g_strv_length (includedirs) : 0);
 
   g_type_init ();
+#if !GLIB_CHECK_VERSION (2, 31, 0)
+  if (!g_thread_supported ())
+    g_thread_init (NULL);
+#endif
 
   if (includedirs != NULL)
     for (i = 0; includedirs[i]; i++)
       g_irepository_prepend_search_path (includedirs[i]);
 
+  /* All inputs share one parser, so that an include used by several of
+   * them (or given as an input itself, before the inputs using it) is
+   * only parsed once.
+   */
   parser = _g_ir_parser_new ();
 
   _g_ir_parser_set_includes (parser, (const char*const*) includedirs);
 
-  module = _g_ir_parser_parse_file (parser, input[0], &error);
-  if (module == NULL) 
+  compile_jobs = g_ptr_array_new ();
+
+  for (i = 0; i < n_inputs; i++)
     {
-      g_fprintf (stderr, "error parsing file %s: %s\n", 
-		 input[0], error->message);
+      CompileJob *job;
+
+      module = _g_ir_parser_parse_file (parser, input[i], &error);
+      if (module == NULL) 
+	{
+	  g_fprintf (stderr, "error parsing file %s: %s\n", 
+		     input[i], error->message);
       
-      return 1;
+	  return 1;
+	}
+
+      job = g_slice_new0 (CompileJob);
+      job->module = module;
+      if (output_dir != NULL)
+	{
+	  gchar *basename = g_path_get_basename (input[i]);
+	  gchar *typelib_name;
+
+	  /* Foo-1.0.gir -> Foo-1.0.typelib */
+	  basename[strlen (basename) - strlen (".gir")] = '\0';
+	  typelib_name = g_strconcat (basename, ".typelib", NULL);
+	  job->filename = g_build_filename (output_dir, typelib_name, NULL);
+	  g_free (typelib_name);
+	  g_free (basename);
+	}
+      else
+	job->filename = g_strdup (output);
+      g_ptr_array_add (compile_jobs, job);
     }
 
   g_debug ("[parsing] done");
 
   g_debug ("[building] start");
 
-  {
+  if (n_inputs == 1)
+    {
+      CompileJob *job = g_ptr_array_index (compile_jobs, 0);
       GITypelib *typelib;
 
       if (shlib)
 	{
-          if (module->shared_library)
-	    g_free (module->shared_library);
-          module->shared_library = g_strdup (shlib);
+          if (job->module->shared_library)
+	    g_free (job->module->shared_library);
+          job->module->shared_library = g_strdup (shlib);
 	}
 
-      g_debug ("[building] module %s", module->name);
-
-      typelib = _g_ir_module_build_typelib (module);
-      if (typelib == NULL)
-	g_error ("Failed to build typelib for module '%s'\n", module->name);
-      if (!g_typelib_validate (typelib, &error))
-	g_error ("Invalid typelib for module '%s': %s", 
-		 module->name, error->message);
-
-      if (!write_out_typelib (NULL, typelib))
-	return 1;
+      typelib = build_module (job->module);
+      ret = write_out_typelib (job->filename, typelib) ? 0 : 1;
       g_typelib_free (typelib);
-      typelib = NULL;
+    }
+  else
+    {
+      /* The statistics printed with --verbose are shared by all modules */
+      if (verbose)
+	jobs = 1;
+      else if (jobs <= 0)
+#if GLIB_CHECK_VERSION (2, 36, 0)
+	jobs = g_get_num_processors ();
+#else
+	jobs = 1;
+#endif
+
+      ret = compile_all (compile_jobs);
     }
 
   g_debug ("[building] done");
@@ -229,5 +418,5 @@ main (int argc, char ** argv)
   _g_ir_parser_free (parser);
 #endif  
 
-  return 0; 
+  return ret; 
 }